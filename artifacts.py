@@ -0,0 +1,76 @@
+import os
+import shutil
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models import models
+
+
+def find_completed_artifact(db: Session, content_hash: str, pipeline_version: str) -> Optional[models.PaperArtifact]:
+    """같은 PDF 내용과 파이프라인 버전으로 분석이 완료된 결과물 조회"""
+    return db.query(models.PaperArtifact).filter(
+        models.PaperArtifact.content_hash == content_hash,
+        models.PaperArtifact.pipeline_version == pipeline_version,
+        models.PaperArtifact.status == "completed",
+    ).order_by(models.PaperArtifact.id).first()
+
+
+def create_artifact(db: Session, content_hash: str, pipeline_version: str, pdf_path: str) -> models.PaperArtifact:
+    """새로 분석할 PDF의 결과물 레코드 생성 (업로드한 Paper가 첫 참조)"""
+    artifact = models.PaperArtifact(
+        content_hash=content_hash,
+        pipeline_version=pipeline_version,
+        status="processing",
+        pdf_path=pdf_path,
+        output_folder=os.path.splitext(pdf_path)[0],
+        ref_count=1,
+    )
+    db.add(artifact)
+    db.flush()
+    return artifact
+
+
+def acquire_artifact(db: Session, artifact: models.PaperArtifact):
+    """결과물 참조 수 증가"""
+    db.query(models.PaperArtifact).filter(models.PaperArtifact.id == artifact.id).update(
+        {models.PaperArtifact.ref_count: models.PaperArtifact.ref_count + 1},
+        synchronize_session=False,
+    )
+
+
+def release_artifact(db: Session, artifact_id: int):
+    """결과물 참조 수 감소. 더 이상 참조하는 Paper가 없으면 파일과 레코드 삭제"""
+    db.query(models.PaperArtifact).filter(models.PaperArtifact.id == artifact_id).update(
+        {models.PaperArtifact.ref_count: models.PaperArtifact.ref_count - 1},
+        synchronize_session=False,
+    )
+    artifact = db.query(models.PaperArtifact).filter(models.PaperArtifact.id == artifact_id).first()
+    if artifact is None or artifact.ref_count > 0:
+        return
+
+    if artifact.pdf_path and os.path.exists(artifact.pdf_path):
+        os.remove(artifact.pdf_path)
+    if artifact.output_folder:
+        shutil.rmtree(artifact.output_folder, ignore_errors=True)
+    db.delete(artifact)
+    print(f"공유 결과물 삭제: {artifact.output_folder}")
+
+
+def new_paper_from_artifact(artifact: models.PaperArtifact, title: str, user_id: int) -> models.Paper:
+    """완료된 결과물을 그대로 연결한 Paper 생성 (재분석 없음)"""
+    return models.Paper(
+        title=title,
+        user_id=user_id,
+        original_content=artifact.original_content,
+        english_summary=artifact.english_summary,
+        translation=artifact.translation,
+        korean_summary=artifact.korean_summary,
+        pdf_path=artifact.pdf_path,
+        processing_status="completed",
+        stage="completed",
+        progress=1.0,
+        content_hash=artifact.content_hash,
+        pipeline_version=artifact.pipeline_version,
+        artifact_id=artifact.id,
+    )
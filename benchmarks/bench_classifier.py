@@ -0,0 +1,82 @@
+"""
+제목 단계 판별과 줄바꿈 정리의 처리량을 이전 구현(re.match 네 번, re.sub 두 번)과 비교합니다.
+합성 Upstage 레이아웃 결과의 문자열과 경계 사례로 두 구현의 결과가 같은지도 함께 확인합니다.
+
+    python -m benchmarks.bench_classifier
+"""
+import re
+import time
+
+from benchmarks.fixtures import make_upstage_layouts
+from utils.extracts import _heading_tag, process_html_string
+
+# 판별 결과를 비교할 경계 사례
+EDGE_CASES = [
+    "", "  ", "Abstract", " Abstract ", "abstract", "1.", "1", "12.Title", "1. Introduction", "1.2 nope",
+    "1.2. Method", "1.2.", "1.2.3", "1.12.3 x", "1.2.3. Deep", "10.20.30.40", "1.a.2", "١. 제목", "3.١",
+    "-<br>", "--<br>", "<br>-<br>", "para-<br>metric", "a<br><br>b", "-<br-<br>>",
+]
+
+
+def previous_heading_tag(string):
+    """이전 구현: 제목 단계마다 re.match"""
+    if not string:
+        return None
+    string = string.strip()
+    if string == "Abstract":
+        return "h1"
+    if re.match(r"^\d+\.", string):
+        if re.match(r"^\d+\.[^0-9]", string):
+            return "h1"
+        elif re.match(r"^\d+\.\d+\.[^0-9]", string):
+            return "h2"
+        elif re.match(r"^\d+\.\d+\.\d", string):
+            return "h3"
+    return None
+
+
+def previous_process_html_string(html_str):
+    """이전 구현: re.sub 두 번"""
+    html_str = re.sub(r'-<br>', '', html_str)
+    return re.sub(r'<br>', ' ', html_str)
+
+
+def fixture_strings(pages):
+    state = make_upstage_layouts(pages=pages)
+    strings = []
+    for analyzed in state["analyzed_layouts"]:
+        for element in analyzed["layout"]["elements"]:
+            strings.append(element["text"])
+            strings.append(element["html"])
+    return strings + EDGE_CASES
+
+
+def best_of(func, strings, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for string in strings:
+            func(string)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(pages=100, repeat=5):
+    strings = fixture_strings(pages)
+    print(f"합성 논문 {pages}페이지, 문자열 {len(strings)}개 (최소 시간 / {repeat}회)")
+
+    for name, previous, current in [
+        ("제목 판별", previous_heading_tag, _heading_tag),
+        ("줄바꿈 정리", previous_process_html_string, process_html_string),
+    ]:
+        mismatches = [string for string in strings if previous(string) != current(string)]
+        previous_time = best_of(previous, strings, repeat)
+        current_time = best_of(current, strings, repeat)
+        print(
+            f"{name:<8} 기존 {len(strings) / previous_time / 1e6:6.2f}M/s  변경 {len(strings) / current_time / 1e6:6.2f}M/s"
+            f"  결과 일치: {'예' if not mismatches else f'아니오 {mismatches[:5]}'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+그림이 많은 합성 논문으로 크롭 단계를 측정합니다.
+
+    python -m benchmarks.bench_crops
+"""
+import os
+import time
+import shutil
+import tempfile
+import contextlib
+import io
+
+import pymupdf
+
+from benchmarks.fixtures import make_figure_heavy_paper
+from utils.Classes import ImageCropper
+from utils.crops import group_elements_by_page, crop_elements
+
+
+def timed(func, state):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(state)
+    return time.perf_counter() - start
+
+
+def full_page_raster(state):
+    """페이지 전체를 300dpi로 래스터화한 뒤 PIL로 잘라내는 방식 (페이지당 1회 렌더링)"""
+    output_folder = os.path.splitext(state["filepath"])[0]
+    os.makedirs(output_folder, exist_ok=True)
+    pages = group_elements_by_page(state, ["figure", "table", "equation"])
+    for page_num in sorted(pages):
+        pdf_image = ImageCropper.pdf_to_image(state["filepath"], page_num)
+        for element in pages[page_num]:
+            normalized_coordinates = ImageCropper.normalize_coordinates(
+                element["bounding_box"], state["page_metadata"][page_num]["size"]
+            )
+            output_file = os.path.join(output_folder, f"{element['id']}.png")
+            ImageCropper.crop_image(pdf_image, normalized_coordinates, output_file)
+
+
+def raster_bytes(state):
+    """각 방식에서 한 번에 메모리에 올라가는 가장 큰 래스터 크기 (RGB 바이트)"""
+    with pymupdf.open(state["filepath"]) as doc:
+        rect = doc[0].rect
+        full_page = int(rect.width * 300 / 72) * int(rect.height * 300 / 72) * 3
+        largest_clip = 0
+        for elements in group_elements_by_page(state, ["figure", "table", "equation"]).values():
+            for element in elements:
+                x1, y1, x2, y2 = ImageCropper.normalize_coordinates(
+                    element["bounding_box"], state["page_metadata"][element["page"]]["size"]
+                )
+                largest_clip = max(
+                    largest_clip,
+                    int((x2 - x1) * rect.width * 300 / 72) * int((y2 - y1) * rect.height * 300 / 72) * 3,
+                )
+    return full_page, largest_clip
+
+
+def main(repeat=3):
+    folder = tempfile.mkdtemp(prefix="bench_crops_")
+    try:
+        state = make_figure_heavy_paper(folder, pages=24)
+        count = sum(
+            len(elements[key])
+            for elements in state["section_elements"].values()
+            for key in ("image_elements", "table_elements", "equation_elements")
+        )
+        print(f"페이지 {len(state['page_metadata'])}개, 크롭 요소 {count}개")
+
+        for name, func in [("전체 페이지 래스터 + PIL 크롭", full_page_raster), ("영역 렌더링 (crop_elements)", lambda s: crop_elements(s, workers=1))]:
+            best = min(timed(func, state) for _ in range(repeat))
+            print(f"{name:<28} {best:.3f}s")
+
+        full_page, largest_clip = raster_bytes(state)
+        print(f"최대 래스터 크기: 전체 페이지 {full_page / 1e6:.1f}MB, 영역 {largest_clip / 1e6:.1f}MB")
+
+        # 크롭 프로세스 수에 따른 비교 (프로세스 풀 기동 시간 포함, CPU 코어 수 이상은 이득 없음)
+        print(f"CPU 코어 수: {os.cpu_count()}")
+        for workers in (1, 2, 4, 8):
+            best = min(timed(lambda s: crop_elements(s, workers=workers), state) for _ in range(repeat))
+            print(f"crop_elements workers={workers:<2}             {best:.3f}s")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
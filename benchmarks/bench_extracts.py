@@ -0,0 +1,50 @@
+"""
+100페이지 합성 Upstage 레이아웃 결과로 extract_page_elements의 HTML 파서별 처리 시간을 비교합니다
+(lxml vs BeautifulSoup html.parser). 두 파서의 결과가 같은지도 함께 확인합니다.
+
+    python -m benchmarks.bench_extracts
+"""
+import time
+
+from benchmarks.fixtures import make_upstage_layouts
+from utils import extracts
+from utils.config import config
+
+
+def run(backend, state, repeat):
+    config["html_parser"] = backend
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extracts.extract_page_elements(state)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(pages=100, repeat=5):
+    state = make_upstage_layouts(pages=pages)
+    elements = sum(len(analyzed["layout"]["elements"]) for analyzed in state["analyzed_layouts"])
+    print(f"합성 논문 {pages}페이지, 요소 {elements}개 (최소 시간 / {repeat}회)")
+
+    backends = ["html.parser"]
+    if extracts.lxml_html is not None:
+        backends.append("lxml")
+    else:
+        print("lxml이 설치되어 있지 않아 html.parser만 측정합니다.")
+
+    original = config["html_parser"]
+    results = {}
+    try:
+        for backend in backends:
+            elapsed, results[backend] = run(backend, state, repeat)
+            print(f"{backend:<12} {elapsed * 1000:8.1f}ms  ({elapsed / elements * 1e6:.1f}us/요소)")
+    finally:
+        config["html_parser"] = original
+
+    if len(results) == 2:
+        same = dict(results["lxml"]) == dict(results["html.parser"])
+        print(f"결과 일치: {'예' if same else '아니오'}")
+
+
+if __name__ == "__main__":
+    main()
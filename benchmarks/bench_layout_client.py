@@ -0,0 +1,78 @@
+"""
+로컬 스텁 서버로 레이아웃 분석 요청 방식을 비교합니다 (요청마다 새 연결 vs 공용 연결 풀,
+스레드 동시 실행 vs 비동기 동시 실행, 429 + Retry-After 재시도).
+
+    python -m benchmarks.bench_layout_client
+"""
+import io
+import time
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import pymupdf
+
+from benchmarks.stub_upstage import start_stub_server
+from utils.Classes import LayoutAnalyzer
+from utils.funcs import analyze_layout
+
+
+def make_chunks(count):
+    chunks = []
+    for i in range(count):
+        with pymupdf.open() as doc:
+            doc.new_page().insert_text((72, 72), f"chunk {i}")
+            chunks.append({"content": doc.tobytes(), "start_page": i * 10, "end_page": i * 10 + 9})
+    return chunks
+
+
+def bare_requests(base_url, chunks, max_in_flight):
+    """기존 방식: 요청마다 requests.post (세션/재시도 없음)"""
+    def post(chunk):
+        response = requests.post(
+            f"{base_url}/v1/document-ai/layout-analysis",
+            headers={"Authorization": "Bearer stub"},
+            data={"ocr": False},
+            files={"document": ("chunk.pdf", chunk["content"])},
+        )
+        return response.status_code
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        return list(executor.map(post, chunks))
+
+
+def run(name, func, latency=0.05, throttle_every=0):
+    server, base_url, stats = start_stub_server(latency=latency, throttle_every=throttle_every)
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(base_url)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    print(f"{name:<40} {elapsed:6.2f}s  요청 {stats.requests:>3}  연결 {stats.connections:>3}  429 {stats.throttled:>3}")
+    return result
+
+
+def main(chunk_count=32, max_in_flight=4):
+    chunks = make_chunks(chunk_count)
+    state = {"split_chunks": chunks, "batch_size": 10}
+    print(f"청크 {chunk_count}개, 동시 요청 {max_in_flight}개, 스텁 지연 50ms")
+
+    run("requests.post (기존)", lambda url: bare_requests(url, chunks, max_in_flight))
+    run("공용 연결 풀, 순차",
+        lambda url: analyze_layout(LayoutAnalyzer("stub", base_url=url), state, max_in_flight=1))
+    run("공용 연결 풀, 비동기 동시",
+        lambda url: analyze_layout(LayoutAnalyzer("stub", base_url=url), state, max_in_flight=max_in_flight))
+
+    # 4번째 요청마다 429: 기존 방식은 해당 청크가 실패하고, 새 클라이언트는 재시도로 모두 성공
+    statuses = run("requests.post (기존), 429 섞임",
+                   lambda url: bare_requests(url, chunks, max_in_flight), throttle_every=4)
+    print(f"  실패한 청크: {sum(status != 200 for status in statuses)}개")
+    result = run("비동기 동시 + 재시도, 429 섞임",
+                 lambda url: analyze_layout(LayoutAnalyzer("stub", base_url=url), state, max_in_flight=max_in_flight),
+                 throttle_every=4)
+    print(f"  분석된 청크: {len(result['analyzed_layouts'])}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+합성 Upstage 레이아웃 결과(캐시 파일/응답 본문과 같은 JSON 바이트)로
+디코딩 + 메타데이터/요소 추출 시간을 비교합니다.
+
+- 기존: 표준 json 디코딩, extract_page_metadata와 extract_page_elements를 따로 실행 (두 번 순회)
+- 변경: json_codec(orjson) 디코딩, extract_page_layout 한 번 순회
+
+    python -m benchmarks.bench_layout_loader
+"""
+import json
+import time
+
+from benchmarks.fixtures import make_upstage_layouts
+from utils import json_codec
+from utils.extracts import extract_page_layout, extract_page_metadata, extract_page_elements
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(pages=100, repeat=5):
+    state = make_upstage_layouts(pages=pages)
+    # 청크별 분석 결과를 캐시 파일과 같은 JSON 바이트로 준비
+    documents = [
+        (json.dumps(analyzed["layout"], ensure_ascii=False).encode("utf-8"), analyzed["start_page"], analyzed["end_page"])
+        for analyzed in state["analyzed_layouts"]
+    ]
+    size = sum(len(document) for document, _, _ in documents)
+    decoder = "orjson" if json_codec.orjson is not None else "json (orjson 없음)"
+    print(f"합성 논문 {pages}페이지, 청크 {len(documents)}개, JSON {size / 1024:.0f}KB (최소 시간 / {repeat}회)")
+
+    def decode(loads):
+        return [{"layout": loads(document), "start_page": start, "end_page": end} for document, start, end in documents]
+
+    def previous():
+        layouts = {"filepath": state["filepath"], "analyzed_layouts": decode(json.loads)}
+        return {**extract_page_metadata(layouts), **extract_page_elements(layouts)}
+
+    def single_pass():
+        layouts = {"filepath": state["filepath"], "analyzed_layouts": decode(json_codec.loads)}
+        return extract_page_layout(layouts)
+
+    decode_json, _ = best_of(lambda: decode(json.loads), repeat)
+    decode_fast, _ = best_of(lambda: decode(json_codec.loads), repeat)
+    print(f"디코딩  json {decode_json * 1000:7.1f}ms  /  {decoder} {decode_fast * 1000:7.1f}ms")
+
+    previous_time, previous_result = best_of(previous, repeat)
+    single_time, single_result = best_of(single_pass, repeat)
+    print(f"기존 (json + 두 번 순회)      {previous_time * 1000:7.1f}ms")
+    print(f"변경 ({decoder} + 한 번 순회)  {single_time * 1000:7.1f}ms")
+    print(f"결과 일치: {'예' if dict(previous_result) == dict(single_result) else '아니오'}")
+
+
+if __name__ == "__main__":
+    main()
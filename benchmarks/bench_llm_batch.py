@@ -0,0 +1,71 @@
+"""
+초당 요청 한도가 있는 OpenAI 스텁 서버로 LLM 일괄 처리 방식을 비교합니다
+(기본 .batch() vs run_llm_batch의 토큰 버킷 + 429 백오프).
+
+    python -m benchmarks.bench_llm_batch
+"""
+import io
+import time
+import contextlib
+
+from langchain_core.documents import Document
+from langchain_openai import ChatOpenAI
+
+from benchmarks.stub_openai import start_stub_server
+from utils.config import config
+from utils.creates import get_translator
+from utils.rate_limit import run_llm_batch
+
+
+def make_inputs(count):
+    text = "Transformers process sequences with self-attention. " * 40
+    return [{"context": [Document(page_content=f"Section {i}. {text}")]} for i in range(count)]
+
+
+def run(name, func, requests_per_second):
+    server, base_url, stats = start_stub_server(requests_per_second=requests_per_second)
+    try:
+        start = time.perf_counter()
+        log = io.StringIO()
+        error = None
+        with contextlib.redirect_stdout(log):
+            try:
+                func(base_url)
+            except Exception as e:
+                error = e
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    result = f"실패 ({type(error).__name__})" if error else "성공"
+    print(f"{name:<34} {elapsed:6.2f}s  요청 {stats.requests:>3}  429 {stats.throttled:>3}  {result}")
+    for line in log.getvalue().splitlines():
+        if line.startswith("LLM 배치"):
+            print(f"  {line}")
+
+
+def main(count=60, requests_per_second=10):
+    inputs = make_inputs(count)
+    print(f"입력 {count}건, 스텁 한도 {requests_per_second} req/s")
+
+    def chain(base_url, max_retries):
+        llm = ChatOpenAI(model_name="gpt-4o-mini", api_key="stub", base_url=base_url, max_retries=max_retries)
+        return get_translator(llm, "Translate into Korean:\n{context}")
+
+    run(".batch() (기본 동시성, 재시도 2회)",
+        lambda url: chain(url, 2).batch(inputs), requests_per_second)
+
+    # 요청 수 버킷을 스텁 한도에 맞춤 (1초 분량까지 몰아 보내기 허용, 토큰 한도는 넉넉히)
+    config["llm_requests_per_minute"] = requests_per_second * 60
+    config["llm_tokens_per_minute"] = 10 ** 9
+    config["llm_burst_seconds"] = 1
+    run("run_llm_batch (토큰 버킷 + 백오프)",
+        lambda url: run_llm_batch(chain(url, 0), inputs, label="bench", api_key="bench"), requests_per_second)
+
+    # 한도를 모르고 과하게 설정한 경우: 429를 받으면 속도를 줄여 적응
+    config["llm_requests_per_minute"] = requests_per_second * 60 * 5
+    run("run_llm_batch (한도 과대 설정, 적응형)",
+        lambda url: run_llm_batch(chain(url, 0), inputs, label="bench", api_key="bench-over"), requests_per_second)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+영어/한국어 요약 마크다운 생성 시간을 이전 구현과 비교합니다.
+
+- 기존: 언어마다 분석 결과 JSON을 다시 읽고, 섹션마다 이미지/테이블 목록 전체를 훑음 (섹션 수 × 그림 수)
+- 변경: GraphState에서 섹션 → 이미지/테이블 색인을 한 번 만들고 두 언어를 한 번에 생성
+
+    python -m benchmarks.bench_summary_markdown
+"""
+import os
+import json
+import time
+import random
+import tempfile
+
+from pdf_processor import create_summary_markdowns
+
+
+def make_state(sections=200, images=400, tables=150, seed=0):
+    """요약 단계까지 끝난 GraphState와 같은 형태의 합성 데이터"""
+    rng = random.Random(seed)
+    names = [f"{i}. Section {i}" for i in range(sections - 1)] + ["References"]
+    texts_summary = {page: f"summary of section {page} " * 20 for page in range(sections)}
+    return {
+        "section_names": names,
+        "texts_summary": texts_summary,
+        "texts_trans_summary": {page: f"섹션 {page} 요약 " * 20 for page in texts_summary},
+        "paper_summary": "paper summary " * 50,
+        "paper_trans_summary": "논문 요약 " * 50,
+        "image_summary_data_batches": [
+            {"page": rng.randrange(sections), "image": f"paper/images/page_{i}_figure_{i}.png", "text": "..."}
+            for i in range(images)
+        ],
+        "table_summary_data_batches": [
+            {"page": rng.randrange(sections), "table": f"paper/tables/page_{i}_table_{i}.png", "text": "..."}
+            for i in range(tables)
+        ],
+    }
+
+
+def previous_summary(output_file, language):
+    """이전 구현: 분석 결과 JSON을 읽어 언어 하나의 요약 마크다운 생성"""
+    with open(output_file, "r", encoding='utf-8') as f:
+        json_data = json.load(f)
+    markdown_contents = []
+    names = json_data['section_names']
+    for i, page in enumerate(json_data['texts_summary'].keys()):
+        page = int(page)
+        if names[page] == 'References':
+            continue
+        if language == "en":
+            text_summary = json_data['paper_summary'] if i == 0 else json_data['texts_summary'][str(page)]
+            template = '\n ![{}]({}) \n'
+        else:
+            text_summary = json_data['paper_trans_summary'] if i == 0 else json_data['texts_trans_summary'][str(page)]
+            template = '![{}]({})'
+        markdown_contents.append(f'# {names[page]}')
+        markdown_contents.append(text_summary)
+        for image_data in json_data['image_summary_data_batches']:
+            if image_data['page'] == page:
+                img_file = image_data['image']
+                markdown_contents.append(template.format(os.path.basename(img_file).split('.')[-1], img_file))
+        for table_data in json_data['table_summary_data_batches']:
+            if table_data['page'] == page:
+                table_img_file = table_data['table']
+                markdown_contents.append(template.format(os.path.basename(table_img_file).split('.')[-1], table_img_file))
+    return '\n'.join(markdown_contents)
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(repeat=5):
+    state = make_state()
+    with tempfile.TemporaryDirectory() as output_folder:
+        output_file = os.path.join(output_folder, "paper_analy.json")
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        print(f"섹션 {len(state['section_names'])}개, 이미지 {len(state['image_summary_data_batches'])}개, "
+              f"테이블 {len(state['table_summary_data_batches'])}개 (최소 시간 / {repeat}회)")
+
+        previous_time, previous_result = best_of(
+            lambda: (previous_summary(output_file, "en"), previous_summary(output_file, "ko")), repeat)
+        current_time, current_result = best_of(
+            lambda: create_summary_markdowns(state, output_folder, "paper"), repeat)
+
+    print(f"기존 (JSON 두 번 읽기 + 섹션마다 전체 훑기)  {previous_time * 1000:7.1f}ms")
+    print(f"변경 (색인 + 한 번에 생성)                 {current_time * 1000:7.1f}ms")
+    print(f"결과 일치: {'예' if previous_result == current_result else '아니오'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+중복 업로드 시 결과물 버전이 다르면 재사용하지 않고 다시 분석하는지 확인합니다.
+
+- 단계 버전(STAGE_VERSIONS)이 하나만 바뀌어도 결과물 버전(RESULT_VERSION)이 달라지는지
+- 이전 버전으로 완료된 결과물만 있으면 /paper/upload가 새 작업을 등록하는지
+- 현재 버전으로 완료된 결과물이 있으면 재사용하는지
+
+메모리 SQLite와 임시 업로드 폴더를 사용하므로 실제 DB와 파일에는 영향이 없습니다.
+
+    python -m benchmarks.check_dedup_version
+"""
+import sys
+import hashlib
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, get_db
+from models import models
+from routers import paper
+from utils.checkpoint import STAGE_VERSIONS, RESULT_VERSION, result_version
+
+PDF_BYTES = b"%PDF-1.4\n% dedup check\n%%EOF\n"
+
+
+def check(name, ok):
+    print(f"{'통과' if ok else '실패'}  {name}")
+    return ok
+
+
+def main():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    user = models.User(email="dedup@example.com", name="dedup", hashed_password="-", openai_api="sk", upstage_api="up")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    async def current_user(request, session):
+        return session.query(models.User).filter(models.User.id == user_id).first()
+
+    def override_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(paper.router, prefix="/paper")
+    app.dependency_overrides[get_db] = override_db
+    paper.auth_utils.get_current_user_from_cookie = current_user
+    paper.pool.notify = lambda: None
+    paper.UPLOAD_DIR = tempfile.mkdtemp()
+    client = TestClient(app)
+
+    def upload():
+        response = client.post("/paper/upload", files={"file": ("paper.pdf", PDF_BYTES, "application/pdf")})
+        response.raise_for_status()
+        return response.json()
+
+    results = []
+    bumped = {**STAGE_VERSIONS, "text_summary": STAGE_VERSIONS["text_summary"] + 1}
+    results.append(check("단계 버전이 바뀌면 결과물 버전도 바뀜", result_version(bumped) != RESULT_VERSION))
+
+    # 이전 파이프라인으로 완료된 결과물만 있는 경우: 재사용하지 않고 새로 분석
+    content_hash = hashlib.sha256(PDF_BYTES).hexdigest()
+    db.add(models.PaperArtifact(content_hash=content_hash, pipeline_version="1", status="completed",
+                                pdf_path="old.pdf", output_folder="old", ref_count=1, original_content="old"))
+    db.commit()
+    response = upload()
+    jobs = db.query(models.Job).filter(models.Job.paper_id == response["paper_id"]).count()
+    results.append(check("버전이 다른 결과물은 재사용하지 않고 작업 등록", "processing started" in response["message"] and jobs == 1))
+
+    # 현재 버전으로 분석이 끝난 뒤 다시 올리면 재사용
+    db.query(models.PaperArtifact).filter(models.PaperArtifact.pipeline_version == RESULT_VERSION).update(
+        {models.PaperArtifact.status: "completed"})
+    db.commit()
+    response = upload()
+    reused = db.query(models.Paper).filter(models.Paper.id == response["paper_id"]).first()
+    results.append(check("같은 버전의 결과물은 재사용",
+                         "reusing results" in response["message"] and reused.pipeline_version == RESULT_VERSION))
+    db.close()
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,46 @@
+"""
+run_llm_batch가 일시적 서버 오류(5xx)를 재시도하는지 확인합니다.
+ChatOpenAI는 max_retries=0(클라이언트 자체 재시도 없음)으로 만들고, 스텁 서버는 첫 요청에만 502/500/503을 돌려줍니다.
+
+    python -m benchmarks.check_llm_retry
+"""
+import io
+import sys
+import contextlib
+
+from langchain_openai import ChatOpenAI
+
+from benchmarks.stub_openai import start_stub_server
+from utils.config import config
+from utils.creates import get_translator
+from utils.rate_limit import run_llm_batch
+
+
+def check(fail_status, count=3):
+    server, base_url, stats = start_stub_server(latency=0.01, fail_first=1, fail_status=fail_status)
+    try:
+        llm = ChatOpenAI(model_name="gpt-4o-mini", api_key="stub", base_url=base_url, max_retries=0)
+        chain = get_translator(llm, "Translate into Korean:\n{context}")
+        log = io.StringIO()
+        error = None
+        with contextlib.redirect_stdout(log):
+            try:
+                results = run_llm_batch(chain, [{"context": f"text {i}"} for i in range(count)],
+                                        label="retry", api_key=f"retry-{fail_status}")
+            except Exception as e:
+                error = e
+    finally:
+        server.shutdown()
+    ok = error is None and len(results) == count and stats.failed == 1 and stats.requests == count
+    detail = f"오류 {type(error).__name__}" if error else f"성공 응답 {stats.requests}건, 실패 응답 {stats.failed}건"
+    print(f"{'통과' if ok else '실패'}  {fail_status} 한 번 후 성공: {detail}")
+    return ok
+
+
+def main():
+    config["http_backoff_base_seconds"] = 0.05
+    return all([check(status) for status in (502, 500, 503)])
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,82 @@
+"""
+합성 Upstage 레이아웃 결과로 섹션 분할 결과(섹션 이름, 섹션별 요소의 id/카테고리/페이지, HTML 해시)를
+저장된 골든 파일과 비교합니다. 제목/목록 판별 로직을 바꿀 때 결과가 같은지 확인하는 용도입니다.
+
+    python -m benchmarks.check_sections_golden           # 비교
+    python -m benchmarks.check_sections_golden --update  # 골든 파일 갱신
+"""
+import os
+import sys
+import json
+import hashlib
+
+from benchmarks.fixtures import make_upstage_layouts
+from utils import extracts
+from utils.config import config
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "golden", "upstage_sections.json")
+
+# 골든 파일을 만든 합성 데이터 설정 (여러 seed로 제목/목록 패턴을 다양하게)
+FIXTURES = [
+    {"pages": 100, "seed": 0},
+    {"pages": 60, "seed": 1},
+    {"pages": 30, "seed": 2},
+]
+
+
+def summarize(result):
+    """섹션 분할 결과를 비교하기 쉬운 형태로 요약 (HTML은 해시만)"""
+    html = "\n".join(result["html_content"]).encode("utf-8")
+    return {
+        "section_names": result["section_names"],
+        "sections": {
+            str(section_id): [[element["id"], element["category"], element["page"]] for element in elements]
+            for section_id, elements in result["section_elements"].items()
+        },
+        "html_sha256": hashlib.sha256(html).hexdigest(),
+    }
+
+
+def build(backend):
+    config["html_parser"] = backend
+    return {
+        f"pages={fixture['pages']},seed={fixture['seed']}": summarize(
+            extracts.extract_page_layout(make_upstage_layouts(**fixture))
+        )
+        for fixture in FIXTURES
+    }
+
+
+def main(update=False):
+    backends = ["html.parser"] + (["lxml"] if extracts.lxml_html is not None else [])
+    original = config["html_parser"]
+    try:
+        results = {backend: build(backend) for backend in backends}
+    finally:
+        config["html_parser"] = original
+
+    if update:
+        os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+            json.dump(results["html.parser"], f, ensure_ascii=False)
+        print(f"골든 파일 갱신: {GOLDEN_PATH}")
+        return True
+
+    with open(GOLDEN_PATH, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+
+    ok = True
+    for backend, result in results.items():
+        for name, expected in golden.items():
+            actual = result[name]
+            if actual == expected:
+                print(f"{backend:<12} {name:<18} 일치 (섹션 {len(actual['section_names'])}개)")
+                continue
+            ok = False
+            diffs = [key for key in expected if actual.get(key) != expected[key]]
+            print(f"{backend:<12} {name:<18} 불일치: {', '.join(diffs)}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(update="--update" in sys.argv) else 1)
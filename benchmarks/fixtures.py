@@ -0,0 +1,200 @@
+import os
+import random
+
+import pymupdf
+
+# Upstage 레이아웃 분석 결과의 페이지 크기 (픽셀 좌표계)
+UPSTAGE_PAGE_SIZE = [1275, 1650]
+
+
+def _box(x1, y1, x2, y2):
+    return [{"x": x1, "y": y1}, {"x": x2, "y": y1}, {"x": x2, "y": y2}, {"x": x1, "y": y2}]
+
+
+def make_figure_heavy_paper(folder, pages=12, figures_per_page=4, tables_per_page=1, equations_per_page=3, seed=0):
+    """
+    그림/표/수식이 많은 합성 논문 PDF와 크롭 단계에 필요한 GraphState 일부를 만듭니다.
+
+    :return: filepath, page_metadata, section_elements를 포함한 state 딕셔너리
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    pdf_path = os.path.join(folder, "figure_heavy.pdf")
+
+    doc = pymupdf.open()
+    section_elements = {}
+    page_metadata = {}
+    element_id = 0
+    scale_x = 612 / UPSTAGE_PAGE_SIZE[0]
+    scale_y = 792 / UPSTAGE_PAGE_SIZE[1]
+
+    for page_num in range(pages):
+        page = doc.new_page(width=612, height=792)
+        page_metadata[page_num] = {"size": list(UPSTAGE_PAGE_SIZE)}
+        elements = {"text_elements": [], "image_elements": [], "table_elements": [], "equation_elements": []}
+
+        slots = [("figure", "image_elements")] * figures_per_page \
+            + [("table", "table_elements")] * tables_per_page \
+            + [("equation", "equation_elements")] * equations_per_page
+        slot_height = UPSTAGE_PAGE_SIZE[1] // (len(slots) + 1)
+
+        for i, (category, key) in enumerate(slots):
+            y1 = 40 + i * slot_height
+            y2 = y1 + slot_height - 20
+            x1, x2 = 80, UPSTAGE_PAGE_SIZE[0] - 80
+            rect = pymupdf.Rect(x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y)
+            if category == "figure":
+                # 무작위 색 격자로 그림 흉내
+                for gx in range(8):
+                    for gy in range(4):
+                        cell = pymupdf.Rect(
+                            rect.x0 + rect.width * gx / 8, rect.y0 + rect.height * gy / 4,
+                            rect.x0 + rect.width * (gx + 1) / 8, rect.y0 + rect.height * (gy + 1) / 4,
+                        )
+                        page.draw_rect(cell, color=None, fill=(rng.random(), rng.random(), rng.random()))
+            elif category == "table":
+                for row in range(5):
+                    page.insert_text((rect.x0, rect.y0 + 12 * (row + 1)), f"row {row} | {rng.random():.4f} | {rng.random():.4f}")
+                page.draw_rect(rect, color=(0, 0, 0))
+            else:
+                page.insert_text((rect.x0, rect.y0 + 14), f"E_{element_id} = m c^2 + \\sum_i x_i", fontsize=12)
+
+            elements[key].append({
+                "id": element_id,
+                "page": page_num,
+                "category": category,
+                "bounding_box": _box(x1, y1, x2, y2),
+            })
+            element_id += 1
+
+        section_elements[page_num] = elements
+
+    doc.save(pdf_path)
+    doc.close()
+
+    return {
+        "filepath": pdf_path,
+        "page_metadata": page_metadata,
+        "section_elements": section_elements,
+    }
+
+
+_WORDS = ("attention", "encoder", "decoder", "layer", "token", "model", "training", "sequence",
+          "parameter", "embedding", "gradient", "batch", "loss", "head", "dimension", "dataset")
+
+
+def _sentence(rng, words=18):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_upstage_layouts(pages=100, chunk_pages=10, seed=0):
+    """
+    Upstage 레이아웃 분석 응답 형식의 합성 결과를 만듭니다 (extract_page_* 단계 입력용).
+    제목(1./1.1./1.1.1./Abstract), 문단(<br>, 엔티티, 인라인 태그), 캡션, 그림, 표, 수식, 목록, 머리글/바닥글을 섞습니다.
+
+    :return: filepath와 analyzed_layouts(청크별 {"layout", "start_page", "end_page"})를 포함한 state 딕셔너리
+    """
+    rng = random.Random(seed)
+    analyzed_layouts = []
+    section = 0
+    subsection = 0
+
+    for start in range(1, pages + 1, chunk_pages):
+        end = min(start + chunk_pages - 1, pages)
+        elements = []
+        metadata_pages = []
+
+        def add(category, html, text, page):
+            element_id = len(elements)
+            elements.append({
+                "id": element_id,
+                "page": page,
+                "category": category,
+                "html": html.replace("{id}", str(element_id)),
+                "text": text,
+                "bounding_box": _box(80, 40 + 30 * element_id, 1195, 60 + 30 * element_id),
+            })
+
+        for page in range(1, end - start + 2):
+            metadata_pages.append({"page": page, "width": UPSTAGE_PAGE_SIZE[0], "height": UPSTAGE_PAGE_SIZE[1]})
+            add("header", "<header id='{id}' style='font-size:8px'>Synthetic Paper</header>", "Synthetic Paper", page)
+
+            if start == 1 and page == 1:
+                add("heading1", "<h1 id='{id}' style='font-size:22px'>Attention Is All<br>You Need</h1>",
+                    "Attention Is All You Need", page)
+                add("paragraph", "<p id='{id}' data-category='paragraph' style='font-size:14px'>Abstract</p>",
+                    "Abstract", page)
+
+            # 세 페이지마다 새 절, 그 사이에 소절/소소절
+            absolute_page = start + page - 1
+            if absolute_page % 3 == 1:
+                section += 1
+                subsection = 0
+                if rng.random() < 0.5:
+                    add("heading1", f"<h1 id='{{id}}' style='font-size:20px'>{section}. {rng.choice(_WORDS).title()} Methods</h1>",
+                        f"{section}. Methods", page)
+                else:
+                    add("paragraph", f"<p id='{{id}}' data-category='paragraph' style='font-size:18px'>{section}. {rng.choice(_WORDS).title()} &amp; Results</p>",
+                        f"{section}. Results", page)
+            else:
+                subsection += 1
+                add("paragraph", f"<p id='{{id}}' data-category='paragraph' style='font-size:16px'>{section}.{subsection}. {rng.choice(_WORDS).title()}</p>",
+                    f"{section}.{subsection}.", page)
+                if rng.random() < 0.5:
+                    add("paragraph", f"<p id='{{id}}' data-category='paragraph' style='font-size:15px'>{section}.{subsection}.1 Details</p>",
+                        f"{section}.{subsection}.1 Details", page)
+
+            for _ in range(rng.randint(6, 10)):
+                text = " ".join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+                kind = rng.random()
+                if kind < 0.2:
+                    html = f"<p id='{{id}}' data-category='paragraph' style='font-size:14px'>{text[:60]}-<br>{text[60:]}</p>"
+                elif kind < 0.35:
+                    html = f"<p id='{{id}}' data-category='paragraph' style='font-size:14px'>{text[:40]} <b>bold</b> a &lt; b &amp; c {text[40:]}</p>"
+                elif kind < 0.4:
+                    html = f"<p id='{{id}}' data-category='paragraph' style='font-size:14px'>{rng.randint(1, 99)}. {text}</p>"
+                else:
+                    html = f"<p id='{{id}}' data-category='paragraph' style='font-size:14px'>{text}</p>"
+                add("paragraph", html, text, page)
+
+            if rng.random() < 0.7:
+                add("figure", "<figure><img id='{id}' style='font-size:14px' alt=\"Encoder-\nDecoder\narchitecture\" "
+                              "data-coord=\"top-left:(80,300); bottom-right:(1195,900)\" /></figure>", "", page)
+                add("caption", f"<caption id='{{id}}' style='font-size:14px'>Figure {absolute_page}: {_sentence(rng, 10)}</caption>",
+                    f"Figure {absolute_page}", page)
+            if rng.random() < 0.5:
+                rows = "".join(f"<tr><td>{rng.choice(_WORDS)}</td><td>{rng.random():.3f}</td><td>{rng.random():.3f}</td></tr>"
+                               for _ in range(6))
+                add("table", f"<table id='{{id}}' style='font-size:14px'><tr><th>Model</th><th>BLEU</th><th>Cost</th></tr>{rows}</table>",
+                    "table", page)
+                add("caption", f"<caption id='{{id}}' style='font-size:14px'>Table {absolute_page}: results <i>on</i> test</caption>",
+                    f"Table {absolute_page}", page)
+            for _ in range(rng.randint(0, 3)):
+                add("equation", f"<p id='{{id}}' data-category='equation'>$$ x_{rng.randint(1, 9)} &lt; \\sum_i w_i h_i $$</p>",
+                    "equation", page)
+            if rng.random() < 0.4:
+                items = " ".join(f"• {_sentence(rng, 6)}" for _ in range(rng.randint(2, 5)))
+                add("list", f"<p id='{{id}}' data-category='list' style='font-size:14px'>{items[:30]}<br>{items[30:]}</p>", items, page)
+            elif rng.random() < 0.3:
+                items = " ".join(f"[{n}] {_sentence(rng, 8)}" for n in range(1, rng.randint(3, 8)))
+                add("list", f"<p id='{{id}}' data-category='list' style='font-size:14px'>{items}</p>", items, page)
+            if rng.random() < 0.3:
+                add("footnote", f"<p id='{{id}}' data-category='footnote' style='font-size:10px'>{_sentence(rng, 8)}</p>",
+                    "footnote", page)
+            add("footer", f"<footer id='{{id}}' style='font-size:10px'>{absolute_page}</footer>", str(absolute_page), page)
+
+        analyzed_layouts.append({
+            "layout": {
+                "api": "2.0",
+                "model": "synthetic",
+                "metadata": {"pages": metadata_pages},
+                "elements": elements,
+            },
+            "start_page": start,
+            "end_page": end,
+        })
+
+    return {
+        "filepath": "benchmarks/synthetic/upstage_paper.pdf",
+        "analyzed_layouts": analyzed_layouts,
+    }
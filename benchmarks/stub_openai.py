@@ -0,0 +1,106 @@
+"""
+OpenAI Chat Completions API를 흉내 내는 로컬 스텁 서버.
+초당 요청 한도를 넘으면 429 + Retry-After를 돌려주므로 ChatOpenAI(base_url=...)로 속도 제한 동작을 확인합니다.
+"""
+import json
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubStats:
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+        self.recent = deque()
+        self._lock = threading.Lock()
+
+    def fail(self, fail_first):
+        """처음 fail_first건의 요청이면 True (일시적 서버 오류 흉내)"""
+        with self._lock:
+            if self.failed < fail_first:
+                self.failed += 1
+                return True
+            return False
+
+    def admit(self, requests_per_second):
+        """최근 1초 동안의 요청 수가 한도 이내면 True"""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] > 1.0:
+                self.recent.popleft()
+            if requests_per_second and len(self.recent) >= requests_per_second:
+                self.throttled += 1
+                return False
+            self.recent.append(now)
+            return True
+
+
+def start_stub_server(latency=0.05, requests_per_second=0, retry_after="1", completion_tokens=50, fail_first=0,
+                      fail_status=502):
+    """
+    스텁 서버를 백그라운드 스레드에서 시작합니다.
+
+    :param latency: 요청당 응답 지연 (초)
+    :param requests_per_second: 최근 1초 요청 수 한도 (0이면 제한 없음)
+    :param retry_after: 429 응답의 Retry-After 헤더 값
+    :param completion_tokens: 응답마다 보고할 출력 토큰 수
+    :param fail_first: 처음 몇 건의 요청에 fail_status로 응답할지 (일시적 서버 오류)
+    :param fail_status: 일시적 서버 오류 상태 코드
+    :return: (server, base_url, stats) — base_url은 ChatOpenAI(base_url=...)에 전달
+    """
+    stats = StubStats()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if stats.fail(fail_first):
+                self._send(fail_status, {"error": {"message": "Bad gateway", "type": "server_error", "code": None}})
+                return
+            if not stats.admit(requests_per_second):
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                           {"Retry-After": retry_after})
+                return
+            time.sleep(latency)
+            prompt_tokens = len(json.dumps(request["messages"])) // 4
+            self._send(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "stub answer"},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", stats
@@ -0,0 +1,87 @@
+"""
+Upstage 레이아웃 분석 API를 흉내 내는 로컬 스텁 서버.
+LayoutAnalyzer(base_url=...)에 주소를 넘겨 네트워크 없이 연결 재사용, 재시도를 확인합니다.
+"""
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_LAYOUT = {
+    "metadata": {"pages": [{"page": 1, "width": 1275, "height": 1650}]},
+    "elements": [],
+}
+
+
+class StubStats:
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.throttled = 0
+        self.documents = set()
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            return getattr(self, name)
+
+    def new_document(self, body):
+        """처음 보는 문서면 몇 번째 새 문서인지, 재시도(같은 PDF)면 0을 반환"""
+        # multipart 경계 문자열은 요청마다 달라지므로 PDF 부분만 해시
+        digest = hashlib.sha256(body[body.find(b"%PDF"):body.rfind(b"%%EOF")]).hexdigest()
+        with self._lock:
+            if digest in self.documents:
+                return 0
+            self.documents.add(digest)
+            return len(self.documents)
+
+
+def start_stub_server(latency=0.05, throttle_every=0, retry_after="0"):
+    """
+    스텁 서버를 백그라운드 스레드에서 시작합니다.
+
+    :param latency: 요청당 응답 지연 (초)
+    :param throttle_every: N번째 새 문서의 첫 요청마다 429 + Retry-After 응답 (0이면 항상 성공)
+    :param retry_after: 429 응답의 Retry-After 헤더 값
+    :return: (server, base_url, stats) — 끝나면 server.shutdown() 호출
+    """
+    stats = StubStats()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        wbufsize = -1  # 헤더와 본문을 한 번에 전송
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            stats.count("connections")
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            stats.count("requests")
+            document = stats.new_document(body)
+            time.sleep(latency)
+            if throttle_every and document and (document - 1) % throttle_every == 0:
+                stats.count("throttled")
+                self._send(429, b'{"error": "rate limited"}', {"Retry-After": retry_after})
+                return
+            self._send(200, json.dumps(STUB_LAYOUT).encode())
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", stats
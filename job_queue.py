@@ -0,0 +1,242 @@
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+import progress_events
+from database import SessionLocal
+from models import models
+from utils.config import config
+
+
+def enqueue_job(db: Session, paper_id: int, payload: dict) -> models.Job:
+    """논문 처리 작업을 jobs 테이블에 등록"""
+    job = models.Job(
+        paper_id=paper_id,
+        state="queued",
+        payload=json.dumps(payload),
+        attempts=0,
+        max_attempts=config["job_max_attempts"],
+        available_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_job(worker_id: str) -> Optional[dict]:
+    """
+    실행 가능한 작업 하나를 원자적으로 점유합니다.
+
+    state='queued' 조건을 건 UPDATE의 영향 행 수로 점유 성공 여부를 판단하므로
+    여러 디스패처가 동시에 호출해도 한 작업은 한 워커만 가져갑니다.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        candidates = (
+            db.query(models.Job.id)
+            .filter(models.Job.state == "queued", models.Job.available_at <= now)
+            .order_by(models.Job.available_at, models.Job.id)
+            .limit(5)
+            .all()
+        )
+        for (job_id,) in candidates:
+            claimed = (
+                db.query(models.Job)
+                .filter(models.Job.id == job_id, models.Job.state == "queued")
+                .update(
+                    {
+                        models.Job.state: "running",
+                        models.Job.attempts: models.Job.attempts + 1,
+                        models.Job.worker_id: worker_id,
+                        models.Job.heartbeat_at: now,
+                        models.Job.lease_expires_at: now + timedelta(seconds=config["job_lease_seconds"]),
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if claimed:
+                job = db.query(models.Job).filter(models.Job.id == job_id).first()
+                return {
+                    "id": job.id,
+                    "paper_id": job.paper_id,
+                    "attempts": job.attempts,
+                    "worker_id": worker_id,
+                    "payload": json.loads(job.payload),
+                }
+        return None
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def heartbeat_job(job_id: int, worker_id: str) -> bool:
+    """작업 점유(lease)를 연장. 점유를 잃었으면 False 반환"""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        updated = (
+            db.query(models.Job)
+            .filter(
+                models.Job.id == job_id,
+                models.Job.state == "running",
+                models.Job.worker_id == worker_id,
+            )
+            .update(
+                {
+                    models.Job.heartbeat_at: now,
+                    models.Job.lease_expires_at: now + timedelta(seconds=config["job_lease_seconds"]),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return bool(updated)
+    except Exception as e:
+        db.rollback()
+        print(f"Error updating job heartbeat: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def complete_job(job_id: int, worker_id: str):
+    """작업 완료 처리"""
+    db = SessionLocal()
+    try:
+        db.query(models.Job).filter(
+            models.Job.id == job_id,
+            models.Job.state == "running",
+            models.Job.worker_id == worker_id,
+        ).update(
+            {
+                models.Job.state: "done",
+                models.Job.lease_expires_at: None,
+                models.Job.finished_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error completing job: {e}")
+    finally:
+        db.close()
+
+
+def retry_delay(attempts: int) -> float:
+    """재시도 대기 시간 (지수 백오프)"""
+    delay = config["job_retry_backoff_seconds"] * (2 ** max(attempts - 1, 0))
+    return min(delay, config["job_retry_backoff_max_seconds"])
+
+
+def _fail_or_retry(db: Session, job: models.Job, error_message: str, now: datetime) -> bool:
+    """시도 횟수가 남았으면 백오프 후 재등록, 아니면 작업과 Paper를 실패 처리 (최종 실패면 True)"""
+    job.last_error = error_message
+    job.lease_expires_at = None
+    job.worker_id = None
+    if job.attempts < job.max_attempts:
+        job.state = "queued"
+        job.available_at = now + timedelta(seconds=retry_delay(job.attempts))
+        print(f"Job {job.id} 재시도 예정 ({job.attempts}/{job.max_attempts}): {error_message}")
+        return False
+
+    job.state = "failed"
+    job.finished_at = now
+    paper = db.query(models.Paper).filter(models.Paper.id == job.paper_id).first()
+    if paper:
+        paper.processing_status = "failed"
+        paper.error_message = error_message
+    return True
+
+
+def fail_job(job_id: int, worker_id: str, error_message: str):
+    """작업 실패 처리 (재시도 또는 최종 실패)"""
+    db = SessionLocal()
+    try:
+        job = db.query(models.Job).filter(
+            models.Job.id == job_id,
+            models.Job.state == "running",
+            models.Job.worker_id == worker_id,
+        ).first()
+        if job:
+            failed = _fail_or_retry(db, job, error_message, datetime.utcnow())
+            db.commit()
+            if failed:
+                progress_events.publish(job.paper_id, "failed", error_message=error_message)
+    except Exception as e:
+        db.rollback()
+        print(f"Error failing job: {e}")
+    finally:
+        db.close()
+
+
+def requeue_expired_jobs() -> int:
+    """점유 기간이 만료된 running 작업을 다시 대기열로 돌려놓음 (서버 재시작 복구)"""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        expired = db.query(models.Job).filter(
+            models.Job.state == "running",
+            models.Job.lease_expires_at < now,
+        ).all()
+        error_message = "작업 점유가 만료되었습니다 (워커 중단)"
+        failed = [job.paper_id for job in expired if _fail_or_retry(db, job, error_message, now)]
+        db.commit()
+        for paper_id in failed:
+            progress_events.publish(paper_id, "failed", error_message=error_message)
+        if expired:
+            print(f"만료된 작업 {len(expired)}건을 복구했습니다.")
+        return len(expired)
+    except Exception as e:
+        db.rollback()
+        print(f"Error requeueing expired jobs: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def cleanup_jobs() -> int:
+    """보관 기간이 지난 완료/실패 작업 삭제"""
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=config["job_retention_days"])
+        deleted = db.query(models.Job).filter(
+            models.Job.state.in_(["done", "failed"]),
+            models.Job.finished_at < cutoff,
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    except Exception as e:
+        db.rollback()
+        print(f"Error cleaning up jobs: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def count_queued_jobs() -> int:
+    """대기 중인 작업 수"""
+    db = SessionLocal()
+    try:
+        return db.query(models.Job).filter(models.Job.state == "queued").count()
+    finally:
+        db.close()
+
+
+def get_user_api_keys(user_id: int) -> dict:
+    """작업 실행 시점에 사용자 API 키 조회 (jobs 테이블에는 키를 저장하지 않음)"""
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if not user:
+            return {"openai_api_key": None, "upstage_api_key": None}
+        return {"openai_api_key": user.openai_api, "upstage_api_key": user.upstage_api}
+    finally:
+        db.close()
@@ -6,12 +6,14 @@ from sqlalchemy.orm import Session
 from pathlib import Path
 
 from models import models
-from database import engine, get_db
+from database import engine, get_db, add_missing_columns
 from routers import auth, user, paper
 import auth as auth_utils
+from worker_pool import pool
 
 # 데이터베이스 테이블 생성 (이미 존재하면 무시)
 models.Base.metadata.create_all(bind=engine)
+add_missing_columns()
 
 app = FastAPI(title="LLM Paper Review for Arobot")
 
@@ -21,6 +23,16 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # 템플릿 설정
 templates = Jinja2Templates(directory="templates")
 
+@app.on_event("startup")
+def start_worker_pool():
+    """논문 분석 워커 풀 시작 (모듈 사전 로드 포함)"""
+    pool.start()
+
+@app.on_event("shutdown")
+def stop_worker_pool():
+    """논문 분석 워커 풀 종료"""
+    pool.shutdown()
+
 # 각 기능별 라우터 포함
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(user.router, prefix="/user", tags=["user"])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -31,7 +31,51 @@ class Paper(Base):
     pdf_path = Column(String, nullable=True)
     processing_status = Column(String, nullable=True)  # 처리 상태 필드 추가 (processing, completed, failed)
     error_message = Column(Text, nullable=True)        # 오류 메시지 필드 추가
+    stage = Column(String, nullable=True)              # 마지막으로 완료된 분석 단계 (queued, ..., completed)
+    progress = Column(Float, nullable=True)            # 분석 진행률 (0.0 ~ 1.0)
+    content_hash = Column(String, nullable=True, index=True)  # PDF 내용 SHA-256 (중복 업로드 확인용)
+    pipeline_version = Column(String, nullable=True)          # 분석에 사용된 파이프라인 버전
+    artifact_id = Column(Integer, ForeignKey("paper_artifacts.id"), nullable=True)  # 공유 분석 결과물
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    user = relationship("User", back_populates="papers")
\ No newline at end of file
+    user = relationship("User", back_populates="papers")
+    artifact = relationship("PaperArtifact", back_populates="papers")
+
+class PaperArtifact(Base):
+    __tablename__ = "paper_artifacts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, index=True)       # PDF 내용 SHA-256
+    pipeline_version = Column(String)               # 파이프라인 버전
+    status = Column(String, default="processing")   # 분석 상태 (processing, completed)
+    pdf_path = Column(String)                       # 공유 PDF 경로
+    output_folder = Column(String)                  # 공유 분석 결과물 폴더 (이미지, 마크다운 등)
+    ref_count = Column(Integer, default=0)          # 이 결과물을 참조하는 Paper 수
+    original_content = Column(Text, nullable=True)  # 분석 결과 (사용자 수정 전 원본)
+    english_summary = Column(Text, nullable=True)
+    translation = Column(Text, nullable=True)
+    korean_summary = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    papers = relationship("Paper", back_populates="artifact")
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    paper_id = Column(Integer, ForeignKey("papers.id"), index=True)
+    state = Column(String, index=True, default="queued")  # 작업 상태 (queued, running, done, failed)
+    payload = Column(Text)                                 # 작업 인자 (JSON)
+    attempts = Column(Integer, default=0)                  # 시도 횟수
+    max_attempts = Column(Integer, default=3)              # 최대 시도 횟수
+    available_at = Column(DateTime, index=True)            # 이 시각 이후에 실행 가능 (재시도 백오프)
+    lease_expires_at = Column(DateTime, nullable=True)     # 워커 점유 만료 시각
+    heartbeat_at = Column(DateTime, nullable=True)         # 마지막 하트비트 시각
+    worker_id = Column(String, nullable=True)              # 작업을 점유한 워커
+    last_error = Column(Text, nullable=True)               # 마지막 오류 메시지
+    finished_at = Column(DateTime, nullable=True)          # 완료/실패 시각
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    paper = relationship("Paper")
@@ -5,18 +5,74 @@ import json
 import argparse
 from markdownify import markdownify as markdown
 
-from utils.Classes import GraphState, LayoutAnalyzer
+from utils.Classes import GraphState, LayoutAnalyzer, LayoutCache
 from utils.funcs import *
 from utils.extracts import *
 from utils.crops import *
 from utils.creates import *
-from utils.save import save_results
+from utils.save import save_results, html_to_markdown
 from utils.vectordb import build_db
+from utils.dag import Stage, run_stages, format_report
+from utils.checkpoint import Checkpointer, PIPELINE_VERSION, run_step
+from utils.llm_cache import get_llm_cache
+from utils.rate_limit import run_llm_batch
+from utils.packing import pack_texts
+from langchain_core.globals import set_llm_cache
+from utils.config import config
 from utils.prompt import summary_prompt, map_prompt, trans_prompt
 
+import progress_events
+
 from dotenv import load_dotenv
 load_dotenv()
 
+# 분석 단계별 진행률 (요약/번역 단계들은 original_content ~ summaries 구간을 완료된 단계 수만큼 나눠 가짐)
+STAGE_PROGRESS = {
+    "queued": 0.0,
+    "split_pdf": 0.05,
+    "analyze_layout": 0.25,
+    "crop_elements": 0.35,
+    "original_content": 0.4,
+    "summaries": 0.9,
+    "save_analysis_results": 0.92,
+    "english_summary": 0.95,
+    "korean_summary": 0.98,
+    "completed": 1.0,
+}
+
+# 단계가 끝나는 즉시 공개할 수 있는 결과 필드
+PUBLISHED_FIELDS = ("original_content", "english_summary", "translation", "korean_summary")
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def publish_progress(paper_id: int, stage: str, progress: float, **fields):
+    """
+    완료된 단계와 진행률, 그 단계에서 완성된 결과(original_content 등)를 Paper 레코드에 바로 반영합니다.
+    분석이 끝나기 전에도 /paper/data에서 부분 결과를 볼 수 있습니다.
+    """
+    from database import SessionLocal
+    from models import models
+    values = {"stage": stage, "progress": progress}
+    values.update({key: value for key, value in fields.items() if key in PUBLISHED_FIELDS})
+    db = SessionLocal()
+    try:
+        # 본문 컬럼을 읽어오지 않도록 UPDATE 문 하나로 반영
+        db.query(models.Paper).filter(models.Paper.id == paper_id).update(values, synchronize_session=False)
+        db.commit()
+        print(f"Paper id {paper_id} 진행 상황: {stage} ({progress:.0%})")
+        progress_events.publish(paper_id, "processing", stage=stage, progress=progress,
+                                available=[key for key in values if key in PUBLISHED_FIELDS])
+    except Exception as e:
+        db.rollback()
+        print(f"Error publishing paper progress: {e}")
+    finally:
+        db.close()
+
+
 # DB 업데이트 함수: Paper 모델의 상태와 분석 결과 업데이트
 def update_paper_status(paper_id: int, original_content: str, english_summary: str, translation: str, korean_summary: str):
     from database import SessionLocal
@@ -26,12 +82,25 @@ def update_paper_status(paper_id: int, original_content: str, english_summary: s
         paper = db.query(models.Paper).filter(models.Paper.id == paper_id).first()
         if paper:
             paper.processing_status = "completed"
+            paper.stage = "completed"
+            paper.progress = STAGE_PROGRESS["completed"]
             paper.original_content = original_content
             paper.english_summary = english_summary
             paper.translation = translation
             paper.korean_summary = korean_summary
+            # 같은 PDF를 다시 업로드하면 재사용할 수 있도록 공유 결과물도 완료 처리
+            if paper.artifact:
+                paper.artifact.status = "completed"
+                paper.artifact.original_content = original_content
+                paper.artifact.english_summary = english_summary
+                paper.artifact.translation = translation
+                paper.artifact.korean_summary = korean_summary
             db.commit()
             print(f"Paper id {paper_id} 상태가 'completed'로 업데이트되었습니다.")
+            contents = dict(original_content=original_content, english_summary=english_summary,
+                            translation=translation, korean_summary=korean_summary)
+            progress_events.publish(paper_id, "completed", stage="completed", progress=STAGE_PROGRESS["completed"],
+                                    available=[field for field in PUBLISHED_FIELDS if contents[field]])
         else:
             print(f"Paper record with id {paper_id} not found.")
     except Exception as e:
@@ -41,121 +110,135 @@ def update_paper_status(paper_id: int, original_content: str, english_summary: s
         db.close()
 
 
-def split_and_update(state):
+def split_and_update(state, checkpointer=None):
     """PDF 파일을 분할하고 상태를 업데이트"""
-    split_file_list = split_pdf(state)
-    state.update(split_file_list)
-    return state
+    return run_step(checkpointer, "split_pdf", split_pdf, state, inputs=["filepath", "batch_size"])
 
 
-def paper_analysis(analyzer, state):
-    """논문 레이아웃 분석 및 요소 추출"""
+def paper_analysis(analyzer, state, checkpointer=None, on_progress=None):
+    """논문 레이아웃 분석 및 요소 추출 (on_progress(stage)로 주요 단계 완료를 알림)"""
     # 레이아웃 분석
-    state_out = analyze_layout(analyzer, state)
-    state.update(state_out)
-    
-    # 메타데이터 및 요소 추출
-    state_out = extract_page_metadata(state)
-    state.update(state_out)
-    
-    state_out = extract_page_elements(state)
-    state.update(state_out)
+    state = run_step(checkpointer, "analyze_layout", lambda s: analyze_layout(analyzer, s), state,
+                     inputs=["split_chunks"])
+    if on_progress is not None:
+        on_progress("analyze_layout")
     
-    state_out = extract_tag_elements_per_page(state)
-    state.update(state_out)
+    # 메타데이터 및 요소 추출 (레이아웃 분석 결과를 한 번만 순회)
+    state = run_step(checkpointer, "extract_page_layout", extract_page_layout, state,
+                     inputs=["analyzed_layouts"])
     
-    state_out = page_numbers(state)
-    state.update(state_out)
+    state = run_step(checkpointer, "extract_tag_elements_per_page", extract_tag_elements_per_page, state,
+                     inputs=["section_elements"])
     
-    # 이미지, 테이블, 수식 추출
-    state_out = crop_image(state)
-    state.update(state_out)
+    state = run_step(checkpointer, "page_numbers", page_numbers, state,
+                     inputs=["section_elements"])
     
-    state_out = crop_table(state)
-    state.update(state_out)
-
-    state_out = crop_equation(state)
-    state.update(state_out)
+    # 이미지, 테이블, 수식 추출 (페이지별로 한 번만 렌더링)
+    state = run_step(checkpointer, "crop_elements", crop_elements, state,
+                     inputs=["section_elements", "page_metadata"])
+    if on_progress is not None:
+        on_progress("crop_elements")
 
     # 텍스트 추출
-    state_out = extract_page_text(state)
-    state.update(state_out)
+    state = run_step(checkpointer, "extract_page_text", extract_page_text, state,
+                     inputs=["section_elements"])
     
     return state
 
 
-def generate_summaries(state, text_summary_chain, paper_summary_chain, trans_chain):
-    """요약 및 번역 생성"""
-    # 텍스트 요약 생성
-    state_out = create_text_summary(text_summary_chain, state)
-    state.update(state_out)
-
-    state_out = map_reduce_summary(paper_summary_chain, state)
-    state.update(state_out)
-
-    # 요약 번역
-    state_out = create_text_trans_summary(trans_chain, state)
-    state.update(state_out)
-
-    # 이미지 요약 생성
-    state_out = create_image_summary_data_batches(state)
-    state.update(state_out)
+def generate_summaries(state, text_summary_chain, paper_summary_chain, trans_chain, output_folder, filename, checkpointer=None,
+                       on_stage_done=None):
+    """
+    요약 및 번역 생성 (서로 독립적인 단계는 동시에 실행)
+    on_stage_done(name, delta, fraction)은 단계가 끝날 때마다 완료된 단계 비율과 함께 호출됩니다.
+    """
+    stages = [
+        # 텍스트 요약 생성
+        Stage("text_summary", lambda s: create_text_summary(text_summary_chain, s),
+              inputs=["texts"], outputs=["texts_summary"]),
+        Stage("paper_summary", lambda s: map_reduce_summary(paper_summary_chain, s),
+              inputs=["texts_summary"], outputs=["paper_summary"]),
+        # 요약 번역
+        Stage("text_trans_summary", lambda s: create_text_trans_summary(trans_chain, s),
+              inputs=["texts_summary", "paper_summary"], outputs=["texts_trans_summary", "paper_trans_summary"]),
+        # 이미지 요약 생성
+        Stage("image_summary_data_batches", create_image_summary_data_batches,
+              inputs=["texts_summary", "section_elements", "images"], outputs=["image_summary_data_batches"]),
+        Stage("image_summary", create_image_summary,
+              inputs=["image_summary_data_batches"], outputs=["images_summary"]),
+        # 테이블 요약 생성
+        Stage("table_summary_data_batches", create_table_summary_data_batches,
+              inputs=["texts_summary", "section_elements", "tables"], outputs=["table_summary_data_batches"]),
+        Stage("table_summary", create_table_summary,
+              inputs=["table_summary_data_batches"], outputs=["tables_summary"]),
+        # 수식 요약 생성
+        Stage("equation_summary_data_batches", create_equation_summary_data_batches,
+              inputs=["texts_summary", "section_elements", "equation"], outputs=["equation_summary_data_batches"]),
+        Stage("equation_summary", create_equation_summary,
+              inputs=["equation_summary_data_batches"], outputs=["equation_summary"]),
+        # 테이블 마크다운 생성
+        Stage("table_markdown", create_table_markdown,
+              inputs=["table_summary_data_batches"], outputs=["table_markdown"]),
+        # 통번역 (수식 결과만 있으면 이미지/테이블 단계와 겹쳐서 실행 가능)
+        Stage("translated_markdown", lambda s: create_translated_markdown(trans_chain, s, output_folder, filename),
+              inputs=["html_content", "equation_summary"], outputs=["translated_markdown"]),
+    ]
+
+    completed = []
+
+    def stage_done(name, delta):
+        completed.append(name)
+        if on_stage_done is not None:
+            on_stage_done(name, delta, len(completed) / len(stages))
+
+    state, report = run_stages(stages, state, max_workers=config["summary_max_parallel_stages"],
+                               on_stage_done=stage_done, checkpointer=checkpointer)
+    print(format_report(report))
 
-    state_out = create_image_summary(state)
-    state.update(state_out)
-
-    # 테이블 요약 생성
-    state_out = create_table_summary_data_batches(state)
-    state.update(state_out)
-
-    state_out = create_table_summary(state)
-    state.update(state_out)
-
-    # 수식 요약 생성
-    state_out = create_equation_summary_data_batches(state)
-    state.update(state_out)
-
-    state_out = create_equation_summary(state)
-    state.update(state_out)
+    return state
 
-    # 테이블 마크다운 생성
-    state_out = create_table_markdown(state)
-    state.update(state_out)
 
-    return state
+def insert_equation_html(html_content, equation_summary):
+    """수식 이미지 처리: HTML 콘텐츠 내 적절한 위치에 수식 결과 삽입"""
+    html_content = list(html_content)
+    cnt = 1
+    for key, value in equation_summary.items():
+        equation_html = f"<p id='{key}_1' data-category='equation' style='font-size:14px'>{value}</p>"
+        html_content.insert(cnt + int(key), equation_html)
+        cnt += 1
+    return html_content
 
 
 def save_analysis_results(state, output_folder, filename):
     """분석 결과 저장"""
     # 수식 이미지 처리: HTML 콘텐츠 내 적절한 위치에 수식 결과 삽입
-    cnt = 1
-    for key, value in state['equation_summary'].items():
-        equation_html = f"<p id='{key}_1' data-category='equation' style='font-size:14px'>{value}</p>"
-        state['html_content'].insert(cnt + int(key), equation_html)
-        cnt += 1
+    html_content = insert_equation_html(state['html_content'], state['equation_summary'])
 
     # 생성 내용 저장 (HTML → Markdown 변환)
-    md_output_file = save_results(output_folder, filename, state['html_content'])
+    md_output_file = save_results(output_folder, filename, html_content)
     print(f"기본 마크다운 파일: {md_output_file}")
     
-    # 분석결과 JSON 저장
+    # 분석결과 JSON 저장 (메모리에만 두는 PDF 청크와 레이아웃 원본은 제외)
     output_file = f"{output_folder}/{filename}_analy.json"
+    analysis = {key: value for key, value in state.items() if key not in ("split_chunks", "analyzed_layouts")}
     with open(output_file, "w", encoding='utf-8') as file:
-        json.dump(state, file, ensure_ascii=False)
+        json.dump({**analysis, "html_content": html_content}, file, ensure_ascii=False)
     print(f"분석 결과 JSON 파일: {output_file}")
-
-    # 임시 파일 제거
-    for del_file in state['split_filepaths'] + state['analyzed_files']:
-        os.remove(del_file)
         
-    return output_file
+    return GraphState(html_content=html_content, analysis_file=output_file, original_markdown=md_output_file)
 
 
-def create_translated_markdown(trans_chain, output_folder, filename):
+def create_translated_markdown(trans_chain, state, output_folder, filename):
     """통번역 결과 마크다운 생성"""
-    original_paper_md = f"{output_folder}/{filename}.md"
-    new_docs = load_and_split(original_paper_md)
-    translated_paragraph = ['# ' + new_docs[0].metadata['Header 1']] + trans_chain.batch(new_docs[1:])
+    # 수식 결과가 삽입된 원본 마크다운을 메모리에서 만들어 헤더 단위로 분할하여 번역
+    html_content = insert_equation_html(state['html_content'], state['equation_summary'])
+    _, original_paper_md = html_to_markdown(html_content)
+    new_docs = split_markdown(original_paper_md)
+    # 작은 섹션은 묶고 큰 섹션은 나눠 토큰 예산에 맞춘 뒤 순서대로 번역 결과를 이어 붙임
+    packed = pack_texts([doc.page_content for doc in new_docs[1:]], config["translation_pack_tokens"])
+    print(f"번역 요청: 섹션 {len(new_docs) - 1}개 → {len(packed)}건")
+    translated_paragraph = ['# ' + new_docs[0].metadata['Header 1']] + \
+        run_llm_batch(trans_chain, packed, label="translated_markdown")
     combined_content = "\n".join(translated_paragraph)
     md_output = markdown(combined_content)
 
@@ -164,105 +247,63 @@ def create_translated_markdown(trans_chain, output_folder, filename):
         f.write(md_output)
 
     print(f"번역된 마크다운 파일: {trans_paper_md}")
-    return trans_paper_md
+    return GraphState(translated_markdown=trans_paper_md)
 
 
-def create_english_summary(output_file, output_folder, filename):
-    """영어 요약 마크다운 생성"""
-    with open(output_file, "r", encoding='utf-8') as f:
-        json_data = json.load(f)
-        
-    markdown_contents = []
-    
-    names = json_data['section_names']
-    for i, page in enumerate(json_data['texts_summary'].keys()):
-        page = int(page)
-        if names[page] == 'References':
-            continue
-            
-        text_summary = json_data['texts_summary'][str(page)]
-        section_title = f'# {names[page]}'
-        if i == 0:
-            text_summary = json_data['paper_summary']
-        
-        markdown_contents.append(section_title)
-        markdown_contents.append(text_summary)
-        
-        # 이미지 추가
-        for image_data in json_data['image_summary_data_batches']:
-            if image_data['page'] == page:
-                img_file = image_data['image'] # .split('/')[-1]
-                img_name = os.path.basename(img_file).split('.')[-1]
-                markdown_contents.append(f'\n ![{img_name}]({img_file}) \n')
-                
-        # 테이블 추가
-        for table_data in json_data['table_summary_data_batches']:
-            if table_data['page'] == page:
-                table_img_file = table_data['table'] # .split('/')[-1]
-                table_img_name = os.path.basename(table_img_file).split('.')[-1]
-                markdown_contents.append(f'\n ![{table_img_name}]({table_img_file}) \n')
-
-    markdown_file_path = f'{output_folder}/{filename}_summary_en.md'
-    with open(markdown_file_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(markdown_contents))
-    
-    print(f"영어 요약 마크다운 파일: {markdown_file_path}")
-    return markdown_file_path
+def build_page_media_index(state):
+    """섹션(페이지) 번호 → 그 섹션의 이미지 파일 경로들 다음에 테이블 파일 경로들 (요약 마크다운 생성용 색인)"""
+    media = {}
+    for image_data in state['image_summary_data_batches']:
+        media.setdefault(image_data['page'], []).append(image_data['image'])
+    for table_data in state['table_summary_data_batches']:
+        media.setdefault(table_data['page'], []).append(table_data['table'])
+    return media
 
 
-def create_korean_summary(output_file, output_folder, filename):
-    """한국어 요약 마크다운 생성"""
-    with open(output_file, "r", encoding='utf-8') as f:
-        json_data = json.load(f)
-        
-    markdown_contents = []
-    names = json_data['section_names']
-    
-    for i, page in enumerate(json_data['texts_summary'].keys()):
-        page = int(page)
+def create_summary_markdowns(state, output_folder, filename):
+    """
+    영어/한국어 요약 마크다운을 GraphState에서 한 번에 생성 (분석 결과 JSON을 다시 읽지 않음)
+    섹션마다 요약 뒤에 해당 섹션의 이미지와 테이블을 붙이며, 첫 섹션은 논문 전체 요약으로 대신합니다.
+
+    :return: (영어 요약 마크다운, 한국어 요약 마크다운)
+    """
+    media = build_page_media_index(state)
+    names = state['section_names']
+    english_contents = []
+    korean_contents = []
+
+    for i, (key, text_summary) in enumerate(state['texts_summary'].items()):
+        page = int(key)
         if names[page] == 'References':
             continue
-            
+
+        section_title = f'# {names[page]}'
         if i == 0:
-            text_summary = json_data['paper_trans_summary']
+            english_contents += [section_title, state['paper_summary']]
+            korean_contents += [section_title, state['paper_trans_summary']]
         else:
-            text_summary = json_data['texts_trans_summary'][str(page)]
-            
-        section_title = f'# {names[page]}'
-        
-        markdown_contents.append(section_title)
-        markdown_contents.append(text_summary)
-        
-        # 이미지 추가
-        for image_data in json_data['image_summary_data_batches']:
-            if image_data['page'] == page:
-                img_file = image_data['image'] # .split('/')[-1]
-                img_name = os.path.basename(img_file).split('.')[-1]
-                markdown_contents.append(f'![{img_name}]({img_file})')
-        
-        # 테이블 추가        
-        for table_data in json_data['table_summary_data_batches']:
-            if table_data['page'] == page:
-                table_img_file = table_data['table'] # .split('/')[-1]
-                table_img_name = os.path.basename(table_img_file).split('.')[-1]
-                markdown_contents.append(f'![{table_img_name}]({table_img_file})')
-
-    markdown_file_path = f'{output_folder}/{filename}_summary_ko.md'
-    with open(markdown_file_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(markdown_contents))
-    
-    print(f"한국어 요약 마크다운 파일: {markdown_file_path}")
-    return markdown_file_path
+            english_contents += [section_title, text_summary]
+            korean_contents += [section_title, state['texts_trans_summary'][key]]
 
+        # 이미지/테이블 추가
+        for img_file in media.get(page, ()):
+            img_name = os.path.basename(img_file).split('.')[-1]
+            english_contents.append(f'\n ![{img_name}]({img_file}) \n')
+            korean_contents.append(f'![{img_name}]({img_file})')
 
-def main(args):
-    # 인자에서 PDF 파일 경로, 모델 이름, API 키 받아오기
-    file_path = args.file_path
-    selected_model = args.model
-    openai_api_key = args.openai_api
-    upstage_api_key = args.upstage_api
-    paper_id = args.paper_id
-    
+    english_summary = '\n'.join(english_contents)
+    korean_summary = '\n'.join(korean_contents)
+    for language, content in (("en", english_summary), ("ko", korean_summary)):
+        markdown_file_path = f'{output_folder}/{filename}_summary_{language}.md'
+        with open(markdown_file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"요약 마크다운 파일: {markdown_file_path}")
+
+    return english_summary, korean_summary
+
+
+def process_paper(file_path: str, selected_model: str, openai_api_key: str, upstage_api_key: str, paper_id: int):
+    """PDF 한 편에 대한 전체 분석 파이프라인 (CLI와 워커 풀이 공통으로 사용)"""
     if not openai_api_key:
         raise ValueError("사용자 OpenAI API key가 필요합니다.")
     if not upstage_api_key:
@@ -271,13 +312,25 @@ def main(args):
     os.environ["OPENAI_API_KEY"] = openai_api_key
     os.environ["UPSTAGE_API_KEY"] = upstage_api_key
     
-    # Upstage API key를 사용하여 레이아웃 분석기 초기화
-    analyzer = LayoutAnalyzer(upstage_api_key)
+    # 같은 모델/프롬프트/입력에 대한 응답은 디스크 캐시에서 재사용
+    if config["llm_cache_enabled"]:
+        set_llm_cache(get_llm_cache())
+    
+    # Upstage API key를 사용하여 레이아웃 분석기 초기화 (청크 내용이 같으면 캐시된 분석 결과 재사용)
+    layout_cache = None
+    if config["layout_cache_enabled"]:
+        layout_cache = LayoutCache(
+            config["layout_cache_dir"],
+            max_entries=config["layout_cache_max_entries"],
+            max_bytes=config["layout_cache_max_bytes"],
+        )
+    analyzer = LayoutAnalyzer(upstage_api_key, cache=layout_cache)
     
     llm = ChatOpenAI(
         model_name=selected_model,
         temperature=0,
-        api_key=openai_api_key
+        api_key=openai_api_key,
+        max_retries=0,  # 429 재시도는 run_llm_batch에서 처리
     )
     
     # get_chain과 get_translator 함수는 사용자의 OpenAI API key를 활용하도록 수정되어야 합니다.
@@ -286,49 +339,77 @@ def main(args):
     paper_summary_chain = get_chain(llm, map_prompt)
     trans_chain = get_translator(llm, trans_prompt)
     
-    # 상태 초기화: PDF 파일 경로와 배치 크기 설정
-    state = GraphState(filepath=file_path, batch_size=10)
+    # 상태 초기화: PDF 파일 경로와 배치 크기, 파이프라인 버전 설정
+    state = GraphState(filepath=file_path, batch_size=10, pipeline_version=PIPELINE_VERSION)
+    
+    # 결과 파일 저장을 위한 출력 폴더 및 파일명 설정
+    output_folder = os.path.splitext(file_path)[0]
+    filename = os.path.basename(file_path).split('.')[0]
+    
+    # 단계별 체크포인트: 같은 paper_id로 다시 실행하면 마지막 완료 단계부터 재개
+    checkpointer = Checkpointer(output_folder, paper_id)
+    
+    # 단계가 끝날 때마다 진행률과 완성된 결과를 Paper 레코드에 반영
+    def publish(stage, **fields):
+        publish_progress(paper_id, stage, STAGE_PROGRESS[stage], **fields)
+    
+    def publish_summary_stage(name, delta, fraction):
+        start, end = STAGE_PROGRESS["original_content"], STAGE_PROGRESS["summaries"]
+        fields = {}
+        if name == "translated_markdown":
+            fields["translation"] = _read_text(delta["translated_markdown"])
+        publish_progress(paper_id, name, start + (end - start) * fraction, **fields)
     
     # 1. PDF 분할
-    state = split_and_update(state)
+    state = split_and_update(state, checkpointer)
+    publish("split_pdf")
     
     # 2. 논문 분석
-    state = paper_analysis(analyzer, state)
+    state = paper_analysis(analyzer, state, checkpointer, on_progress=publish)
     
-    # 결과 파일 저장을 위한 출력 폴더 및 파일명 설정
-    pdf_file = state["filepath"]
-    output_folder = os.path.splitext(pdf_file)[0]
-    filename = os.path.basename(pdf_file).split('.')[0]
-    
-    # 기본 분석 결과로 원본 마크다운 파일 생성
-    md_output_file1 = save_results(output_folder, filename, state['html_content'])
-    print(f"기본 마크다운 파일: {md_output_file1}")
+    # 기본 분석 결과로 원본 마크다운을 메모리에서 만들어 바로 공개 (요약/번역을 기다리지 않음)
+    # 수식 설명이 들어간 최종 원본 파일은 4단계에서 한 번만 저장
+    _, original_content = html_to_markdown(state['html_content'])
+    publish("original_content", original_content=original_content)
     
-    # 3. 요약 및 번역 생성
-    state = generate_summaries(state, text_summary_chain, paper_summary_chain, trans_chain)
+    # 3. 요약 및 번역 생성 (통번역은 해당 단계가 끝나는 즉시 공개)
+    state = generate_summaries(state, text_summary_chain, paper_summary_chain, trans_chain, output_folder, filename,
+                               checkpointer, on_stage_done=publish_summary_stage)
     
-    # 4. 분석 결과 저장 (JSON 파일 생성 및 임시 파일 제거)
-    output_file = save_analysis_results(state, output_folder, filename)
+    # 4. 분석 결과 저장 (JSON 파일 생성)
+    state = run_step(checkpointer, "save_analysis_results",
+                     lambda s: save_analysis_results(s, output_folder, filename), state,
+                     inputs=list(state.keys()))
+    # 수식 설명이 삽입된 최종 원본으로 다시 공개
+    original_content = _read_text(state['original_markdown'])
+    publish("save_analysis_results", original_content=original_content)
     
-    # 5. 마크다운 결과물 생성
-    trans_paper_md = create_translated_markdown(trans_chain, output_folder, filename)
-    en_summary_md = create_english_summary(output_file, output_folder, filename)
-    ko_summary_md = create_korean_summary(output_file, output_folder, filename)
+    # 5. 마크다운 결과물 생성 (영어/한국어 요약을 메모리의 분석 결과로 한 번에 생성)
+    translation = _read_text(state['translated_markdown'])
+    english_summary, korean_summary = create_summary_markdowns(state, output_folder, filename)
+    publish("english_summary", english_summary=english_summary)
+    publish("korean_summary", korean_summary=korean_summary)
     
     print("모든 분석 및 요약 작업이 완료되었습니다.")
-    
-    with open(md_output_file1, "r", encoding="utf-8") as f:
-        original_content = f.read()
-    with open(en_summary_md, "r", encoding="utf-8") as f:
-        english_summary = f.read()
-    with open(trans_paper_md, "r", encoding="utf-8") as f:
-        translation = f.read()
-    with open(ko_summary_md, "r", encoding="utf-8") as f:
-        korean_summary = f.read()
+    if config["llm_cache_enabled"]:
+        print(f"LLM 캐시: {get_llm_cache().stats()}")
     
     update_paper_status(paper_id, original_content, english_summary, translation, korean_summary)
+    
+    # 모든 단계가 완료되었으므로 체크포인트 삭제
+    checkpointer.clear()
 
 
+def main(args):
+    # 인자에서 PDF 파일 경로, 모델 이름, API 키 받아오기
+    process_paper(
+        file_path=args.file_path,
+        selected_model=args.model,
+        openai_api_key=args.openai_api,
+        upstage_api_key=args.upstage_api,
+        paper_id=args.paper_id,
+    )
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='논문 분석 및 요약 생성')
@@ -0,0 +1,185 @@
+import time
+import asyncio
+import json
+import threading
+from collections import deque
+
+from utils.config import config
+
+# 워커 프로세스에서 웹 프로세스로 이벤트를 보내는 큐 (워커 초기화 시 설정, 웹/CLI 프로세스에서는 None)
+_worker_queue = None
+
+
+def set_worker_queue(queue):
+    """워커 프로세스 초기화 시 이벤트 큐 설정"""
+    global _worker_queue
+    _worker_queue = queue
+
+
+def publish(paper_id: int, status: str, stage=None, progress=None, available=None, error_message=None):
+    """
+    논문 진행 상황 이벤트를 발행합니다.
+    워커 프로세스에서는 큐로 웹 프로세스에 보내고, 웹 프로세스에서는 구독자에게 바로 전달합니다.
+
+    :param available: 이번 단계에서 새로 공개된 결과 필드 목록
+    """
+    event = {
+        "id": paper_id,
+        "status": status,
+        "stage": stage,
+        "progress": progress,
+        "available": list(available or []),
+        "error_message": error_message,
+    }
+    if _worker_queue is not None:
+        try:
+            _worker_queue.put(event)
+        except Exception as e:
+            print(f"진행 상황 이벤트 전송 실패: {e}")
+        return
+    broker.dispatch(event)
+
+
+# 분석이 끝난 상태: 이 이벤트 이후 일정 시간이 지나면 논문의 버전 기록을 지움 (늦게 온 요청은 DB 상태로 응답)
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def format_sse(event: dict, event_type: str = "progress") -> str:
+    """Server-Sent Events 메시지 형식으로 변환"""
+    return f"event: {event_type}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+class Subscription:
+    """구독 하나 (SSE 연결 또는 long-poll 요청): 이벤트를 구독한 이벤트 루프의 asyncio 큐로 전달"""
+
+    def __init__(self, paper_ids, loop):
+        self.paper_ids = set(paper_ids)
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def push(self, event: dict):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힌 연결
+            pass
+
+    async def get(self, timeout: float) -> dict:
+        """다음 이벤트를 기다림 (timeout 동안 없으면 asyncio.TimeoutError)"""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class ProgressBroker:
+    """
+    웹 프로세스에서 워커가 보낸 진행 상황 이벤트를 논문별 구독자에게 나눠 주는 중계기.
+
+    이벤트 큐를 읽는 스레드 하나가 모든 이벤트를 받아 해당 논문을 구독 중인 연결에만 전달하므로,
+    대기 중인 연결은 DB 조회 없이 asyncio 큐 하나만 차지합니다.
+    논문별 버전 번호는 long-poll 요청이 마지막으로 본 이후 변화가 있었는지 판단하는 데 사용합니다.
+    버전은 전체 이벤트 일련번호라서 기록을 지웠다가 다시 만들어도 이전 번호와 겹치지 않으며,
+    완료/실패 이벤트 후 progress_retention_seconds가 지난 논문의 기록은 지워서 오래 실행되는 웹 프로세스에서도
+    논문 수만큼 계속 늘어나지 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}   # paper_id -> set[Subscription]
+        self._versions = {}      # paper_id -> 마지막 이벤트의 일련번호
+        self._sequence = 0
+        self._expires = {}       # paper_id -> 버전 기록을 지울 시각 (완료/실패 이벤트 후)
+        self._expiry_order = deque()  # (지울 시각, paper_id), 시각 순
+        self._queue = None
+        self._reader = None
+
+    def start(self, queue):
+        """워커 이벤트 큐를 읽는 스레드 시작"""
+        self._queue = queue
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def stop(self):
+        if self._reader is None:
+            return
+        self._queue.put(None)
+        self._reader.join()
+        self._reader = None
+        self._queue = None
+
+    def _read_loop(self):
+        while True:
+            try:
+                event = self._queue.get()
+            except (EOFError, OSError):
+                break
+            if event is None:
+                break
+            self.dispatch(event)
+
+    def dispatch(self, event: dict):
+        """이벤트를 버전과 함께 해당 논문의 구독자에게 전달"""
+        paper_id = event["id"]
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._sequence += 1
+            version = self._sequence
+            self._versions[paper_id] = version
+            if event["status"] in TERMINAL_STATUSES:
+                deadline = now + config["progress_retention_seconds"]
+                self._expires[paper_id] = deadline
+                self._expiry_order.append((deadline, paper_id))
+            else:
+                # 재시도 등으로 다시 진행 중이면 지우지 않음
+                self._expires.pop(paper_id, None)
+            subscribers = list(self._subscribers.get(paper_id, ()))
+        event = {**event, "version": version}
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def _expire(self, now):
+        """완료/실패 후 보관 시간이 지난 논문의 버전 기록 삭제 (잠금을 잡은 상태에서 호출)"""
+        while self._expiry_order and self._expiry_order[0][0] <= now:
+            deadline, paper_id = self._expiry_order.popleft()
+            # 그 사이 새 이벤트로 기한이 바뀌었거나 진행 중으로 돌아간 논문은 건너뜀
+            if self._expires.get(paper_id) == deadline:
+                del self._expires[paper_id]
+                self._versions.pop(paper_id, None)
+
+    def version(self, paper_id: int) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return self._versions.get(paper_id, 0)
+
+    def subscribe(self, paper_ids) -> Subscription:
+        """현재 이벤트 루프에서 논문들의 이벤트 구독 (async 함수 안에서 호출)"""
+        subscription = Subscription(paper_ids, asyncio.get_running_loop())
+        with self._lock:
+            for paper_id in subscription.paper_ids:
+                self._subscribers.setdefault(paper_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for paper_id in subscription.paper_ids:
+                subscribers = self._subscribers.get(paper_id)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[paper_id]
+
+    async def wait(self, paper_id: int, since: int, timeout: float):
+        """논문 버전이 since에서 바뀔 때까지 최대 timeout초 대기 (long-poll)"""
+        subscription = self.subscribe([paper_id])
+        try:
+            if self.version(paper_id) != since:
+                return
+            try:
+                await subscription.get(timeout)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            self.unsubscribe(subscription)
+
+
+broker = ProgressBroker()
@@ -1,7 +1,8 @@
-import subprocess
 import os
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request, BackgroundTasks
-from fastapi.responses import JSONResponse
+import asyncio
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 import aiofiles
@@ -9,6 +10,12 @@ from datetime import datetime
 from database import get_db
 from models import models
 import auth as auth_utils
+from worker_pool import pool
+from progress_events import broker, format_sse
+from job_queue import enqueue_job
+from artifacts import find_completed_artifact, create_artifact, acquire_artifact, release_artifact, new_paper_from_artifact
+from utils.checkpoint import RESULT_VERSION
+from utils.config import config
 
 router = APIRouter()
 
@@ -16,45 +23,52 @@ router = APIRouter()
 UPLOAD_DIR = "static/uploads/pdf"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-def process_pdf_background(pdf_path, paper_id, db_session, user_id, openai_api_key, upstage_api_key):
+# PDF 파일 시그니처 (PDF 규격과 pymupdf처럼 앞쪽 1024바이트 안에서 시작하면 허용)
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024 + len(PDF_MAGIC) - 1
+
+async def save_upload_streaming(file: UploadFile, file_path: str) -> str:
     """
-    백그라운드에서 PDF 처리 작업을 실행하는 함수.
-    pdf_processor.py를 호출하여 PDF 분석, 요약, 번역 등의 작업을 진행하며,
-    paper_id 인자를 함께 전달하여 분석 결과가 해당 Paper 레코드에 업데이트되도록 합니다.
+    업로드 파일을 청크 단위로 디스크에 저장하면서 SHA-256을 함께 계산합니다.
+    PDF 시그니처가 아니거나 최대 크기를 넘으면 저장 중이던 파일을 지우고 거부합니다.
     """
+    chunk_size = config["upload_chunk_bytes"]
+    max_bytes = config["upload_max_bytes"]
+    digest = hashlib.sha256()
+    total = 0
+    header = b""
+    is_pdf = False
+    
     try:
-        os.environ["OPENAI_API_KEY"] = openai_api_key
-        os.environ["UPSTAGE_API_KEY"] = upstage_api_key
-        
-        result = subprocess.run(
-            [
-                "python", "pdf_processor.py",
-                "--file_path", pdf_path,
-                "--model", "gpt-4o-mini",
-                "--openai_api", openai_api_key,
-                "--upstage_api", upstage_api_key,
-                "--paper_id", str(paper_id)
-            ],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        print(result.stdout)
-    except Exception as e:
-        paper = db_session.query(models.Paper).filter(
-            models.Paper.id == paper_id,
-            models.Paper.user_id == user_id
-        ).first()
-        if paper:
-            paper.processing_status = "failed"
-            paper.error_message = str(e)
-            db_session.commit()
-        print(f"PDF 처리 오류: {str(e)}")
+        async with aiofiles.open(file_path, 'wb') as out_file:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                if not is_pdf:
+                    header += chunk[:PDF_HEADER_WINDOW - len(header)]
+                    is_pdf = PDF_MAGIC in header
+                    if not is_pdf and len(header) >= PDF_HEADER_WINDOW:
+                        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+                total += len(chunk)
+                if total > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"File is too large (max {max_bytes // (1024 * 1024)}MB)")
+                digest.update(chunk)
+                await out_file.write(chunk)
+        if total == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+        if not is_pdf:
+            raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    
+    return digest.hexdigest()
 
 @router.post("/upload")
 async def upload_paper(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     title: Optional[str] = Form(None),
     db: Session = Depends(get_db)
@@ -71,44 +85,95 @@ async def upload_paper(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
+    if not title:
+        title = os.path.splitext(file.filename)[0]
+    
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     safe_filename = f"{timestamp}_{file.filename.replace(' ', '_')}"
     file_path = os.path.join(UPLOAD_DIR, safe_filename)
     
-    async with aiofiles.open(file_path, 'wb') as out_file:
-        content = await file.read()
-        await out_file.write(content)
+    # 임시 파일로 스트리밍 저장 (해시는 복사하면서 계산)
+    part_path = f"{file_path}.part"
+    content_hash = await save_upload_streaming(file, part_path)
     
-    if not title:
-        title = os.path.splitext(file.filename)[0]
+    # 같은 PDF가 같은 결과물 버전(파이프라인/단계 버전)으로 이미 분석되었다면 결과물을 공유하고 바로 완료 처리
+    artifact = find_completed_artifact(db, content_hash, RESULT_VERSION)
+    if artifact:
+        os.remove(part_path)
+        acquire_artifact(db, artifact)
+        new_paper = new_paper_from_artifact(artifact, title, user.id)
+        db.add(new_paper)
+        db.commit()
+        db.refresh(new_paper)
+        return {"status": "success", "paper_id": new_paper.id, "message": "Paper already analyzed, reusing results"}
     
+    os.replace(part_path, file_path)
+    
+    artifact = create_artifact(db, content_hash, RESULT_VERSION, file_path)
     new_paper = models.Paper(
         title=title,
         user_id=user.id,
         original_content="",
         pdf_path=file_path,
-        processing_status="processing"
+        processing_status="processing",
+        stage="queued",
+        progress=0.0,
+        content_hash=content_hash,
+        pipeline_version=RESULT_VERSION,
+        artifact_id=artifact.id
     )
     db.add(new_paper)
     db.commit()
     db.refresh(new_paper)
     
-    # paper_id 인자 포함하여 백그라운드 작업 실행
-    background_tasks.add_task(
-        process_pdf_background,
-        file_path,
-        new_paper.id,
-        db,
-        user.id,
-        user.openai_api,
-        user.upstage_api
-    )
+    # jobs 테이블에 분석 작업 등록 후 워커 풀에 알림 (API 키는 실행 시점에 사용자 정보에서 조회)
+    enqueue_job(db, new_paper.id, {
+        "file_path": file_path,
+        "selected_model": "gpt-4o-mini",
+        "user_id": user.id
+    })
+    pool.notify()
     
     return {"status": "success", "paper_id": new_paper.id, "message": "Paper uploaded and processing started"}
 
+@router.get("/workers")
+async def get_worker_stats(request: Request, db: Session = Depends(get_db)):
+    """워커 풀 상태(대기열 길이, 워커 사용률)를 반환하는 엔드포인트"""
+    user = await auth_utils.get_current_user_from_cookie(request, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    return pool.stats()
+
+# 분석 도중 부분적으로 공개되는 결과 필드
+CONTENT_FIELDS = ("original_content", "english_summary", "translation", "korean_summary")
+
+def paper_status_payload(paper: models.Paper, version: int) -> dict:
+    """상태 조회/SSE 스냅샷 공통 응답 (version은 진행 상황 이벤트 번호, long-poll의 since로 사용)"""
+    return {
+        "id": paper.id,
+        "title": paper.title,
+        "status": paper.processing_status,
+        "stage": paper.stage,
+        "progress": paper.progress,
+        "available": [field for field in CONTENT_FIELDS if getattr(paper, field)],
+        "error_message": getattr(paper, "error_message", None),
+        "version": version
+    }
+
 @router.get("/status/{paper_id}")
-async def get_paper_status(request: Request, paper_id: int, db: Session = Depends(get_db)):
-    """Paper 상태와 일부 정보(오류 메시지 등)를 반환하는 엔드포인트"""
+async def get_paper_status(
+    request: Request,
+    paper_id: int,
+    wait: Optional[float] = None,
+    since: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Paper 상태와 진행 단계, 이미 공개된 결과 필드 목록, 오류 메시지 등을 반환하는 엔드포인트.
+    SSE를 쓸 수 없는 경우의 long-poll: wait(초)와 이전 응답의 version을 since로 넘기면
+    분석 중인 논문에 새 이벤트가 생길 때까지(최대 wait초) 기다렸다가 응답합니다.
+    """
     user = await auth_utils.get_current_user_from_cookie(request, db)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -121,16 +186,82 @@ async def get_paper_status(request: Request, paper_id: int, db: Session = Depend
     if not paper:
         raise HTTPException(status_code=404, detail="Paper not found")
     
-    return {
-        "id": paper.id,
-        "title": paper.title,
-        "status": paper.processing_status,
-        "error_message": getattr(paper, "error_message", None)
-    }
+    version = broker.version(paper_id)
+    if wait and since is not None and since == version and paper.processing_status == "processing":
+        # 기다리는 동안 DB 연결을 잡고 있지 않도록 세션을 닫았다가 다시 조회
+        db.close()
+        await broker.wait(paper_id, since, min(wait, config["progress_long_poll_seconds"]))
+        version = broker.version(paper_id)
+        paper = db.query(models.Paper).filter(models.Paper.id == paper_id).first()
+        if not paper:
+            raise HTTPException(status_code=404, detail="Paper not found")
+    
+    return paper_status_payload(paper, version)
+
+@router.get("/events")
+async def stream_paper_events(request: Request, ids: str, db: Session = Depends(get_db)):
+    """
+    논문 여러 편의 진행 상황을 Server-Sent Events로 보내는 엔드포인트 (ids=1,2,3).
+    연결 직후 현재 상태를 보낸 뒤 워커가 보내는 단계 변화만 전달하고, 모든 논문이 끝나면 연결을 닫습니다.
+    """
+    user = await auth_utils.get_current_user_from_cookie(request, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    try:
+        paper_ids = {int(paper_id) for paper_id in ids.split(",") if paper_id.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid paper ids")
+    if not paper_ids or len(paper_ids) > config["progress_max_papers"]:
+        raise HTTPException(status_code=400, detail=f"Specify 1 to {config['progress_max_papers']} paper ids")
+    
+    # 스냅샷보다 먼저 구독해야 그 사이에 발생한 이벤트를 놓치지 않음
+    subscription = broker.subscribe(paper_ids)
+    try:
+        papers = db.query(models.Paper).filter(
+            models.Paper.id.in_(paper_ids),
+            models.Paper.user_id == user.id
+        ).all()
+        snapshots = [paper_status_payload(paper, broker.version(paper.id)) for paper in papers]
+    finally:
+        # 연결이 유지되는 동안 DB 연결을 잡고 있지 않도록 바로 반환
+        db.close()
+    if not papers:
+        broker.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Paper not found")
+    
+    owned = {paper["id"] for paper in snapshots}
+    pending = {paper["id"] for paper in snapshots if paper["status"] == "processing"}
+    
+    async def event_stream():
+        try:
+            yield f"retry: {config['progress_heartbeat_seconds'] * 1000}\n\n"
+            for snapshot in snapshots:
+                yield format_sse(snapshot)
+            while pending:
+                try:
+                    event = await subscription.get(config["progress_heartbeat_seconds"])
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["id"] not in owned:
+                    continue
+                yield format_sse(event)
+                if event["status"] != "processing":
+                    pending.discard(event["id"])
+        finally:
+            broker.unsubscribe(subscription)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
 
 @router.get("/data/{paper_id}")
 async def get_paper_data(request: Request, paper_id: int, db: Session = Depends(get_db)):
-    """Paper 분석 결과(마크다운 내용)를 JSON으로 반환하는 엔드포인트"""
+    """Paper 분석 결과(마크다운 내용)를 JSON으로 반환하는 엔드포인트 (분석 중이면 완료된 단계의 결과만 채워짐)"""
     user = await auth_utils.get_current_user_from_cookie(request, db)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -144,6 +275,9 @@ async def get_paper_data(request: Request, paper_id: int, db: Session = Depends(
         raise HTTPException(status_code=404, detail="Paper not found")
     
     return {
+        "status": paper.processing_status,
+        "stage": paper.stage,
+        "progress": paper.progress,
         "original_content": paper.original_content,
         "english_summary": paper.english_summary,
         "translation": paper.translation,
@@ -190,4 +324,31 @@ async def save_paper_analysis(
     # 변경사항 DB에 반영
     db.commit()
     
-    return {"status": "success", "message": "Paper analysis saved successfully"}
\ No newline at end of file
+    return {"status": "success", "message": "Paper analysis saved successfully"}
+
+@router.delete("/{paper_id}")
+async def delete_paper(request: Request, paper_id: int, db: Session = Depends(get_db)):
+    """논문 삭제 엔드포인트 (공유 결과물은 마지막 참조가 사라질 때 삭제)"""
+    user = await auth_utils.get_current_user_from_cookie(request, db)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    paper = db.query(models.Paper).filter(
+        models.Paper.id == paper_id,
+        models.Paper.user_id == user.id
+    ).first()
+    
+    if not paper:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    if paper.processing_status == "processing":
+        raise HTTPException(status_code=409, detail="Paper is still being processed")
+    
+    artifact_id = paper.artifact_id
+    db.query(models.Job).filter(models.Job.paper_id == paper.id).delete(synchronize_session=False)
+    db.delete(paper)
+    db.flush()
+    if artifact_id:
+        release_artifact(db, artifact_id)
+    db.commit()
+    
+    return {"status": "success", "message": "Paper deleted successfully"}
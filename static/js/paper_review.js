@@ -119,10 +119,70 @@ function stopProgressAnimation() {
   }, 1000);
 }
 
-// PDF 처리 상태 확인 함수
-function checkPaperStatus(paperId) {
-  const loadingOverlay = getLoadingOverlay();
-  fetch(`/paper/status/${paperId}`, {
+// 분석 단계 이름 (서버의 Paper.stage 값 → 화면 표시)
+const STAGE_LABELS = {
+  queued: '분석 대기 중',
+  split_pdf: 'PDF 분할',
+  analyze_layout: '레이아웃 분석',
+  crop_elements: '이미지/표/수식 추출',
+  original_content: '원본 변환',
+  text_summary: '섹션 요약',
+  paper_summary: '논문 요약',
+  text_trans_summary: '요약 번역',
+  image_summary: '이미지 요약',
+  table_summary: '표 요약',
+  equation_summary: '수식 요약',
+  table_markdown: '표 변환',
+  translated_markdown: '본문 번역',
+  save_analysis_results: '분석 결과 저장',
+  english_summary: '영어 요약',
+  korean_summary: '한국어 요약',
+  completed: '분석'
+};
+
+// 화면에 이미 표시한 결과 필드와 그 내용 (분석 중에는 새로 공개된 필드만 다시 가져옴)
+const shownFields = new Map();
+
+// 서버에서 받은 실제 진행률/단계를 진행 막대와 안내 문구에 반영
+function updateAnalysisProgress(data) {
+  if (data.progress === null || data.progress === undefined) return;
+  const percent = Math.round(data.progress * 100);
+  const label = STAGE_LABELS[data.stage] || data.stage;
+  const message = data.stage === 'queued' ? `${label}...` : `${label} 완료 (${percent}%)`;
+
+  // 실제 진행률이 오면 임의로 움직이는 진행 막대 애니메이션은 멈춤
+  if (data.progress > 0) clearInterval(progressInterval);
+  document.getElementById('progress-bar').style.width = `${Math.max(percent, 5)}%`;
+  document.getElementById('loading-status').textContent = message;
+  document.getElementById('analysis-progress-status').textContent = `논문 분석 중: ${message}`;
+  document.getElementById('analysis-progress-bar').style.width = `${percent}%`;
+}
+
+// 진행 상황 수신: SSE(EventSource)로 워커가 보내는 단계 변화를 받고, 안 되면 long-poll로 대체
+function watchPaperProgress(paperId) {
+  if (!window.EventSource) {
+    checkPaperStatus(paperId);
+    return;
+  }
+  let lastVersion = null;
+  const source = new EventSource(`/paper/events?ids=${paperId}`);
+  source.addEventListener('progress', event => {
+    const data = JSON.parse(event.data);
+    lastVersion = data.version;
+    if (data.status !== 'processing') source.close();
+    handlePaperStatus(paperId, data);
+  });
+  source.onerror = () => {
+    // 연결이 끊기거나 프록시가 SSE를 막는 경우 long-poll로 전환
+    source.close();
+    checkPaperStatus(paperId, lastVersion);
+  };
+}
+
+// PDF 처리 상태 확인 함수 (long-poll: 이전 응답의 version을 넘기면 변화가 생길 때까지 서버에서 대기)
+function checkPaperStatus(paperId, since = null) {
+  const params = since === null ? '' : `?wait=25&since=${since}`;
+  fetch(`/paper/status/${paperId}${params}`, {
     method: 'GET',
     credentials: 'include'
   })
@@ -131,27 +191,38 @@ function checkPaperStatus(paperId) {
     return response.json();
   })
   .then(data => {
-    if (data.status === 'processing') {
-      setTimeout(() => checkPaperStatus(paperId), 3000);
-      document.getElementById('loading-status').textContent = '논문 분석 중... 몇 분 정도 소요될 수 있습니다.';
-    } else if (data.status === 'completed') {
-      stopProgressAnimation();
-      loadingOverlay.classList.add('hidden');
-      fetchPaperData(paperId);
-    } else if (data.status === 'failed') {
-      stopProgressAnimation();
-      loadingOverlay.classList.add('hidden');
-      alert(`논문 처리 실패: ${data.error_message || '알 수 없는 오류'}`);
-    }
+    if (data.status === 'processing') checkPaperStatus(paperId, data.version);
+    handlePaperStatus(paperId, data);
   })
   .catch(error => {
     console.error('Error:', error);
-    stopProgressAnimation();
-    loadingOverlay.classList.add('hidden');
-    alert('상태 확인 중 오류 발생: ' + error.message);
+    handlePaperStatus(paperId, { status: 'error', error_message: error.message });
   });
 }
 
+// 상태 변화 처리: 진행률 표시, 새로 공개된 결과 표시, 완료/실패 처리
+function handlePaperStatus(paperId, data) {
+  const loadingOverlay = getLoadingOverlay();
+  const analysisProgress = document.getElementById('analysis-progress');
+  if (data.status === 'processing') {
+    updateAnalysisProgress(data);
+    // 새로 완료된 결과(예: 원본)가 있으면 분석이 끝나기 전에 먼저 표시
+    const newFields = (data.available || []).filter(field => !shownFields.has(field));
+    if (newFields.length > 0) fetchPaperData(paperId, true);
+    return;
+  }
+  stopProgressAnimation();
+  loadingOverlay.classList.add('hidden');
+  analysisProgress.classList.add('hidden');
+  if (data.status === 'completed') {
+    fetchPaperData(paperId);
+  } else if (data.status === 'failed') {
+    alert(`논문 처리 실패: ${data.error_message || '알 수 없는 오류'}`);
+  } else {
+    alert('상태 확인 중 오류 발생: ' + data.error_message);
+  }
+}
+
 // 파일 처리 및 업로드 함수
 function handleFiles(files) {
   const file = files[0];
@@ -160,6 +231,7 @@ function handleFiles(files) {
     alert('PDF 파일만 업로드할 수 있습니다.');
     return;
   }
+  shownFields.clear();
   loadingOverlay.classList.remove('hidden');
   document.getElementById('loading-status').textContent = '파일 업로드 중...';
   startProgressAnimation();
@@ -178,7 +250,7 @@ function handleFiles(files) {
   .then(data => {
     if (data.status === 'success') {
       document.getElementById('loading-status').textContent = '논문 분석 시작...';
-      checkPaperStatus(data.paper_id);
+      watchPaperProgress(data.paper_id);
     } else {
       stopProgressAnimation();
       loadingOverlay.classList.add('hidden');
@@ -194,7 +266,8 @@ function handleFiles(files) {
 }
 
 // 논문 데이터 가져오기 및 UI 업데이트 (마크다운 데이터 -> HTML 변환)
-function fetchPaperData(paperId) {
+// partial이 true이면 분석 중인 논문의 부분 결과를 표시 (진행 상황 표시 유지, 저장 버튼 숨김)
+function fetchPaperData(paperId, partial = false) {
   const loadingOverlay = getLoadingOverlay();
   fetch(`/paper/data/${paperId}`, {
     method: 'GET',
@@ -206,36 +279,56 @@ function fetchPaperData(paperId) {
   })
   .then(data => {
     loadingOverlay.classList.add('hidden');
-    updateUIWithPaperData(data, paperId);
+    updateUIWithPaperData(data, paperId, partial);
   })
   .catch(error => {
     console.error('Error:', error);
+    if (partial) return;  // 부분 결과는 다음 상태 확인 때 다시 시도
     loadingOverlay.classList.add('hidden');
     alert('논문 데이터를 가져오는 중 오류 발생: ' + error.message);
   });
 }
 
-// UI 업데이트: 각 탭에 마크다운 콘텐츠를 HTML로 렌더링하여 표시
-function updateUIWithPaperData(paper, paperId) {
-  const originalContentDiv = document.getElementById('original-content');
-  originalContentDiv.innerHTML = marked.parse(paper.original_content || '원본 내용이 없습니다.');
-
-  const englishSummaryDiv = document.getElementById('english-summary-content');
-  englishSummaryDiv.innerHTML = marked.parse(paper.english_summary || '영어 요약 데이터가 없습니다.');
+// 결과 필드별 표시 위치와 결과가 없을 때의 안내 문구
+const CONTENT_TARGETS = [
+  { field: 'original_content', elementId: 'original-content', emptyText: '원본 내용이 없습니다.' },
+  { field: 'english_summary', elementId: 'english-summary-content', emptyText: '영어 요약 데이터가 없습니다.' },
+  { field: 'translation', elementId: 'translation-content', emptyText: '번역 데이터가 없습니다.' },
+  { field: 'korean_summary', elementId: 'korean-summary-content', emptyText: '한국어 요약 데이터가 없습니다.' }
+];
 
-  // 오른쪽 탭 콘텐츠 (번역, 한국어 요약) - 해당 탭에도 마크다운 렌더링 적용
-  const translationContentDiv = document.getElementById('translation-content');
-  translationContentDiv.innerHTML = marked.parse(paper.translation || '번역 데이터가 없습니다.');
+// UI 업데이트: 각 탭에 마크다운 콘텐츠를 HTML로 렌더링하여 표시
+function updateUIWithPaperData(paper, paperId, partial = false) {
+  // 가져오는 사이에 분석이 끝났다면 전체 결과로 처리
+  partial = partial && paper.status === 'processing';
 
-  const koreanSummaryDiv = document.getElementById('korean-summary-content');
-  koreanSummaryDiv.innerHTML = marked.parse(paper.korean_summary || '한국어 요약 데이터가 없습니다.');
+  // 같은 내용으로 이미 표시한 필드는 다시 그리지 않음 (읽는 중인 위치 유지)
+  // 원본처럼 먼저 공개된 뒤 내용이 바뀐 필드(수식 설명 반영)는 최종 결과로 다시 그림
+  CONTENT_TARGETS.forEach(({ field, elementId, emptyText }) => {
+    if (shownFields.has(field) && shownFields.get(field) === paper[field]) return;
+    const contentDiv = document.getElementById(elementId);
+    if (paper[field]) {
+      contentDiv.innerHTML = marked.parse(paper[field]);
+      shownFields.set(field, paper[field]);
+    } else {
+      contentDiv.innerHTML = marked.parse(partial ? '분석이 진행 중입니다. 완료되면 여기에 표시됩니다.' : emptyText);
+    }
+  });
 
-  // 탭 전환: 기본적으로 원본 탭을 활성화
+  // 탭 전환: 업로드 탭을 보고 있을 때만 원본 탭을 활성화 (부분 결과를 읽는 중이면 그대로 둠)
+  const uploadTab = document.getElementById('upload-tab');
   const originalTabButton = document.querySelector('.left-tab-button[data-tab="original"]');
-  if (originalTabButton) originalTabButton.click();
+  if (originalTabButton && !uploadTab.classList.contains('hidden')) originalTabButton.click();
 
-  // 저장 버튼 활성화
+  const analysisProgress = document.getElementById('analysis-progress');
   const saveButtonContainer = document.getElementById('save-button-container');
+  if (partial) {
+    analysisProgress.classList.remove('hidden');
+    return;
+  }
+  analysisProgress.classList.add('hidden');
+
+  // 저장 버튼 활성화 (분석이 끝난 뒤에만)
   saveButtonContainer.classList.remove('hidden');
   const saveButton = document.getElementById('save-button');
   saveButton.setAttribute('data-paper-id', paperId);
@@ -1,11 +1,20 @@
 import os 
-import requests
+import hashlib
 import json
 import pymupdf
 from PIL import Image
 
 from typing import TypedDict
 
+try:
+    import fcntl
+except ImportError:  # fcntl이 없는 환경(Windows)에서는 정리 작업 잠금 없이 실행
+    fcntl = None
+
+from utils import json_codec
+from utils.config import config
+from utils.http_client import get_http_client, request_with_retry, arequest_with_retry
+
 
 # GraphState 상태를 저장하는 용도로 사용합니다.
 class GraphState(TypedDict):
@@ -15,8 +24,8 @@ class GraphState(TypedDict):
     section_names: list[int]                            # page numbers
     html_content: list
     batch_size: int                                     # 분할 작업 (batch_size씩 자르기)
-    split_filepaths: list[str]                          # split files
-    analyzed_files: list[str]                           # analyzed files
+    split_chunks: list[dict]                            # split PDF chunks (bytes, start_page, end_page)
+    analyzed_layouts: list[dict]                        # layout analysis results (layout, start_page, end_page)
     
     section_elements: dict[str, dict[str, list[dict]]]  # page elements
     page_metadata: dict[str, dict]                      # page metadata
@@ -38,64 +47,227 @@ class GraphState(TypedDict):
     paper_trans: dict[str, str]
     paper_summary: str                            # paper summary
     paper_trans_summary: str
+    translated_markdown: str                      # translated markdown path
+    analysis_file: str                            # analysis json path
+    original_markdown: str                        # original markdown path (with equation summaries)
+    pipeline_version: str                         # checkpoint version stamp
     
     
+# 레이아웃 분석 결과 캐시
+class LayoutCache:
+    # 한도를 넘으면 한도의 이 비율까지 줄여서 다음 정리까지 여유를 둠
+    EVICT_TARGET = 0.9
+
+    def __init__(self, cache_dir, max_entries=None, max_bytes=None, sweep_every=None):
+        """
+        청크 바이트 해시와 요청 파라미터를 키로 Upstage 레이아웃 분석 JSON을 저장하는 캐시
+
+        항목 수/전체 크기는 처음 한 번 폴더를 훑어 구한 뒤 put마다 증분으로 추정하고,
+        추정치가 한도를 넘거나 sweep_every번 저장할 때마다만 폴더 전체를 다시 훑어 정리합니다
+        (다른 워커 프로세스가 저장한 항목은 이때 반영).
+
+        :param cache_dir: 캐시 폴더
+        :param max_entries: 최대 항목 수 (None이면 제한 없음)
+        :param max_bytes: 최대 전체 크기 (None이면 제한 없음)
+        :param sweep_every: 추정치와 관계없이 폴더를 다시 훑는 저장 횟수 (None이면 config의 layout_cache_sweep_every)
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_every = sweep_every or config["layout_cache_sweep_every"]
+        self._entries = None  # 추정 항목 수 (None이면 아직 폴더를 훑지 않음)
+        self._bytes = 0       # 추정 전체 크기
+        self._puts = 0        # 마지막 정리 이후 저장 횟수
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, document: bytes, params):
+        """
+        PDF 청크 바이트 전체(페이지 콘텐츠와 폰트/Form XObject/이미지 등 리소스 포함)와 요청 파라미터의 해시.
+        split_pdf가 문서 ID 없이 청크를 만들므로 같은 원본의 같은 페이지 범위는 항상 같은 바이트가 됩니다.
+        """
+        params_str = json.dumps(params, sort_keys=True)
+        digest = hashlib.sha256(document)
+        digest.update(f":{params_str}".encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """캐시된 JSON 파일 경로 반환 (없으면 None). 사용 시각을 갱신하여 LRU 순서를 유지"""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, content: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced_size = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced_size = None
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        self._puts += 1
+        if self._entries is not None:
+            self._entries += replaced_size is None
+            self._bytes += len(content) - (replaced_size or 0)
+        if self._entries is None or self._puts >= self.sweep_every or self._over(1.0):
+            self.evict()
+
+    def _over(self, fraction):
+        """추정 항목 수/크기가 한도의 fraction배를 넘는지"""
+        return (self.max_entries is not None and self._entries > self.max_entries * fraction) or \
+               (self.max_bytes is not None and self._bytes > self.max_bytes * fraction)
+
+    def evict(self):
+        """
+        폴더를 훑어 추정치를 갱신하고, 한도를 넘었으면 가장 오래 사용되지 않은 항목부터
+        한도의 EVICT_TARGET 비율까지 삭제. 다른 프로세스가 정리 중이면 건너뜀
+        """
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        with open(os.path.join(self.cache_dir, ".evict.lock"), "w") as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+            self._sweep()
+
+    def _sweep(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        self._entries = len(entries)
+        self._bytes = sum(size for _, size, _ in entries)
+        self._puts = 0
+        if not self._over(1.0):
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if not self._over(self.EVICT_TARGET):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._bytes -= size
+            self._entries -= 1
+
+
 # 문서 구조 분석기 
 class LayoutAnalyzer:
-    def __init__(self, api_key):
+    # API 요청 데이터 (OCR 비활성화)
+    params = {"ocr": False}
+
+    def __init__(self, api_key, cache=None, base_url=None, client=None):
         """
         LayoutAnalyzer 클래스의 생성자
 
         :param api_key: Upstage API 인증을 위한 API 키
+        :param cache: 레이아웃 분석 결과 캐시 (LayoutCache, None이면 사용하지 않음)
+        :param base_url: API 주소 (None이면 config의 upstage_base_url, 테스트 시 스텁 서버 주소)
+        :param client: 동기 요청에 사용할 httpx.Client (None이면 프로세스 공용 연결 풀)
         """
         self.api_key = api_key
+        self.cache = cache
+        self.base_url = (base_url or config["upstage_base_url"]).rstrip("/")
+        self.client = client
+
+    @property
+    def url(self):
+        return f"{self.base_url}/v1/document-ai/layout-analysis"
 
-    def _upstage_layout_analysis(self, input_file):
+    def _request_kwargs(self, document: bytes, name):
+        return {
+            # API 요청 헤더 설정
+            "headers": {"Authorization": f"Bearer {self.api_key}"},
+            "data": self.params,
+            # 메모리의 PDF 청크를 그대로 전송
+            "files": {"document": (name, document, "application/pdf")},
+        }
+
+    def _lookup_cache(self, document: bytes, name):
+        """같은 페이지 내용과 요청 파라미터로 분석한 결과가 있으면 (캐시 키, 결과)를 반환"""
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.key(document, self.params)
+        cached_file = self.cache.get(cache_key)
+        if cached_file:
+            print(f"레이아웃 분석 캐시 적중: {name}")
+            return cache_key, json_codec.load_file(cached_file)
+        return cache_key, None
+
+    def _handle_response(self, response, cache_key):
+        """API 응답 처리 (성공 시 캐시에 저장)"""
+        if response.status_code == 200:
+            layout = json_codec.loads(response.content)
+            if cache_key is not None:
+                self.cache.put(cache_key, json_codec.dumps(layout))
+            return layout
+        else:
+            # 재시도 후에도 실패한 경우 예외 발생
+            raise ValueError(f"API 요청 실패. 상태 코드: {response.status_code}")
+
+    def _upstage_layout_analysis(self, document: bytes, name="document.pdf"):
         """
         Upstage의 레이아웃 분석 API를 호출하여 문서 분석을 수행합니다.
+        keep-alive 연결 풀을 재사용하고, 429/5xx 응답은 백오프 후 재시도합니다.
 
-        :param input_file: 분석할 PDF 파일의 경로
-        :return: 분석 결과가 저장된 JSON 파일의 경로
+        :param document: 분석할 PDF 청크 (바이트)
+        :param name: 요청에 사용할 파일 이름 (로그 표시용)
+        :return: 분석 결과 JSON (dict)
         """
-        # API 요청 헤더 설정
-        headers = {"Authorization": f"Bearer {self.api_key}"}
+        cache_key, layout = self._lookup_cache(document, name)
+        if layout is not None:
+            return layout
 
-        # API 요청 데이터 설정 (OCR 비활성화)
-        data = {"ocr": False}
+        client = self.client or get_http_client()
+        response = request_with_retry(client, "POST", self.url, **self._request_kwargs(document, name))
+        return self._handle_response(response, cache_key)
 
-        # 분석할 PDF 파일 열기
-        files = {"document": open(input_file, "rb")}
+    async def _aupstage_layout_analysis(self, client, document: bytes, name="document.pdf"):
+        """_upstage_layout_analysis의 비동기 버전 (client: httpx.AsyncClient)"""
+        cache_key, layout = self._lookup_cache(document, name)
+        if layout is not None:
+            return layout
 
-        # API 요청 보내기
-        response = requests.post(
-            "https://api.upstage.ai/v1/document-ai/layout-analysis",
-            headers=headers,
-            data=data,
-            files=files,
-        )
-
-        # API 응답 처리 및 결과 저장
-        if response.status_code == 200:
-            # 분석 결과를 저장할 JSON 파일 경로 생성
-            output_file = os.path.splitext(input_file)[0] + ".json"
+        response = await arequest_with_retry(client, "POST", self.url, **self._request_kwargs(document, name))
+        return self._handle_response(response, cache_key)
 
-            # 분석 결과를 JSON 파일로 저장
-            with open(output_file, "w", encoding='utf-8') as f:
-                json.dump(response.json(), f, ensure_ascii=False)
+    def execute(self, document: bytes, name="document.pdf"):
+        """
+        주어진 PDF 청크에 대해 레이아웃 분석을 실행합니다.
 
-            return output_file
-        else:
-            # API 요청이 실패한 경우 예외 발생
-            raise ValueError(f"API 요청 실패. 상태 코드: {response.status_code}")
+        :param document: 분석할 PDF 청크 (바이트)
+        :param name: 요청에 사용할 파일 이름
+        :return: 분석 결과 JSON (dict)
+        """
+        return self._upstage_layout_analysis(document, name)
 
-    def execute(self, input_file):
+    async def aexecute(self, client, document: bytes, name="document.pdf"):
         """
-        주어진 입력 파일에 대해 레이아웃 분석을 실행합니다.
+        execute의 비동기 버전. 여러 청크를 스레드 없이 동시에 분석할 때 사용합니다.
 
-        :param input_file: 분석할 PDF 파일의 경로
-        :return: 분석 결과가 저장된 JSON 파일의 경로
+        :param client: httpx.AsyncClient
         """
-        return self._upstage_layout_analysis(input_file)
+        return await self._aupstage_layout_analysis(client, document, name)
 
 # 이미지 추출기 
 class ImageCropper:
@@ -150,4 +322,25 @@ class ImageCropper:
         ]
         cropped_img = img.crop((x1, y1, x2, y2))
         cropped_img.save(output_file)
+
+    @staticmethod
+    def crop_page_region(page, coordinates, output_file, dpi=300):
+        """
+        페이지 전체를 이미지로 변환하지 않고, 정규화된 좌표 영역만 렌더링하여 저장하는 정적 메서드
+
+        :param page: pymupdf 페이지 객체
+        :param coordinates: 정규화된 좌표 (x1, y1, x2, y2)
+        :param output_file: 저장할 파일 경로
+        :param dpi: 이미지 해상도 (기본값: 300)
+        """
+        page_rect = page.rect
+        x1, y1, x2, y2 = coordinates
+        clip = pymupdf.Rect(
+            page_rect.x0 + x1 * page_rect.width,
+            page_rect.y0 + y1 * page_rect.height,
+            page_rect.x0 + x2 * page_rect.width,
+            page_rect.y0 + y2 * page_rect.height,
+        )
+        pixmap = page.get_pixmap(dpi=dpi, clip=clip)
+        pixmap.save(output_file)
         
@@ -0,0 +1,132 @@
+import os
+import json
+import pickle
+import hashlib
+import shutil
+import threading
+
+# 파이프라인 전체 버전: 결과 형식이 바뀌면 올려서 모든 체크포인트를 무효화합니다.
+PIPELINE_VERSION = "1"
+
+# 단계별 버전: 해당 단계의 코드가 바뀌면 올려서 그 단계의 체크포인트를 무효화합니다.
+STAGE_VERSIONS = {
+    # 1. PDF 분할
+    "split_pdf": 3,
+    # 2. 논문 분석
+    "analyze_layout": 2,
+    "extract_page_layout": 1,
+    "extract_tag_elements_per_page": 1,
+    "page_numbers": 1,
+    "crop_elements": 2,
+    "extract_page_text": 1,
+    # 3. 요약 및 번역 생성
+    "text_summary": 2,
+    "paper_summary": 2,
+    "text_trans_summary": 2,
+    "image_summary_data_batches": 1,
+    "image_summary": 1,
+    "table_summary_data_batches": 1,
+    "table_summary": 1,
+    "equation_summary_data_batches": 1,
+    "equation_summary": 1,
+    "table_markdown": 1,
+    "translated_markdown": 2,
+    # 4. 분석 결과 저장
+    "save_analysis_results": 3,
+}
+
+
+# 단계 밖에서 만드는 결과물(Paper에 저장되는 original_content, 요약 마크다운 등)의 형식 버전: 바뀌면 올립니다.
+ARTIFACT_VERSION = "2"
+
+
+def result_version(stage_versions=None):
+    """
+    분석 결과물 버전: 파이프라인 버전, 결과물 형식 버전과 모든 단계 버전으로 만든 지문.
+    중복 업로드 시 결과물 재사용 여부를 판단하며, 단계 버전 하나만 올려도 기존 결과물은 재사용되지 않습니다.
+    """
+    versions = STAGE_VERSIONS if stage_versions is None else stage_versions
+    stamp = json.dumps([PIPELINE_VERSION, ARTIFACT_VERSION, sorted(versions.items())])
+    return f"{PIPELINE_VERSION}-{hashlib.sha256(stamp.encode('utf-8')).hexdigest()[:12]}"
+
+
+RESULT_VERSION = result_version()
+
+
+def stage_stamp(name):
+    """체크포인트에 기록할 단계 버전 스탬프"""
+    return f"{PIPELINE_VERSION}:{name}:{STAGE_VERSIONS.get(name, 0)}"
+
+
+class Checkpointer:
+    def __init__(self, output_folder, paper_id):
+        """
+        단계별 GraphState 변경분(delta)을 디스크에 저장하고, 같은 paper_id로 다시 실행하면
+        마지막으로 완료된 단계부터 이어서 실행하도록 합니다.
+
+        :param output_folder: 논문 출력 폴더
+        :param paper_id: Paper 모델의 ID
+        """
+        self.folder = os.path.join(output_folder, ".checkpoints", str(paper_id))
+        self.recomputed = set()  # 이번 실행에서 새로 계산된 GraphState 키
+        self._lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.folder, f"{name}.pkl")
+
+    def load(self, name, inputs):
+        """
+        유효한 체크포인트가 있으면 delta를 반환합니다.
+        버전 스탬프가 다르거나 입력 키 중 하나라도 이번 실행에서 다시 계산되었다면 None을 반환합니다.
+        """
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        with self._lock:
+            if self.recomputed.intersection(inputs):
+                return None
+        try:
+            with open(path, "rb") as f:
+                record = pickle.load(f)
+        except Exception as e:
+            print(f"체크포인트 로드 실패 ({name}): {e}")
+            return None
+        if record.get("stamp") != stage_stamp(name):
+            return None
+        return record["delta"]
+
+    def save(self, name, delta):
+        """단계 결과(delta)를 버전 스탬프와 함께 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = self._path(name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"stamp": stage_stamp(name), "delta": dict(delta)}, f)
+        os.replace(tmp_path, path)
+
+    def run(self, name, func, state, inputs):
+        """체크포인트가 유효하면 재사용하고, 아니면 단계를 실행한 뒤 저장"""
+        delta = self.load(name, inputs)
+        if delta is not None:
+            print(f"체크포인트에서 재개: {name}")
+            return delta
+
+        delta = func(state)
+        self.save(name, delta)
+        with self._lock:
+            self.recomputed.update(delta.keys())
+        return delta
+
+    def clear(self):
+        """파이프라인이 끝까지 완료되면 체크포인트 삭제"""
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def run_step(checkpointer, name, func, state, inputs):
+    """단계를 (체크포인트를 거쳐) 실행하고 결과를 state에 반영"""
+    if checkpointer is None:
+        delta = func(state)
+    else:
+        delta = checkpointer.run(name, func, state, inputs)
+    state.update(delta)
+    return state
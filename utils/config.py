@@ -17,5 +17,84 @@ config = {
     "ensemble_search_type": "mmr",  # 앙상블 서칭 타입
     "ensemble_weight": [0.3,0.7],   # bm25와 vector 가중치
 
+    # 논문 분석 워커 풀
+    "worker_pool_size": 2,          # 상주 워커 프로세스 수
+    "worker_preload_modules": [     # 워커 시작 시 미리 import 할 모듈 (langchain, FAISS, pymupdf, bs4 등)
+        "pdf_processor",
+        "faiss",
+    ],
+
+    # PDF 업로드
+    "upload_chunk_bytes": 1024 * 1024,          # 스트리밍 저장 청크 크기
+    "upload_max_bytes": 100 * 1024 * 1024,      # 최대 업로드 크기
+
+    # 논문 분석 작업 큐 (jobs 테이블)
+    "job_max_attempts": 3,                      # 작업당 최대 시도 횟수
+    "job_lease_seconds": 120,                   # 워커 점유 기간 (하트비트로 연장)
+    "job_heartbeat_seconds": 30,                # 하트비트 주기
+    "job_retry_backoff_seconds": 30,            # 재시도 백오프 기본값 (시도마다 2배)
+    "job_retry_backoff_max_seconds": 600,       # 재시도 백오프 최대값
+    "job_poll_seconds": 2,                      # 디스패처 대기열 확인 주기
+    "job_maintenance_interval_seconds": 300,    # 만료 작업 복구 및 정리 주기
+    "job_retention_days": 7,                    # 완료/실패 작업 보관 기간
+
+    # 진행 상황 알림 (SSE / long-poll)
+    "progress_heartbeat_seconds": 15,           # SSE 연결 유지용 주석 전송 주기
+    "progress_long_poll_seconds": 25,           # /paper/status?wait= 최대 대기 시간
+    "progress_max_papers": 50,                  # SSE 연결 하나로 구독할 수 있는 최대 논문 수
+    "progress_retention_seconds": 300,          # 완료/실패 후 논문별 진행 이벤트 버전을 보관하는 시간
+
+    # 레이아웃 분석 (Upstage)
+    "upstage_base_url": "https://api.upstage.ai",  # 로컬 스텁 서버로 바꿔 테스트 가능
+    "http_timeout_seconds": 120,    # 요청당 읽기/쓰기 타임아웃
+    "http_connect_timeout_seconds": 10,
+    "http_max_connections": 10,     # 프로세스당 keep-alive 연결 풀 크기
+    "http_max_retries": 4,          # 429/5xx/연결 오류 재시도 횟수
+    "http_backoff_base_seconds": 1,         # 지수 백오프: base * 2^시도, Retry-After가 있으면 우선
+    "http_backoff_max_seconds": 60,
+    "layout_max_in_flight": 4,      # 분할 청크 동시 분석 요청 수 (1이면 순차 실행)
+    "layout_cache_enabled": True,   # 청크 PDF 바이트 해시 기반 분석 결과 캐시
+    "layout_cache_dir": "cache/layout",
+    "layout_cache_max_entries": 5000,           # 초과 시 오래 사용되지 않은 항목부터 삭제 (None이면 제한 없음)
+    "layout_cache_max_bytes": 1024 * 1024 * 1024,
+    "layout_cache_sweep_every": 200,            # 추정치와 관계없이 캐시 폴더를 다시 훑어 정리하는 저장 횟수
+
+    # 레이아웃 요소 HTML 가공
+    "html_parser": "lxml",              # "lxml" 또는 "html.parser" (lxml이 설치되어 있지 않으면 html.parser)
+
+    # 이미지/표/수식 크롭 해상도 (카테고리별 dpi)
+    "crop_dpi": {
+        "figure": 300,
+        "table": 300,
+        "equation": 200,
+    },
+    "crop_workers": 4,                  # 크롭/PNG 인코딩 프로세스 수 (1이면 단일 프로세스)
+    "crop_parallel_min_elements": 32,   # 이보다 요소가 적으면 프로세스 풀을 띄우지 않음
+
+    # 요약/번역 단계 실행
+    "summary_max_parallel_stages": 4,   # 동시에 실행할 최대 단계 수
+
+    # LLM 요청 속도 제한 (API 키별, 워커 프로세스마다 따로 적용되므로 키 한도를 worker_pool_size로 나눈 값 권장)
+    "llm_requests_per_minute": 250,
+    "llm_tokens_per_minute": 100000,
+    "llm_burst_seconds": 10,                # 한 번에 몰아 보낼 수 있는 양 (이 시간 동안의 한도)
+    "llm_max_concurrency": 8,               # 단계 하나에서 동시에 보낼 최대 요청 수
+    "llm_max_retries": 5,                   # 429/일시적 오류 재시도 횟수 (Retry-After 또는 지수 백오프)
+    "llm_output_tokens_estimate": 500,      # 요청당 예상 출력 토큰 (실제 사용량으로 보정)
+    "llm_image_tokens_estimate": 1000,      # 이미지 입력당 예상 토큰
+
+    # LLM 요청 묶음/분할 (요청당 입력 토큰 예산)
+    "summary_pack_tokens": 3000,            # 섹션 요약
+    "translation_pack_tokens": 1500,        # 번역 (출력도 입력만큼 길어지므로 작게)
+
+    # 논문 전체 요약 (섹션 요약을 트리 형태로 줄임)
+    "reduce_max_tokens": 6000,              # 요약 요청 하나에 넣을 최대 입력 토큰
+    "reduce_fan_in": 8,                     # 요약 요청 하나에 넣을 최대 섹션 요약 수
+    "reduce_max_depth": 3,                  # 중간 요약 단계 최대 수 (넘으면 남은 요약을 한 번에 요약)
+
+    # LLM 응답 캐시 (요약, 번역, 멀티모달 체인)
+    "llm_cache_enabled": True,
+    "llm_cache_path": "cache/llm_cache.sqlite",
+    "llm_cache_max_bytes": 512 * 1024 * 1024,   # 초과 시 LRU 삭제
 
 }
\ No newline at end of file
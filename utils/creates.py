@@ -1,6 +1,12 @@
+import time
+
 from utils.Classes import GraphState
 from langchain_core.documents import Document
 
+from utils.config import config
+from utils.packing import run_packed_batch
+from utils.rate_limit import run_llm_batch
+from utils.tokens import count_tokens
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.chains.combine_documents import (
@@ -23,40 +29,79 @@ def create_text_summary(text_summary_chain, state: GraphState):
     # state에서 텍스트 데이터를 가져옵니다.
     texts = state["texts"]
 
-    # 요약된 텍스트를 저장할 딕셔너리를 초기화합니다.
-    text_summary = dict()
-
     # texts.items()를 페이지 번호(키)를 기준으로 오름차순 정렬합니다.
     sorted_texts = sorted(texts.items(), key=lambda x: x[0])
 
-    # 각 페이지의 텍스트를 Document 객체로 변환하여 입력 리스트를 생성합니다.
-    inputs = [
-        {"context": [Document(page_content=text)]} 
-        for page_num, text in sorted_texts 
-        if '# References' not in text
+    # References를 제외한 섹션에 순서대로 키("0", "1", ...)를 붙입니다.
+    sections = [
+        (str(i), text)
+        for i, text in enumerate(text for page_num, text in sorted_texts if '# References' not in text)
     ]
 
-    # text_summary_chain을 사용하여 일괄 처리로 요약을 생성합니다.
-    summaries = text_summary_chain.batch(inputs)
-
-    # 생성된 요약을 페이지 번호와 함께 딕셔너리에 저장합니다.
-    for page_num, summary in enumerate(summaries):
-        text_summary[str(page_num)] = summary
+    # 토큰 예산에 맞게 큰 섹션은 나누고 작은 섹션은 묶어서 요약합니다. (API 키별 속도 제한 적용)
+    text_summary = run_packed_batch(
+        text_summary_chain,
+        sections,
+        config["summary_pack_tokens"],
+        to_input=lambda text: {"context": [Document(page_content=text)]},
+        label="text_summary",
+    )
 
     # 요약된 텍스트를 포함한 새로운 GraphState 객체를 반환합니다.
     return GraphState(texts_summary=text_summary)
 
 
 
-def map_reduce_summary(paper_summary_chain, state: GraphState):
-    # state에서 텍스트 데이터를 가져옵니다.
-    texts = state["texts_summary"]
+def _group_by_budget(texts, max_tokens, fan_in):
+    """이웃한 텍스트를 fan_in개, max_tokens 이하로 묶음 (혼자 예산을 넘는 텍스트는 단독 그룹)"""
+    groups = []
+    current, current_tokens = [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if current and (len(current) >= fan_in or current_tokens + tokens > max_tokens):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
 
-    inputs = [text for _, text in texts.items()]
-    inputs = {"context": [Document(page_content="\n".join(inputs))]}
 
-    # paper_summary_chain을 사용하여 일괄 처리로 요약을 생성합니다.
-    summaries = paper_summary_chain.invoke(inputs)
+def map_reduce_summary(paper_summary_chain, state: GraphState):
+    """
+    섹션 요약들을 트리 형태로 줄여 논문 전체 요약을 만듭니다.
+    요약들을 토큰 예산(reduce_max_tokens)과 fan-in(reduce_fan_in)에 맞게 묶어 단계별로 병렬 요약하고,
+    하나의 요청에 모두 들어가거나 최대 깊이(reduce_max_depth)에 닿으면 마지막으로 한 번 요약합니다.
+    """
+    # state에서 텍스트 데이터를 가져옵니다.
+    texts = [text for _, text in state["texts_summary"].items()]
+
+    max_tokens = config["reduce_max_tokens"]
+    fan_in = config["reduce_fan_in"]
+    max_depth = config["reduce_max_depth"]
+
+    def to_input(group):
+        return {"context": [Document(page_content="\n".join(group))]}
+
+    level = 0
+    start = time.perf_counter()
+    while level < max_depth:
+        groups = _group_by_budget(texts, max_tokens, fan_in)
+        if len(groups) <= 1:
+            break
+        level_start = time.perf_counter()
+        texts = run_llm_batch(paper_summary_chain, [to_input(group) for group in groups],
+                              label=f"paper_summary L{level}")
+        print(f"map-reduce 레벨 {level}: 요약 {sum(len(group) for group in groups)}개 → {len(texts)}개 "
+              f"({time.perf_counter() - level_start:.2f}s)")
+        level += 1
+
+    # paper_summary_chain을 사용하여 최종 요약을 생성합니다.
+    level_start = time.perf_counter()
+    summaries = run_llm_batch(paper_summary_chain, [to_input(texts)], label="paper_summary")[0]
+    print(f"map-reduce 최종 (레벨 {level}): 요약 {len(texts)}개 → 1개 ({time.perf_counter() - level_start:.2f}s), "
+          f"전체 {time.perf_counter() - start:.2f}s")
 
     # 요약된 텍스트를 포함한 새로운 GraphState 객체를 반환합니다.
     return GraphState(paper_summary=summaries)
@@ -65,30 +110,22 @@ def map_reduce_summary(paper_summary_chain, state: GraphState):
 def create_text_trans_summary(trans_chain, state: GraphState):
 
     texts = state["texts_summary"]
-    
-    text_trans_summary = dict()
-    
-    # texts.items()를 페이지 번호(키)를 기준으로 오름차순 정렬합니다.
-    sorted_texts = sorted(texts.items(), key=lambda x: x[0])
 
-    # 각 페이지의 텍스트를 Document 객체로 변환하여 입력 리스트를 생성합니다.
-    inputs = [
-        {"context": [Document(page_content=text)]} for page_num, text in sorted_texts
-    ]
-
-    # text_summary_chain을 사용하여 일괄 처리로 요약을 생성합니다.
-    summaries = trans_chain.batch(inputs)
+    # 섹션 요약과 논문 전체 요약을 함께 번역합니다. (섹션 키는 texts_summary와 동일)
+    sections = list(texts.items()) + [("paper", state["paper_summary"])]
 
-    # 생성된 요약을 페이지 번호와 함께 딕셔너리에 저장합니다.
-    for page_num, summary in enumerate(summaries):
-        text_trans_summary[str(page_num)] = summary
+    # 요약은 대부분 짧으므로 토큰 예산만큼 묶어서 요청합니다. (API 키별 속도 제한 적용)
+    translated = run_packed_batch(
+        trans_chain,
+        sections,
+        config["translation_pack_tokens"],
+        to_input=lambda text: {"context": text},
+        label="text_trans_summary",
+    )
+    summaries_trans = translated.pop("paper")
 
-    paper_summary = state["paper_summary"]
-    # inputs = [text for _, text in paper_summary.items()]
-    # summaries_trans = trans_chain.invoke(inputs)
-    summaries_trans = trans_chain.invoke({"context": [Document(page_content=paper_summary)]})
     # 요약된 텍스트를 포함한 새로운 GraphState 객체를 반환합니다.
-    return GraphState(texts_trans_summary=text_trans_summary, paper_trans_summary=summaries_trans)
+    return GraphState(texts_trans_summary=translated, paper_trans_summary=summaries_trans)
 
 def create_text_trans(trans_chain, state: GraphState):
 
@@ -106,8 +143,8 @@ def create_text_trans(trans_chain, state: GraphState):
         if '# References' not in text
     ]
 
-    # text_summary_chain을 사용하여 일괄 처리로 요약을 생성합니다.
-    translated_paragraph = trans_chain.batch(inputs)
+    # trans_chain을 사용하여 일괄 처리로 번역합니다. (API 키별 속도 제한 적용)
+    translated_paragraph = run_llm_batch(trans_chain, inputs, label="text_trans")
 
     # 생성된 요약을 페이지 번호와 함께 딕셔너리에 저장합니다.
     for page_num, translated_text in enumerate(translated_paragraph):
@@ -224,12 +261,24 @@ from langchain_teddynote.models import MultiModal
 from langchain_core.runnables import chain
 
 
+def multimodal_batch(llm, image_paths, system_prompts, user_prompts, label="multimodal"):
+    """이미지별 메시지를 만들어 속도 제한을 지키며 일괄 질의하고 응답 텍스트 목록을 반환"""
+    multimodal_llm = MultiModal(llm)
+    messages = [
+        multimodal_llm.create_messages(image_path, system_prompt, user_prompt, display_image=False)
+        for image_path, system_prompt, user_prompt in zip(image_paths, system_prompts, user_prompts)
+    ]
+    responses = run_llm_batch(llm, messages, label=label)
+    return [response.content for response in responses]
+
+
 @chain
 def extract_image_summary(data_batches):
     # 객체 생성
     llm = ChatOpenAI(
         temperature=0,  # 창의성 (0.0 ~ 2.0)
         model_name="gpt-4o-mini",  # 모델명
+        max_retries=0,  # 429 재시도는 run_llm_batch에서 처리
     )
 
     system_prompt = """You are an expert in extracting useful information from IMAGE.
@@ -259,13 +308,8 @@ Output Format:
         system_prompts.append(system_prompt)
         user_prompts.append(user_prompt_template)
 
-    # 멀티모달 객체 생성
-    multimodal_llm = MultiModal(llm)
-
     # 이미지 파일로 부터 질의
-    answer = multimodal_llm.batch(
-        image_paths, system_prompts, user_prompts, display_image=False
-    )
+    answer = multimodal_batch(llm, image_paths, system_prompts, user_prompts, label="image_summary")
     return answer
 
 
@@ -275,6 +319,7 @@ def extract_table_summary(data_batches):
     llm = ChatOpenAI(
         temperature=0,  # 창의성 (0.0 ~ 2.0)
         model_name="gpt-4o-mini",  # 모델명
+        max_retries=0,  # 429 재시도는 run_llm_batch에서 처리
     )
 
     system_prompt = "You are an expert in extracting useful information from TABLE. With a given image, your task is to extract key entities, summarize them, and write useful information that can be used later for retrieval."
@@ -304,13 +349,8 @@ Output Format:
         system_prompts.append(system_prompt)
         user_prompts.append(user_prompt_template)
 
-    # 멀티모달 객체 생성
-    multimodal_llm = MultiModal(llm)
-
     # 이미지 파일로 부터 질의
-    answer = multimodal_llm.batch(
-        image_paths, system_prompts, user_prompts, display_image=False
-    )
+    answer = multimodal_batch(llm, image_paths, system_prompts, user_prompts, label="table_summary")
     return answer
 
 @chain
@@ -319,6 +359,7 @@ def extract_equation_summary(data_batches):
     llm = ChatOpenAI(
         temperature=0,  # 창의성 (0.0 ~ 2.0)
         model_name="gpt-4o-mini",  # 모델명
+        max_retries=0,  # 429 재시도는 run_llm_batch에서 처리
     )
 
     system_prompt = """You are an expert in extracting LaTeX equations from images. 
@@ -351,13 +392,8 @@ $$
         system_prompts.append(system_prompt)
         user_prompts.append(user_prompt_template)
 
-    # 멀티모달 객체 생성
-    multimodal_llm = MultiModal(llm)
-
     # 이미지 파일로 부터 질의
-    answer = multimodal_llm.batch(
-        image_paths, system_prompts, user_prompts, display_image=False
-    )
+    answer = multimodal_batch(llm, image_paths, system_prompts, user_prompts, label="equation_summary")
     return answer
 
 
@@ -430,6 +466,7 @@ def table_markdown_extractor(data_batches):
     llm = ChatOpenAI(
         temperature=0,  # 창의성 (0.0 ~ 2.0)
         model_name="gpt-4o-mini",  # 모델명
+        max_retries=0,  # 429 재시도는 run_llm_batch에서 처리
     )
 
     system_prompt = "You are an expert in converting image of the TABLE into markdown format. Be sure to include all the information in the table. DO NOT narrate, just answer in markdown format."
@@ -453,13 +490,8 @@ Output Format:
         system_prompts.append(system_prompt)
         user_prompts.append(user_prompt_template)
 
-    # 멀티모달 객체 생성
-    multimodal_llm = MultiModal(llm)
-
     # 이미지 파일로 부터 질의
-    answer = multimodal_llm.batch(
-        image_paths, system_prompts, user_prompts, display_image=False
-    )
+    answer = multimodal_batch(llm, image_paths, system_prompts, user_prompts, label="table_markdown")
     return answer
 
 
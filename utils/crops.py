@@ -1,44 +1,131 @@
-import os 
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf
 
 
 from utils.Classes import GraphState, ImageCropper
+from utils.config import config
 
-def crop_equation(state: GraphState):
+# 크롭 대상 요소 카테고리: (section_elements 내 요소 목록 키, 결과를 저장할 GraphState 키)
+CROP_CATEGORIES = {
+    "figure": ("image_elements", "images"),
+    "table": ("table_elements", "tables"),
+    "equation": ("equation_elements", "equation"),
+}
+
+
+def group_elements_by_page(state: GraphState, categories):
     """
-    PDF 파일에서 이미지를 추출하고 크롭하는 함수
+    크롭할 요소들을 페이지 번호별로 묶습니다.
 
     :param state: GraphState 객체
-    :return: 크롭된 이미지 정보가 포함된 GraphState 객체
+    :param categories: 크롭할 요소 카테고리 목록 (figure, table, equation)
+    :return: {페이지 번호: [요소, ...]} 딕셔너리
+    """
+    pages = dict()
+    for section_num in state["section_elements"]:
+        for category in categories:
+            elements_key, _ = CROP_CATEGORIES[category]
+            for element in state["section_elements"][section_num][elements_key]:
+                if element["category"] == category:
+                    pages.setdefault(int(element["page"]), []).append(element)
+    return pages
+
+
+def _crop_pages(pdf_file, page_tasks):
+    """
+    페이지 묶음 하나를 크롭하는 작업 (프로세스 풀 워커에서도 실행됨)
+
+    :param pdf_file: PDF 파일 경로
+    :param page_tasks: [(페이지 번호, [(요소 ID, 카테고리, 정규화 좌표, dpi, 저장 경로), ...]), ...]
+    :return: [(페이지 번호, 요소 ID, 카테고리, 저장 경로), ...]
+    """
+    results = []
+    with pymupdf.open(pdf_file) as doc:
+        for page_num, crops in page_tasks:
+            page = doc[page_num]  # 페이지당 한 번만 로드
+            for element_id, category, normalized_coordinates, dpi, output_file in crops:
+                # 요소 영역만 렌더링하여 저장
+                ImageCropper.crop_page_region(page, normalized_coordinates, output_file, dpi=dpi)
+                results.append((page_num, element_id, category, output_file))
+    return results
+
+
+def _split_page_tasks(page_tasks, workers):
+    """요소 수가 많은 페이지부터 가장 덜 찬 묶음에 배정하여 워커별 작업량을 고르게 나눔"""
+    buckets = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for page_task in sorted(page_tasks, key=lambda task: len(task[1]), reverse=True):
+        index = loads.index(min(loads))
+        buckets[index].append(page_task)
+        loads[index] += len(page_task[1])
+    return [sorted(bucket) for bucket in buckets if bucket]
+
+
+def crop_elements(state: GraphState, categories=("figure", "table", "equation"), workers=None):
+    """
+    PDF 파일에서 이미지, 표, 수식을 한 번에 크롭하는 함수.
+    문서를 한 번만 열고, 요소를 페이지별로 묶어 페이지 전체 대신 각 요소의 영역만
+    카테고리별 해상도(config의 crop_dpi)로 렌더링합니다.
+    요소가 많으면 페이지 묶음을 프로세스 풀에 나눠 렌더링과 PNG 인코딩을 병렬로 수행합니다.
+
+    :param state: GraphState 객체
+    :param categories: 크롭할 요소 카테고리 목록
+    :param workers: 크롭 프로세스 수 (None이면 config의 crop_workers와 CPU 수 중 작은 값, 1이면 현재 프로세스에서 실행)
+    :return: 크롭된 이미지/표/수식 경로가 포함된 GraphState 객체
     """
     pdf_file = state["filepath"]  # PDF 파일 경로
-    section_numbers = state["section_elements"]  # 처리할 페이지 번호 목록
     output_folder = os.path.splitext(pdf_file)[0]  # 출력 폴더 경로 설정
     os.makedirs(output_folder, exist_ok=True)  # 출력 폴더 생성
+    if workers is None:
+        workers = min(config["crop_workers"], os.cpu_count() or 1)
+
+    cropped = {CROP_CATEGORIES[category][1]: dict() for category in categories}
+    pages = group_elements_by_page(state, categories)
+
+    # 페이지별 크롭 작업 목록 생성 (좌표 정규화는 여기서 미리 계산)
+    page_tasks = []
+    for page_num in sorted(pages):
+        crops = []
+        for element in pages[page_num]:
+            normalized_coordinates = ImageCropper.normalize_coordinates(
+                element["bounding_box"], state["page_metadata"][page_num]["size"]
+            )
+            output_file = os.path.join(output_folder, f"{element['id']}.png")
+            dpi = config["crop_dpi"].get(element["category"], 300)
+            crops.append((element["id"], element["category"], normalized_coordinates, dpi, output_file))
+        page_tasks.append((page_num, crops))
+
+    element_count = sum(len(crops) for _, crops in page_tasks)
+    workers = min(workers, len(page_tasks))
+    if workers > 1 and element_count >= config["crop_parallel_min_elements"]:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [
+                executor.submit(_crop_pages, pdf_file, bucket)
+                for bucket in _split_page_tasks(page_tasks, workers)
+            ]
+            results = [result for future in futures for result in future.result()]
+        results.sort(key=lambda result: result[0])
+    else:
+        results = _crop_pages(pdf_file, page_tasks)
+
+    for page_num, element_id, category, output_file in results:
+        cropped[CROP_CATEGORIES[category][1]][str(element_id)] = output_file
+        print(f"page:{page_num}, id:{element_id}, path: {output_file}")
+
+    return GraphState(**cropped)  # 크롭된 이미지 정보를 포함한 GraphState 반환
 
-    cropped_equations = dict()  # 크롭된 이미지 정보를 저장할 딕셔너리
-    for section_num in section_numbers:
-        cur_page_num = -1
-        for element in state["section_elements"][section_num]["equation_elements"]:
-            page_num = element['page']
-            if cur_page_num != page_num:
-                cur_page_num = page_num
-                pdf_image = ImageCropper.pdf_to_image(pdf_file, page_num)  # PDF 페이지를 이미지로 변환
-        
-            if element["category"] == "equation":
-                # 이미지 요소의 좌표를 정규화
-                normalized_coordinates = ImageCropper.normalize_coordinates(
-                    element["bounding_box"], state["page_metadata"][page_num]["size"]
-                )
-
-                # 크롭된 이미지 저장 경로 설정
-                output_file = os.path.join(output_folder, f"{element['id']}.png")
-                # 이미지 크롭 및 저장
-                ImageCropper.crop_image(pdf_image, normalized_coordinates, output_file)
-                cropped_equations[str(element["id"])] = output_file
-                print(f"page:{page_num}, id:{element['id']}, path: {output_file}")
-                
-            
-    return GraphState(equation=cropped_equations)  # 크롭된 이미지 정보를 포함한 GraphState 반환
+
+def crop_equation(state: GraphState):
+    """
+    PDF 파일에서 수식을 추출하고 크롭하는 함수
+
+    :param state: GraphState 객체
+    :return: 크롭된 수식 이미지 정보가 포함된 GraphState 객체
+    """
+    return crop_elements(state, categories=["equation"])
 
 
 def crop_image(state: GraphState):
@@ -48,35 +135,7 @@ def crop_image(state: GraphState):
     :param state: GraphState 객체
     :return: 크롭된 이미지 정보가 포함된 GraphState 객체
     """
-    pdf_file = state["filepath"]  # PDF 파일 경로
-    section_numbers = state["section_elements"]  # 처리할 페이지 번호 목록
-    output_folder = os.path.splitext(pdf_file)[0]  # 출력 폴더 경로 설정
-    os.makedirs(output_folder, exist_ok=True)  # 출력 폴더 생성
-
-    cropped_images = dict()  # 크롭된 이미지 정보를 저장할 딕셔너리
-    for section_num in section_numbers:
-        cur_page_num = -1
-        for element in state["section_elements"][section_num]["image_elements"]:
-            page_num = element['page']
-            if cur_page_num != int(page_num):
-                cur_page_num = int(page_num)
-                pdf_image = ImageCropper.pdf_to_image(pdf_file, page_num)  # PDF 페이지를 이미지로 변환
-        
-            if element["category"] == "figure":
-                # 이미지 요소의 좌표를 정규화
-                normalized_coordinates = ImageCropper.normalize_coordinates(
-                    element["bounding_box"], state["page_metadata"][page_num]["size"]
-                )
-
-                # 크롭된 이미지 저장 경로 설정
-                output_file = os.path.join(output_folder, f"{element['id']}.png")
-                # 이미지 크롭 및 저장
-                ImageCropper.crop_image(pdf_image, normalized_coordinates, output_file)
-                cropped_images[str(element["id"])] = output_file
-                print(f"page:{page_num}, id:{str(element['id'])}, path: {output_file}")
-                
-            
-    return GraphState(images=cropped_images)  # 크롭된 이미지 정보를 포함한 GraphState 반환
+    return crop_elements(state, categories=["figure"])
 
 
 def crop_table(state: GraphState):
@@ -86,36 +145,4 @@ def crop_table(state: GraphState):
     :param state: GraphState 객체
     :return: 크롭된 표 이미지 정보가 포함된 GraphState 객체
     """
-    pdf_file = state["filepath"]  # PDF 파일 경로
-    section_numbers = state["section_elements"]  # 처리할 페이지 번호 목록
-    output_folder = os.path.splitext(pdf_file)[0]  # 출력 폴더 경로 설정
-    os.makedirs(output_folder, exist_ok=True)  # 출력 폴더 생성
-
-    cropped_images = dict()  # 크롭된 표 이미지 정보를 저장할 딕셔너리
-    for section_num in section_numbers:
-        cur_page_num = -1
-        for element in state["section_elements"][section_num]["table_elements"]:
-            page_num = element['page']
-            
-            if cur_page_num != page_num:
-                cur_page_num = page_num
-                pdf_image = ImageCropper.pdf_to_image(pdf_file, page_num)  # PDF 페이지를 이미지로 변환
-        
-            if element["category"] == "table":
-                # 표 요소의 좌표를 정규화
-                normalized_coordinates = ImageCropper.normalize_coordinates(
-                    element["bounding_box"], state["page_metadata"][page_num]["size"]
-                )
-
-                # 크롭된 표 이미지 저장 경로 설정
-                output_file = os.path.join(output_folder, f"{element['id']}.png")
-                # 표 이미지 크롭 및 저장
-                ImageCropper.crop_image(pdf_image, normalized_coordinates, output_file)
-                cropped_images[str(element["id"])] = output_file
-                print(f"page:{page_num}, id:{element['id']}, path: {output_file}")
-    
-    return GraphState(tables=cropped_images)  # 크롭된 표 이미지 정보를 포함한 GraphState 반환
-
-
-
-
+    return crop_elements(state, categories=["table"])
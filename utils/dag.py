@@ -0,0 +1,131 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.Classes import GraphState
+
+
+class Stage:
+    def __init__(self, name, func, inputs, outputs):
+        """
+        GraphState를 입력받아 일부 키(delta)를 반환하는 파이프라인 단계
+
+        :param name: 단계 이름
+        :param func: state를 받아 GraphState(delta)를 반환하는 함수
+        :param inputs: 이 단계가 읽는 GraphState 키 목록
+        :param outputs: 이 단계가 만들어내는 GraphState 키 목록
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+
+def _resolve_dependencies(stages, state):
+    """각 단계가 의존하는 선행 단계 이름 집합을 계산"""
+    producers = {}
+    for stage in stages:
+        for key in stage.outputs:
+            if key in producers:
+                raise ValueError(f"'{key}' 키를 두 단계가 생성합니다: {producers[key]}, {stage.name}")
+            producers[key] = stage.name
+
+    dependencies = {}
+    for stage in stages:
+        deps = set()
+        for key in stage.inputs:
+            if key in producers:
+                deps.add(producers[key])
+            elif key not in state:
+                raise ValueError(f"'{stage.name}' 단계의 입력 '{key}'를 만드는 단계가 없습니다.")
+        dependencies[stage.name] = deps
+    return dependencies
+
+
+def critical_path(timings, dependencies):
+    """가장 늦게 끝난 단계에서 거꾸로, 가장 늦게 끝난 선행 단계를 따라가며 임계 경로를 구함"""
+    if not timings:
+        return []
+    current = max(timings, key=lambda name: timings[name]["end"])
+    path = [current]
+    while dependencies[current]:
+        current = max(dependencies[current], key=lambda name: timings[name]["end"])
+        path.append(current)
+    return list(reversed(path))
+
+
+def format_report(report):
+    """단계별 소요 시간과 임계 경로를 문자열로 정리"""
+    lines = [f"전체 소요 시간: {report['wall_time']:.2f}s"]
+    for name, timing in sorted(report["timings"].items(), key=lambda item: item[1]["start"]):
+        lines.append(f"  {name:<24} {timing['start']:>8.2f}s ~ {timing['end']:>8.2f}s ({timing['duration']:.2f}s)")
+    path = " -> ".join(
+        f"{name}({report['timings'][name]['duration']:.2f}s)" for name in report["critical_path"]
+    )
+    lines.append(f"임계 경로: {path}")
+    return "\n".join(lines)
+
+
+def run_stages(stages, state: GraphState, max_workers=4, on_stage_done=None, checkpointer=None):
+    """
+    단계 간 입력/출력 의존성에 따라 서로 독립적인 단계를 동시에 실행합니다.
+
+    :param stages: Stage 목록
+    :param state: GraphState 객체 (각 단계의 결과가 갱신됨)
+    :param max_workers: 동시에 실행할 최대 단계 수
+    :param on_stage_done: 단계 완료 시 호출할 함수 (name, delta)
+    :param checkpointer: 단계 결과를 저장/재사용할 Checkpointer (None이면 사용하지 않음)
+    :return: 갱신된 state와 단계별 시간/임계 경로 리포트
+    """
+    dependencies = _resolve_dependencies(stages, state)
+    stage_map = {stage.name: stage for stage in stages}
+    remaining = dict(dependencies)
+    done = set()
+    timings = {}
+    running = {}
+
+    start = time.perf_counter()
+
+    def run(stage):
+        stage_start = time.perf_counter() - start
+        if checkpointer is None:
+            delta = stage.func(state)
+        else:
+            delta = checkpointer.run(stage.name, stage.func, state, stage.inputs)
+        stage_end = time.perf_counter() - start
+        return delta, stage_start, stage_end
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while remaining or running:
+                # 선행 단계가 모두 끝난 단계를 실행
+                ready = [name for name, deps in remaining.items() if deps <= done]
+                for name in ready:
+                    del remaining[name]
+                    running[executor.submit(run, stage_map[name])] = name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    delta, stage_start, stage_end = future.result()
+                    state.update(delta)
+                    done.add(name)
+                    timings[name] = {
+                        "start": stage_start,
+                        "end": stage_end,
+                        "duration": stage_end - stage_start,
+                    }
+                    print(f"단계 완료: {name} ({stage_end - stage_start:.2f}s)")
+                    if on_stage_done is not None:
+                        on_stage_done(name, delta)
+        except Exception:
+            # 실패 시 아직 시작하지 않은 단계는 취소하고 예외를 그대로 전달
+            for future in running:
+                future.cancel()
+            raise
+
+    report = {
+        "wall_time": time.perf_counter() - start,
+        "timings": timings,
+        "critical_path": critical_path(timings, dependencies),
+    }
+    return state, report
@@ -1,195 +1,381 @@
 import os 
 import re
-import json
 from bs4 import BeautifulSoup
 
 from utils.Classes import GraphState
+from utils.config import config
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml이 없으면 BeautifulSoup(html.parser)로 처리
+    lxml_html = None
+
+# 목록 항목 구분 방식: (항목 분리 패턴, 항목 기호 판별 함수) — '•' 기호 또는 '[숫자]'
+_NUMBER_MARK = re.compile(r'\[\d+\]')
+_BULLET_LIST = (re.compile(r'(•)'), '•'.__eq__)
+_NUMBERED_LIST = (re.compile(r'(\[\d+\])'), _NUMBER_MARK.match)
+
+# 번호 제목 판별을 한 번의 매칭으로: "2. Related Work" → 그룹 1 (h1), "1.1. 소제목" → 그룹 2 (h2),
+# "1.1.1 소제목" → 그룹 3 (h3). 마지막으로 매칭된 그룹 번호가 제목 단계
+_HEADING_NUMBER = re.compile(r"\d+\.(?:([^0-9])|\d+\.(?:([^0-9])|(\d)))")
+_HEADING_TAGS = (None, "h1", "h2", "h3")
+
+# HTML을 파싱해서 고쳐야 하는 요소 카테고리 (나머지는 원본 HTML을 그대로 사용)
+_PARSED_CATEGORIES = ("paragraph", "heading1", "caption", "figure", "equation")
+
+
+def _list_items(text, split_pattern, is_marker):
+    """목록 텍스트를 항목 기호(• 또는 [숫자]) 단위로 나눔 (빈 항목 제외)"""
+    items = []
+    current_item = ""
+    for item in split_pattern.split(text):
+        if is_marker(item):
+            if current_item.strip():
+                items.append(current_item.strip())
+            current_item = item  # 새로운 리스트 항목 시작
+        else:
+            current_item += item
+    # 마지막 리스트 항목 추가
+    if current_item.strip():
+        items.append(current_item.strip())
+    return items
+
+
+def _list_style(html):
+    """목록 HTML의 항목 구분 방식 (해당 없으면 None)"""
+    if '•' in html:
+        return _BULLET_LIST
+    if _NUMBER_MARK.search(html):
+        return _NUMBERED_LIST
+    return None
 
-def convert_to_list(html):
-    soup = BeautifulSoup(html, "html.parser")
 
-    # <p> 태그를 찾고 그 안의 내용을 처리
+def _heading_tag(string):
+    """제목 문자열의 단계 ("Abstract", "2. Related Work" → h1, "1.1. ..." → h2, "1.1.1 ..." → h3)"""
+    if not string:
+        return None
+    string = string.strip()
+    # 'Abstract'와 같은 명시적 제목 처리
+    if string == "Abstract":
+        return "h1"
+    # 숫자로 시작하는 제목 처리
+    match = _HEADING_NUMBER.match(string)
+    return _HEADING_TAGS[match.lastindex] if match else None
+
+
+def _image_src(output_folder, element_id):
+    return os.path.join(output_folder, f"{element_id}.png").replace("\\", "/")
+
+
+def _soup_to_list(soup, list_style):
+    """<p data-category="list">를 항목별 <li>를 가진 <ul>로 바꿈"""
     p_tag = soup.find("p", {"data-category": "list"})
-    
     if p_tag:
-        # '•' 기호를 기준으로 텍스트를 분리
-        items = re.split(r'(•)', p_tag.text)
-
-        # 새로운 <ul> 태그 생성
         ul_tag = soup.new_tag("ul")
-
         # <p> 태그의 id, data-category, style 속성을 <ul> 태그로 옮김
-        if p_tag.has_attr('id'):
-            ul_tag['id'] = p_tag['id']
-        if p_tag.has_attr('data-category'):
-            ul_tag['data-category'] = p_tag['data-category']
-        if p_tag.has_attr('style'):
-            ul_tag['style'] = p_tag['style']
-
-        current_item = ""
-        for item in items:
-            if item == '•':  # '•' 패턴인 경우
-                if current_item.strip():  # 빈 항목은 제외
-                    li_tag = soup.new_tag("li")
-                    li_tag.string = current_item.strip()
-                    ul_tag.append(li_tag)
-                current_item = item  # 새로운 리스트 항목 시작
-            else:
-                current_item += item
-
-        # 마지막 리스트 항목 추가
-        if current_item.strip():
+        for attribute in ("id", "data-category", "style"):
+            if p_tag.has_attr(attribute):
+                ul_tag[attribute] = p_tag[attribute]
+        for item in _list_items(p_tag.text, *list_style):
             li_tag = soup.new_tag("li")
-            li_tag.string = current_item.strip()
+            li_tag.string = item
             ul_tag.append(li_tag)
-
         # <p> 태그를 <ul> 태그로 교체
         p_tag.replace_with(ul_tag)
-
     return str(soup)
 
-def convert_to_numbered_list(html):
-    soup = BeautifulSoup(html, "html.parser")
 
-    # <p> 태그를 찾고 그 안의 내용을 처리
-    p_tag = soup.find("p", {"data-category": "list"})
-    
-    if p_tag:
-        # '[숫자]' 패턴을 기준으로 텍스트를 분리
-        items = re.split(r'(\[\d+\])', p_tag.text)
-
-        # 새로운 <ul> 태그 생성
-        ul_tag = soup.new_tag("ul")
-
-        # <p> 태그의 id, data-category, style 속성을 <ul> 태그로 옮김
-        if p_tag.has_attr('id'):
-            ul_tag['id'] = p_tag['id']
-        if p_tag.has_attr('data-category'):
-            ul_tag['data-category'] = p_tag['data-category']
-        if p_tag.has_attr('style'):
-            ul_tag['style'] = p_tag['style']
-
-        current_item = ""
-        for item in items:
-            if re.match(r'\[\d+\]', item):  # '[숫자]' 패턴인 경우
-                if current_item.strip():  # 빈 항목은 제외
-                    li_tag = soup.new_tag("li")
-                    li_tag.string = current_item.strip()
-                    ul_tag.append(li_tag)
-                current_item = item  # 새로운 숫자 리스트 시작
-            else:
-                current_item += item
+def convert_to_list(html):
+    return _soup_to_list(BeautifulSoup(html, "html.parser"), _BULLET_LIST)
 
-        # 마지막 리스트 항목 추가
-        if current_item.strip():
-            li_tag = soup.new_tag("li")
-            li_tag.string = current_item.strip()
-            ul_tag.append(li_tag)
 
-        # <p> 태그를 <ul> 태그로 교체
-        p_tag.replace_with(ul_tag)
+def convert_to_numbered_list(html):
+    return _soup_to_list(BeautifulSoup(html, "html.parser"), _NUMBERED_LIST)
 
-    return str(soup)
 
 def process_html(html):
-    if '•' in html:
-        return convert_to_list(html)  # •가 있으면 convert_to_list 함수 호출
-    elif re.search(r'\[\d+\]', html):
-        return convert_to_numbered_list(html)  # [숫자]가 있으면 convert_to_numbered_list 함수 호출
-    else:
-        return html  # 아무 조건도 맞지 않으면 원본 html 반환
+    # •가 있으면 글머리 기호 목록, [숫자]가 있으면 번호 목록으로 변환 (아무 조건도 맞지 않으면 원본 html 반환)
+    list_style = _list_style(html)
+    if list_style is None:
+        return html
+    return _soup_to_list(BeautifulSoup(html, "html.parser"), list_style)
 
 
 def process_html_string(html_str):
     # 1. 'para-<br>metric'처럼 <br> 앞에 '-'가 있으면 붙여준다.
-    html_str = re.sub(r'-<br>', '', html_str)
-
     # 2. '<br>'을 만나면 한 칸 띄어쓰기
-    html_str = re.sub(r'<br>', ' ', html_str)
+    return html_str.replace('-<br>', '').replace('<br>', ' ')
 
-    return html_str
 
-def extract_start_end_page(filename):
+def _process_element_soup(element, output_folder):
     """
-    파일 이름에서 시작 페이지와 끝 페이지 번호를 추출하는 함수입니다.
+    BeautifulSoup(html.parser)로 요소 HTML을 한 번 파싱해 가공합니다 (lxml이 없을 때 사용).
 
-    :param filename: 분석할 파일의 이름
-    :return: 시작 페이지 번호와 끝 페이지 번호를 튜플로 반환
+    :return: 1단계 제목이면 제목 텍스트, 아니면 None
     """
-    # 파일 경로에서 파일 이름만 추출
-    file_name = os.path.basename(filename)
-    # 파일 이름을 '_' 기준으로 분리
-    file_name_parts = file_name.split("_")
-
-    if len(file_name_parts) >= 3:
-        # 파일 이름의 뒤에서 두 번째 부분에서 숫자를 추출하여 시작 페이지로 설정
-        start_page = int(re.findall(r"(\d+)", file_name_parts[-2])[0])
-        # 파일 이름의 마지막 부분에서 숫자를 추출하여 끝 페이지로 설정
-        end_page = int(re.findall(r"(\d+)", file_name_parts[-1])[0])
+    category = element["category"]
+    if category == "list":
+        element["html"] = process_html(process_html_string(element["html"]))
+        return None
+    if category not in _PARSED_CATEGORIES:
+        return None
+
+    soup = BeautifulSoup(element["html"], "html.parser")
+
+    # 제목 처리
+    if category in ("paragraph", "heading1"):
+        subtitle_tag = soup.find(["p", "h1"])
+        tag_name = _heading_tag(subtitle_tag.string) if subtitle_tag else None
+        if tag_name:
+            new_subtitle_tag = soup.new_tag(tag_name, id=subtitle_tag.get("id"))
+            element["category"] = f"heading{tag_name[1]}"
+            new_subtitle_tag.string = subtitle_tag.string
+            subtitle_tag.replace_with(new_subtitle_tag)
+            element["html"] = str(soup)
+
+    # 캡션 처리
+    elif category == "caption":
+        caption_tag = soup.find("caption")
+        if caption_tag and caption_tag.string:
+            new_caption_tag = soup.new_tag("blockquote", id=caption_tag.get("id"), style=caption_tag["style"])
+            new_caption_tag.string = caption_tag.string
+            caption_tag.replace_with(new_caption_tag)
+            element["html"] = str(soup)
+
+    # 이미지 처리
+    elif category == "figure":
+        img_tag = soup.find("img")
+        img_tag["alt"] = img_tag["alt"].replace('-\n', '').replace('\n', ' ')
+        img_tag["src"] = _image_src(output_folder, element["id"])
+        element["html"] = str(soup)
+
+    # 수식 처리: 수식 태그를 크롭 이미지로 교체
+    elif category == "equation":
+        equation_tag = soup.find("p", {"data-category": "equation"})
+        equation_img_tag = soup.new_tag("img")
+        equation_img_tag["alt"] = "equation"
+        equation_img_tag["id"] = str(element["id"])
+        equation_img_tag["src"] = _image_src(output_folder, element["id"])
+        equation_tag.insert_after(equation_img_tag)
+        equation_tag.decompose()
+        element["html"] = str(soup)
+
+    if element["category"] == "heading1":
+        return soup.find("h1").get_text(separator="\n")
+    return None
+
+
+# lxml 트리를 BeautifulSoup(html.parser)의 str(soup)과 같은 문자열로 직렬화하기 위한 규칙
+_VOID_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta",
+    "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+])
+_PRESERVE_WHITESPACE_TAGS = frozenset(["pre", "textarea"])
+_ASCII_SPACES = frozenset("\x20\x0a\x09\x0c\x0d")
+
+
+def _collapse(text, preserve=False):
+    """공백 문자로만 된 문자열은 BeautifulSoup처럼 줄바꿈 또는 공백 하나로 줄임"""
+    if not text or preserve or not all(char in _ASCII_SPACES for char in text):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _quote_attribute(value):
+    value = _escape(value)
+    if '"' in value:
+        if "'" in value:
+            return '"' + value.replace('"', "&quot;") + '"'
+        return "'" + value + "'"
+    return '"' + value + '"'
+
+
+def _lxml_serialize(element, parts, preserve=False):
+    tag = element.tag
+    if not isinstance(tag, str):
+        # 주석만 남기고 처리 지시문 등은 무시
+        if element.text is not None and "comment" in str(tag).lower():
+            parts.append(f"<!--{element.text}-->")
     else:
-        # 파일 이름 형식이 예상과 다를 경우 기본값 설정
-        start_page, end_page = 0, 0
+        attributes = "".join(f" {name}={_quote_attribute(value)}" for name, value in sorted(element.attrib.items()))
+        if tag in _VOID_TAGS:
+            parts.append(f"<{tag}{attributes}/>")
+        else:
+            preserve_children = preserve or tag in _PRESERVE_WHITESPACE_TAGS
+            parts.append(f"<{tag}{attributes}>")
+            if element.text:
+                parts.append(_escape(_collapse(element.text, preserve_children)))
+            for child in element:
+                _lxml_serialize(child, parts, preserve_children)
+            parts.append(f"</{tag}>")
+    if element.tail:
+        parts.append(_escape(_collapse(element.tail, preserve)))
+
+
+def _lxml_fragment_html(root):
+    """파싱할 때 감싼 <div> 안의 내용을 직렬화"""
+    parts = [_escape(_collapse(root.text))] if root.text else []
+    for child in root:
+        _lxml_serialize(child, parts)
+    return "".join(parts)
+
+
+def _lxml_strings(element):
+    """BeautifulSoup get_text()가 모으는 문자열 (주석 제외, 공백 규칙 동일)"""
+    if isinstance(element.tag, str):
+        if element.text:
+            yield _collapse(element.text)
+        for child in element:
+            yield from _lxml_strings(child)
+            if child.tail:
+                yield _collapse(child.tail)
+
+
+def _lxml_string(element):
+    """BeautifulSoup Tag.string: 자식이 문자열 하나면 그 문자열, 태그 하나뿐이면 그 태그의 .string"""
+    if len(element) == 0:
+        return _collapse(element.text) if element.text else None
+    child = element[0]
+    if len(element) == 1 and not element.text and not child.tail and isinstance(child.tag, str):
+        return _lxml_string(child)
+    return None
+
+
+def _lxml_find(root, tags, **attributes):
+    for element in root.iter(*tags):
+        if all(element.get(name) == value for name, value in attributes.items()):
+            return element
+    return None
 
-    return start_page, end_page
 
-def extract_page_metadata(state: GraphState):
+def _lxml_replace(old, new):
+    new.tail = old.tail
+    old.getparent().replace(old, new)
+
+
+def _lxml_new_tag(root, tag, string=None, **attributes):
+    element = root.makeelement(tag, {name: value for name, value in attributes.items() if value is not None})
+    element.text = string
+    return element
+
+
+def _process_element_lxml(element, output_folder):
     """
-    분석된 JSON 파일들에서 페이지 메타데이터를 추출하는 함수입니다.
+    lxml로 요소 HTML을 한 번 파싱해 가공하고, 바뀐 경우에만 마지막에 한 번 직렬화합니다.
+    결과 문자열은 _process_element_soup과 같습니다.
 
-    :param state: 현재의 GraphState 객체
-    :return: 페이지 메타데이터가 추가된 새로운 GraphState 객체
+    :return: 1단계 제목이면 제목 텍스트, 아니면 None
     """
-    # 분석된 JSON 파일 목록 가져오기
-    json_files = state["analyzed_files"]
+    category = element["category"]
+    if category == "list":
+        element["html"] = process_html_string(element["html"])
+        list_style = _list_style(element["html"])
+        if list_style is None:
+            return None
+        root = lxml_html.fragment_fromstring(element["html"], create_parent="div")
+        p_tag = _lxml_find(root, ["p"], **{"data-category": "list"})
+        if p_tag is not None:
+            ul_tag = _lxml_new_tag(root, "ul", **{name: p_tag.get(name) for name in ("id", "data-category", "style")})
+            for item in _list_items("".join(_lxml_strings(p_tag)), *list_style):
+                ul_tag.append(_lxml_new_tag(root, "li", item))
+            _lxml_replace(p_tag, ul_tag)
+        element["html"] = _lxml_fragment_html(root)
+        return None
+    if category not in _PARSED_CATEGORIES:
+        return None
+
+    root = lxml_html.fragment_fromstring(element["html"], create_parent="div")
+    changed = False
+
+    # 제목 처리
+    if category in ("paragraph", "heading1"):
+        subtitle_tag = _lxml_find(root, ["p", "h1"])
+        string = _lxml_string(subtitle_tag) if subtitle_tag is not None else None
+        tag_name = _heading_tag(string)
+        if tag_name:
+            element["category"] = f"heading{tag_name[1]}"
+            _lxml_replace(subtitle_tag, _lxml_new_tag(root, tag_name, string, id=subtitle_tag.get("id")))
+            changed = True
+
+    # 캡션 처리
+    elif category == "caption":
+        caption_tag = _lxml_find(root, ["caption"])
+        string = _lxml_string(caption_tag) if caption_tag is not None else None
+        if string:
+            _lxml_replace(caption_tag, _lxml_new_tag(root, "blockquote", string, id=caption_tag.get("id"),
+                                                     style=caption_tag.attrib["style"]))
+            changed = True
+
+    # 이미지 처리
+    elif category == "figure":
+        img_tag = _lxml_find(root, ["img"])
+        img_tag.set("alt", img_tag.attrib["alt"].replace('-\n', '').replace('\n', ' '))
+        img_tag.set("src", _image_src(output_folder, element["id"]))
+        changed = True
+
+    # 수식 처리: 수식 태그를 크롭 이미지로 교체
+    elif category == "equation":
+        equation_tag = _lxml_find(root, ["p"], **{"data-category": "equation"})
+        _lxml_replace(equation_tag, _lxml_new_tag(root, "img", alt="equation", id=str(element["id"]),
+                                                  src=_image_src(output_folder, element["id"])))
+        changed = True
+
+    if changed:
+        element["html"] = _lxml_fragment_html(root)
+
+    if element["category"] == "heading1":
+        return "\n".join(_lxml_strings(_lxml_find(root, ["h1"])))
+    return None
+
+
+def _element_processor():
+    """설정된 HTML 파서에 맞는 요소 가공 함수 (lxml이 없으면 html.parser)"""
+    if config["html_parser"] == "lxml" and lxml_html is not None:
+        return _process_element_lxml
+    return _process_element_soup
+
+
+def iter_layout(analyzed_layouts):
+    """
+    청크별 레이아웃 분석 결과를 한 번 순회하면서 페이지 메타데이터와 요소를 청크 단위로 함께 내보냅니다.
+    요소는 하나씩 복사해 문서 기준 페이지 번호로 바꿔 내보내므로 (분석 결과 원본은 그대로)
+    문서 전체 요소 목록을 따로 만들지 않습니다.
+
+    :param analyzed_layouts: [{"layout", "start_page", "end_page"}, ...]
+    :return: (pages, elements) 반복자
+             - pages: {문서 기준 페이지 번호: {"size": [너비, 높이]}}
+             - elements: 해당 청크의 정규화된 요소 반복자
+    """
+    for analyzed in analyzed_layouts:
+        # 청크의 시작 페이지 번호 (원본 문서 기준)
+        start_page = analyzed["start_page"]
+        layout = analyzed["layout"]
+
+        pages = {
+            start_page + int(page["page"]) - 1: {"size": [int(page["width"]), int(page["height"])]}
+            for page in layout["metadata"]["pages"]
+        }
+        yield pages, _normalized_elements(layout["elements"], start_page)
 
-    # 페이지 메타데이터를 저장할 딕셔너리 초기화
-    page_metadata = dict()
 
-    for json_file in json_files:
-        # JSON 파일 열기 및 데이터 로드
-        with open(json_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-
-        # 파일명에서 시작 페이지 번호 추출
-        start_page, _ = extract_start_end_page(json_file)
-
-        # JSON 데이터에서 각 페이지의 메타데이터 추출
-        for element in data["metadata"]["pages"]:
-            # 원본 페이지 번호
-            original_page = int(element["page"])
-            # 상대적 페이지 번호 계산 (전체 문서 기준)
-            relative_page = start_page + original_page - 1
-
-            # 페이지 크기 정보 추출
-            metadata = {
-                "size": [
-                    int(element["width"]),
-                    int(element["height"]),
-                ],
-            }
-            # 상대적 페이지 번호를 키로 하여 메타데이터 저장
-            page_metadata[relative_page] = metadata
-
-    # 추출된 페이지 메타데이터로 새로운 GraphState 객체 생성 및 반환
-    return GraphState(page_metadata=page_metadata)
+def _normalized_elements(elements, start_page):
+    for element in elements:
+        element = dict(element)
+        element["page"] = start_page + int(element["page"]) - 1
+        yield element
 
 
-def extract_page_elements(state: GraphState):
+def _section_elements(elements, output_folder):
     """
-    Extract and process page elements from PDF analysis JSON files.
-    
-    Args:
-        state (GraphState): Input state containing analyzed files and PDF filepath
-    
-    Returns:
-        GraphState: Processed state with section elements, names, and HTML content
+    정규화된 요소를 순서대로 가공하여 1단계 제목 기준 섹션으로 묶습니다.
+
+    :return: section_elements, section_names, html_content를 담은 딕셔너리
     """
-    # 분석된 JSON 파일 목록을 가져옵니다.
-    json_files = state["analyzed_files"]
-    
-    pdf_file = state["filepath"]  # PDF 파일 경로
-    output_folder = os.path.splitext(pdf_file)[0]  # 출력 폴더 경로 설정
-    
     # 섹션별 요소를 저장할 딕셔너리를 초기화합니다.
     section_elements = {}
     section_names = []
@@ -200,140 +386,81 @@ def extract_page_elements(state: GraphState):
     section_id = -1
     current_section_name = ''
 
-    def process_subtitle(soup, element, subtitle_tag):
-        """서브 타이틀 처리를 위한 내부 함수"""
-        # 'Abstract'와 같은 명시적 제목 처리
-        if subtitle_tag.string and subtitle_tag.string.strip() == "Abstract":
-            new_subtitle_tag = soup.new_tag("h1", id=subtitle_tag.get("id"))
-            element["category"] = 'heading1'
-            new_subtitle_tag.string = subtitle_tag.string
-            subtitle_tag.replace_with(new_subtitle_tag)
-            element["html"] = str(soup)
-            return element
-        
-        # 숫자로 시작하는 제목 처리 (예: "2. Related Work")
-        if subtitle_tag.string and re.match(r"^\d+\.", subtitle_tag.string.strip()):
-            # 1단계 제목 (예: "2. Related Work")
-            if re.match(r"^\d+\.[^0-9]", subtitle_tag.string.strip()):
-                new_subtitle_tag = soup.new_tag("h1", id=subtitle_tag.get("id"))
-                element["category"] = 'heading1'
-            # 2단계 제목 (예: "1.1. 소제목")
-            elif re.match(r"^\d+\.\d+\.[^0-9]", subtitle_tag.string.strip()):
-                new_subtitle_tag = soup.new_tag("h2", id=subtitle_tag.get("id"))
-                element["category"] = 'heading2'
-            # 3단계 제목 (예: "1.1.1. 소제목")
-            elif re.match(r"^\d+\.\d+\.\d+", subtitle_tag.string.strip()):
-                new_subtitle_tag = soup.new_tag("h3", id=subtitle_tag.get("id"))
-                element["category"] = 'heading3'
-            else:
-                return element
-            
-            new_subtitle_tag.string = subtitle_tag.string
-            subtitle_tag.replace_with(new_subtitle_tag)
-            element["html"] = str(soup)
-        
-        return element
-    
-    def process_figure_image(soup, element, output_folder):
-        """이미지 처리를 위한 내부 함수"""
-        img_tag = soup.find("img")
-        img_tag["alt"] = img_tag["alt"].replace('-\n', '').replace('\n', ' ')
-        img_tag["src"] = os.path.join(output_folder, f"{element['id']}.png").replace("\\", "/")
-        # img_tag["src"] = f"{element['id']}.png"
-        element["html"] = str(soup)
-        return element
+    process_element = _element_processor()
 
-    def process_equation(soup, element, output_folder):
-        """수식 처리를 위한 내부 함수"""
-        equation_tag = soup.find("p", {"data-category": "equation"})
-        equation_img_tag = soup.new_tag("img")
-        equation_img_tag["alt"] = "equation"
-        equation_img_tag["id"] = str(element['id'])
-        equation_img_tag["src"] = os.path.join(output_folder, f"{element['id']}.png").replace("\\", "/")
-        # equation_img_tag["src"] = f"{element['id']}.png"
-        equation_tag.insert_after(equation_img_tag)
-        equation_tag.decompose()  # 기존 수식 태그를 삭제
-        element["html"] = str(soup)
-        return element
-
-    # 각 JSON 파일을 순회하며 처리합니다.
-    for json_file in json_files:
-        # 파일명에서 시작 페이지 번호를 추출합니다.
-        start_page, _ = extract_start_end_page(json_file)
-
-        # JSON 파일을 열어 데이터를 로드합니다.
-        with open(json_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-
-        # JSON 데이터의 각 요소를 처리합니다.
-        for element in data["elements"]:
-            # HTML 파싱
-            soup = BeautifulSoup(element["html"], "html.parser")
-
-            # 제목 처리
-            if element["category"] in ["paragraph", 'heading1']:
-                subtitle_tag = soup.find(["p", "h1"])
-                if subtitle_tag:
-                    element = process_subtitle(soup, element, subtitle_tag)
-
-            # 캡션 처리
-            elif element["category"] == "caption":
-                caption_tag = soup.find("caption")
-                if caption_tag:
-                    new_caption_tag = soup.new_tag("blockquote", 
-                                                   id=caption_tag.get("id"), 
-                                                   style=caption_tag["style"])
-                    if caption_tag.string:
-                        new_caption_tag.string = caption_tag.string
-                        caption_tag.replace_with(new_caption_tag)
-                        element["html"] = str(soup)
-
-            # 이미지 처리
-            elif element["category"] == "figure":
-                element = process_figure_image(soup, element, output_folder)
-            
-            # 수식 처리
-            elif element["category"] == "equation":
-                element = process_equation(soup, element, output_folder)
-            
-            # 리스트 처리
-            elif element["category"] == "list":
-                element["html"] = process_html_string(element["html"])
-                element["html"] = process_html(element["html"])
-
-            # 1단계 제목 처리
-            if element["category"] == 'heading1':
-                current_section_name = soup.find('h1').get_text(separator="\n")
-                current_section_name = current_section_name.replace('-\n', '').replace(' \n ', ' ')
-                section_names.append(current_section_name)
-                section_id += 1
-                element["html"] = process_html_string(element["html"])
-
-            # 페이지 번호 처리
-            original_page = int(element["page"])
-            relative_page = start_page + original_page - 1
-            element["page"] = relative_page
-
-            # 고유 ID 부여
-            element["id"] = element_id
-            element_id += 1
-
-            # 섹션 요소 추가
-            if current_section_name and section_id != -1:
-                if section_id not in section_elements:
-                    section_elements[section_id] = []
-                
-                # footnote와 footer 제외
-                if element["category"] not in ["footnote", "footer"]:
-                    section_elements[section_id].append(element)
-                    html_content.append(element["html"])
-
-    # 처리된 요소들로 새로운 GraphState 객체 생성 및 반환
-    return GraphState(
-        section_elements=section_elements, 
-        section_names=section_names, 
-        html_content=html_content
-    )
+    for element in elements:
+        # 제목/캡션/이미지/수식/리스트 처리 (요소당 HTML 파싱은 한 번, 필요한 카테고리만)
+        heading_text = process_element(element, output_folder)
+
+        # 1단계 제목 처리
+        if element["category"] == 'heading1':
+            current_section_name = heading_text.replace('-\n', '').replace(' \n ', ' ')
+            section_names.append(current_section_name)
+            section_id += 1
+            element["html"] = process_html_string(element["html"])
+
+        # 고유 ID 부여
+        element["id"] = element_id
+        element_id += 1
+
+        # 섹션 요소 추가
+        if current_section_name and section_id != -1:
+            if section_id not in section_elements:
+                section_elements[section_id] = []
+
+            # footnote와 footer 제외
+            if element["category"] not in ["footnote", "footer"]:
+                section_elements[section_id].append(element)
+                html_content.append(element["html"])
+
+    return dict(section_elements=section_elements, section_names=section_names, html_content=html_content)
+
+
+def extract_page_layout(state: GraphState):
+    """
+    청크별 레이아웃 분석 결과를 한 번만 순회하여 페이지 메타데이터와 섹션별 요소를 함께 추출합니다.
+
+    :param state: 현재의 GraphState 객체 (analyzed_layouts, filepath)
+    :return: page_metadata, section_elements, section_names, html_content가 추가된 GraphState 객체
+    """
+    output_folder = os.path.splitext(state["filepath"])[0]  # 출력 폴더 경로 설정
+    page_metadata = dict()
+
+    def elements():
+        for pages, chunk_elements in iter_layout(state["analyzed_layouts"]):
+            page_metadata.update(pages)
+            yield from chunk_elements
+
+    sections = _section_elements(elements(), output_folder)
+    return GraphState(page_metadata=page_metadata, **sections)
+
+
+def extract_page_metadata(state: GraphState):
+    """
+    청크별 레이아웃 분석 결과에서 페이지 메타데이터를 추출하는 함수입니다.
+
+    :param state: 현재의 GraphState 객체
+    :return: 페이지 메타데이터가 추가된 새로운 GraphState 객체
+    """
+    page_metadata = dict()
+    for pages, _ in iter_layout(state["analyzed_layouts"]):
+        page_metadata.update(pages)
+    return GraphState(page_metadata=page_metadata)
+
+
+def extract_page_elements(state: GraphState):
+    """
+    Extract and process page elements from the in-memory layout analysis results.
+    
+    Args:
+        state (GraphState): Input state containing analyzed layouts and PDF filepath
+    
+    Returns:
+        GraphState: Processed state with section elements, names, and HTML content
+    """
+    output_folder = os.path.splitext(state["filepath"])[0]  # 출력 폴더 경로 설정
+    elements = (element for _, chunk_elements in iter_layout(state["analyzed_layouts"]) for element in chunk_elements)
+    return GraphState(**_section_elements(elements, output_folder))
 
 
 def extract_tag_elements_per_page(state: GraphState):
@@ -1,7 +1,10 @@
 import pymupdf
-import os 
+import time
+import asyncio
 
 from utils.Classes import GraphState
+from utils.config import config
+from utils.http_client import new_async_client
 
 def page_numbers(state: GraphState):
     return GraphState(page_numbers=list(state["section_elements"].keys()))
@@ -9,10 +12,11 @@ def page_numbers(state: GraphState):
 
 def split_pdf(state: GraphState):
     """
-    입력 PDF를 여러 개의 작은 PDF 파일로 분할합니다.
+    입력 PDF를 여러 개의 작은 PDF 청크로 분할합니다.
+    청크는 디스크에 쓰지 않고 메모리(바이트)로 보관하며, 원본 기준 페이지 범위를 함께 기록합니다.
 
     :param state: GraphState 객체, PDF 파일 경로와 배치 크기 정보를 포함
-    :return: 분할된 PDF 파일 경로 목록을 포함한 GraphState 객체
+    :return: 분할된 PDF 청크 목록을 포함한 GraphState 객체
     """
     # PDF 파일 경로와 배치 크기 추출
     filepath = state["filepath"]
@@ -28,46 +32,93 @@ def split_pdf(state: GraphState):
     for start_page in range(0, num_pages, batch_size):
         # 배치의 마지막 페이지 계산 (전체 페이지 수를 초과하지 않도록)
         end_page = min(start_page + batch_size, num_pages) - 1
+        print(f"분할 PDF 생성: {start_page:04d}-{end_page:04d}")
 
-        # 분할된 PDF 파일명 생성
-        input_file_basename = os.path.splitext(filepath)[0]
-        output_file = f"{input_file_basename}_{start_page:04d}_{end_page:04d}.pdf"
-        print(f"분할 PDF 생성: {output_file}")
-
-        # 새로운 PDF 파일 생성 및 페이지 삽입
+        # 새로운 PDF 청크 생성 및 페이지 삽입
         with pymupdf.open() as output_pdf:
             output_pdf.insert_pdf(input_pdf, from_page=start_page, to_page=end_page)
-            output_pdf.save(output_file)
-            ret.append(output_file)
+            ret.append({
+                # 문서 ID를 새로 만들지 않아 같은 페이지 범위는 항상 같은 바이트 (레이아웃 캐시 키)
+                "content": output_pdf.tobytes(no_new_id=True),
+                "start_page": start_page,
+                "end_page": end_page,
+            })
 
     # 원본 PDF 파일 닫기
     input_pdf.close()
 
-    # 분할된 PDF 파일 경로 목록을 포함한 GraphState 객체 반환
-    return GraphState(split_filepaths=ret)
+    # 분할된 PDF 청크 목록을 포함한 GraphState 객체 반환
+    return GraphState(split_chunks=ret)
 
 
-# 분할된 PDF 파일 목록을 가져옵니다.
-def analyze_layout(analyzer, state: GraphState):
+def _chunk_name(chunk):
+    return f"{chunk['start_page']:04d}_{chunk['end_page']:04d}.pdf"
 
-    split_files = state["split_filepaths"]
 
-    # 분석된 파일들의 경로를 저장할 리스트를 초기화합니다.
-    analyzed_files = []
+def _analyzed_layout(chunk, layout):
+    return {
+        "layout": layout,
+        "start_page": chunk["start_page"],
+        "end_page": chunk["end_page"],
+    }
 
-    # 각 분할된 PDF 파일에 대해 레이아웃 분석을 수행합니다.
-    for file in split_files:
-        # 레이아웃 분석을 실행하고 결과 파일 경로를 리스트에 추가합니다.
-        analyzed_files.append(analyzer.execute(file))
 
-    # image_processor = PDFImageProcessor(file_path)
-    # output_folder, filename, html_content = image_processor.extract_images()
-    
-    # md_output_file = save_results(output_folder, filename, html_content)
-    
-    # 분석된 파일 경로들을 정렬하여 새로운 GraphState 객체를 생성하고 반환합니다.
-    # 정렬은 파일들의 순서를 유지하기 위해 수행됩니다.
-    return GraphState(analyzed_files=sorted(analyzed_files))
+def _timed_layout_analysis(analyzer, chunk):
+    """청크 하나의 레이아웃 분석을 실행하고 소요 시간을 기록합니다."""
+    name = _chunk_name(chunk)
+    start = time.perf_counter()
+    layout = analyzer.execute(chunk["content"], name)
+    elapsed = time.perf_counter() - start
+    print(f"레이아웃 분석 완료: {name} ({elapsed:.2f}s)")
+    return _analyzed_layout(chunk, layout)
+
+
+async def _analyze_layout_async(analyzer, chunks, max_in_flight):
+    """하나의 이벤트 루프와 연결 풀에서 최대 max_in_flight개의 청크를 동시에 분석합니다."""
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def analyze(client, chunk):
+        name = _chunk_name(chunk)
+        async with semaphore:
+            start = time.perf_counter()
+            layout = await analyzer.aexecute(client, chunk["content"], name)
+            elapsed = time.perf_counter() - start
+        print(f"레이아웃 분석 완료: {name} ({elapsed:.2f}s)")
+        return _analyzed_layout(chunk, layout)
+
+    async with new_async_client() as client:
+        # gather는 입력 순서대로 결과를 돌려주므로 청크 순서가 유지됩니다.
+        return await asyncio.gather(*(analyze(client, chunk) for chunk in chunks))
+
+
+# 분할된 PDF 청크 목록을 가져옵니다.
+def analyze_layout(analyzer, state: GraphState, max_in_flight=None):
+    """
+    분할된 PDF 청크들의 레이아웃 분석을 수행합니다.
+
+    :param analyzer: LayoutAnalyzer 객체
+    :param state: GraphState 객체, 분할된 PDF 청크 목록을 포함
+    :param max_in_flight: 동시에 진행할 최대 요청 수 (None이면 config의 layout_max_in_flight, 1이면 순차 실행)
+    :return: 청크별 분석 결과(JSON)와 페이지 범위 목록을 포함한 GraphState 객체
+    """
+    chunks = state["split_chunks"]
+    if max_in_flight is None:
+        max_in_flight = config["layout_max_in_flight"]
+
+    start = time.perf_counter()
+
+    # 각 분할된 PDF 청크에 대해 레이아웃 분석을 수행합니다.
+    # 동시 실행은 스레드 대신 비동기 요청(세마포어로 동시 요청 수 제한)으로 처리합니다.
+    if max_in_flight > 1 and len(chunks) > 1:
+        analyzed_layouts = asyncio.run(_analyze_layout_async(analyzer, chunks, max_in_flight))
+    else:
+        analyzed_layouts = [_timed_layout_analysis(analyzer, chunk) for chunk in chunks]
+
+    elapsed = time.perf_counter() - start
+    print(f"레이아웃 분석 전체: {len(chunks)}개 청크, batch_size={state['batch_size']}, "
+          f"max_in_flight={max_in_flight} ({elapsed:.2f}s)")
+
+    return GraphState(analyzed_layouts=analyzed_layouts)
 
 
 from bs4 import BeautifulSoup
@@ -97,27 +148,16 @@ def html_to_markdown_table(html_content):
     return markdown_table
 
 
-from langchain_community.document_loaders import DirectoryLoader
-from langchain_community.document_loaders import TextLoader
-
-from langchain_text_splitters import (
-    Language,
-    RecursiveCharacterTextSplitter,
-    MarkdownHeaderTextSplitter
-)
+from langchain_text_splitters import MarkdownHeaderTextSplitter
 
 
-def load_and_split(sources):
-    
-    # DirectoryLoader를 사용하여 .md 파일 로드
-    loader = DirectoryLoader(".", glob=sources, loader_cls=TextLoader)
-    docs = loader.load()
-
-    markdown_document = ""
-
-    for doc in docs:
-        markdown_document += doc.page_content + "\n\n"
+def split_markdown(markdown_document):
+    """
+    메모리의 Markdown 문서를 헤더(#, ##, ###) 단위로 분할하고 References 섹션을 제외합니다.
 
+    :param markdown_document: Markdown 문자열
+    :return: 헤더 메타데이터가 포함된 Document 목록
+    """
     headers_to_split_on = [
         ("#", "Header 1"),  # 분할할 헤더 레벨과 해당 레벨의 이름을 지정합니다.
         ("##", "Header 2"),  # 분할할 헤더 레벨과 해당 레벨의 이름을 지정합니다.
@@ -130,6 +170,6 @@ def load_and_split(sources):
     )
     md_header_splits = markdown_splitter.split_text(markdown_document)
 
-    new_docs = [doc for doc in md_header_splits if 'References' not in doc.metadata['Header 1']]
+    new_docs = [doc for doc in md_header_splits if 'References' not in doc.metadata.get('Header 1', '')]
 
-    return new_docs
\ No newline at end of file
+    return new_docs
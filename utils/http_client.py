@@ -0,0 +1,117 @@
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from utils.config import config
+
+# 재시도할 응답 상태 코드 (요청 한도 초과, 일시적 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _timeout():
+    return httpx.Timeout(config["http_timeout_seconds"], connect=config["http_connect_timeout_seconds"])
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=config["http_max_connections"],
+        max_keepalive_connections=config["http_max_connections"],
+    )
+
+
+def retry_after_seconds(response):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 변환 (없거나 해석할 수 없으면 None)"""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, response=None):
+    """
+    재시도 대기 시간. 서버가 Retry-After를 주면 그 값을, 아니면 지수 백오프(+지터)를 사용합니다.
+
+    :param attempt: 0부터 시작하는 재시도 횟수
+    :param response: 마지막 응답 (연결 오류면 None)
+    """
+    delay = retry_after_seconds(response)
+    if delay is None:
+        delay = config["http_backoff_base_seconds"] * (2 ** attempt)
+        delay += random.uniform(0, delay / 2)
+    return min(delay, config["http_backoff_max_seconds"])
+
+
+def _should_retry(attempt, response=None):
+    return attempt < config["http_max_retries"] and (response is None or response.status_code in RETRY_STATUS_CODES)
+
+
+def request_with_retry(client: httpx.Client, method, url, **kwargs):
+    """429/5xx 응답과 연결 오류를 백오프하며 재시도하는 요청 (마지막 응답을 그대로 반환)"""
+    attempt = 0
+    while True:
+        try:
+            response = client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if not _should_retry(attempt):
+                raise
+            delay = backoff_delay(attempt)
+            print(f"HTTP 연결 오류, {delay:.1f}s 후 재시도 ({attempt + 1}/{config['http_max_retries']}): {e!r}")
+        else:
+            if not _should_retry(attempt, response):
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f"HTTP {response.status_code}, {delay:.1f}s 후 재시도 ({attempt + 1}/{config['http_max_retries']})")
+        time.sleep(delay)
+        attempt += 1
+
+
+async def arequest_with_retry(client: httpx.AsyncClient, method, url, **kwargs):
+    """request_with_retry의 비동기 버전"""
+    attempt = 0
+    while True:
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if not _should_retry(attempt):
+                raise
+            delay = backoff_delay(attempt)
+            print(f"HTTP 연결 오류, {delay:.1f}s 후 재시도 ({attempt + 1}/{config['http_max_retries']}): {e!r}")
+        else:
+            if not _should_retry(attempt, response):
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f"HTTP {response.status_code}, {delay:.1f}s 후 재시도 ({attempt + 1}/{config['http_max_retries']})")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """프로세스 전체에서 공유하는 keep-alive 연결 풀 (스레드 안전)"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(timeout=_timeout(), limits=_limits())
+        return _client
+
+
+def new_async_client():
+    """
+    비동기 클라이언트 생성. AsyncClient는 이벤트 루프에 묶이므로
+    한 번의 asyncio.run 안에서 `async with`로 만들어 쓰고 닫습니다.
+    """
+    return httpx.AsyncClient(timeout=_timeout(), limits=_limits())
@@ -0,0 +1,26 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+
+def loads(data):
+    """JSON 디코딩 (bytes 또는 str)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """UTF-8 JSON 인코딩 (json.dumps(ensure_ascii=False)와 같은 내용)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def load_file(path):
+    """JSON 파일을 한 번에 읽어 디코딩"""
+    with open(path, "rb") as f:
+        return loads(f.read())
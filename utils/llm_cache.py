@@ -0,0 +1,134 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from utils.config import config
+
+# 멀티모달 프롬프트에 포함된 base64 이미지 (data URL)
+_DATA_URL_PATTERN = re.compile(r"data:[\w/+.-]+;base64,([A-Za-z0-9+/=]+)")
+# llm_string에서 모델명 추출
+_MODEL_NAME_PATTERN = re.compile(r'"model(?:_name)?":\s*"([^"]+)"')
+
+
+def _hash_data_url(match):
+    digest = hashlib.sha256(match.group(1).encode("ascii")).hexdigest()
+    return f"image-sha256:{digest}"
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    모델 설정(llm_string), 렌더링된 프롬프트로 캐시 키를 만듭니다.
+    멀티모달 입력은 base64 본문 대신 이미지 내용의 해시를 사용합니다.
+    """
+    normalized_prompt = _DATA_URL_PATTERN.sub(_hash_data_url, prompt)
+    return hashlib.sha256(f"{llm_string}\x00{normalized_prompt}".encode("utf-8")).hexdigest()
+
+
+class LRUDiskCache(BaseCache):
+    def __init__(self, database_path: str, max_bytes: int):
+        """
+        디스크(SQLite)에 LLM 응답을 저장하는 캐시. 전체 크기가 max_bytes를 넘으면
+        가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+
+        :param database_path: 캐시 SQLite 파일 경로
+        :param max_bytes: 캐시 최대 크기 (바이트)
+        """
+        self.database_path = database_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(database_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, value TEXT, size INTEGER, last_access REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache_stats (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def _connect(self):
+        # 워커 프로세스 여럿이 같은 파일을 쓰므로 잠금 대기 시간을 넉넉히 준다
+        return sqlite3.connect(self.database_path, timeout=30)
+
+    def _count(self, conn, name):
+        conn.execute(
+            "INSERT INTO llm_cache_stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = cache_key(prompt, llm_string)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                self._count(conn, "misses")
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            self._count(conn, "hits")
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        key = cache_key(prompt, llm_string)
+        value = dumps(list(return_val))
+        model_match = _MODEL_NAME_PATTERN.search(llm_string)
+        model = model_match.group(1) if model_match else ""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, value, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, value, len(value), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래된 항목 삭제"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evict_keys = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            evict_keys.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", evict_keys)
+        self._count(conn, "evictions")
+
+    def clear(self, **kwargs) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        """이 프로세스의 적중/실패 횟수와 캐시 전체 누적 통계"""
+        with self._lock, self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+            totals = dict(conn.execute("SELECT name, value FROM llm_cache_stats").fetchall())
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+            "evictions": totals.get("evictions", 0),
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_llm_cache = None
+
+
+def get_llm_cache():
+    """프로세스 전체에서 공유하는 LLM 응답 캐시"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LRUDiskCache(config["llm_cache_path"], config["llm_cache_max_bytes"])
+    return _llm_cache
@@ -0,0 +1,156 @@
+import re
+
+from utils.prompt import packed_sections_instruction
+from utils.rate_limit import run_llm_batch
+from utils.tokens import count_tokens
+
+# 묶음 요청에서 섹션을 구분하는 표시 줄
+SECTION_MARKER = "<<<SECTION {index}>>>"
+_SECTION_MARKER_PATTERN = re.compile(r"^[ \t]*<<<SECTION (\d+)>>>[ \t]*$", re.MULTILINE)
+
+# 큰 텍스트를 나눌 때 시도하는 경계 (문단 → 줄 → 문장 → 단어)
+_SEPARATORS = ["\n\n", "\n", ". ", " "]
+
+
+def split_text(text, max_tokens, separators=_SEPARATORS):
+    """
+    텍스트를 max_tokens 이하의 조각으로 나눕니다. 문단, 줄, 문장, 단어 순으로 경계를 찾고,
+    그래도 큰 조각은 글자 수로 자릅니다. 조각을 순서대로 이어 붙이면 원문이 됩니다.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    if not separators:
+        # 경계가 없는 긴 문자열: 토큰 비율로 글자 수를 잡아 자름
+        size = max(1, len(text) * max_tokens // count_tokens(text))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    separator, rest = separators[0], separators[1:]
+    units = [unit + separator for unit in text.split(separator)]
+    units[-1] = units[-1][:-len(separator)]
+
+    # 경계 단위의 토큰 수를 더해가며 채움 (단위마다 한 번만 계산)
+    pieces = []
+    current, current_tokens = "", 0
+    for unit in units:
+        tokens = count_tokens(unit)
+        if current_tokens + tokens <= max_tokens:
+            current += unit
+            current_tokens += tokens
+            continue
+        if current:
+            pieces.append(current)
+        if tokens > max_tokens:
+            pieces.extend(split_text(unit, max_tokens, rest))
+            current, current_tokens = "", 0
+        else:
+            current, current_tokens = unit, tokens
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_texts(texts, max_tokens):
+    """
+    순서가 있는 텍스트 목록을 max_tokens 이하의 요청 단위로 묶습니다.
+    큰 텍스트는 나누고 작은 텍스트는 이웃과 합치며, 결과를 순서대로 이어 붙이면 원래 순서가 유지됩니다.
+    """
+    packed = []
+    current, current_tokens = [], 0
+    for text in texts:
+        for piece in split_text(text, max_tokens):
+            tokens = count_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                packed.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        packed.append("\n\n".join(current))
+    return packed
+
+
+def _marked_context(texts):
+    body = "\n\n".join(
+        f"{SECTION_MARKER.format(index=index)}\n{text}" for index, text in enumerate(texts)
+    )
+    return f"{packed_sections_instruction.format(count=len(texts))}\n\n{body}"
+
+
+def _parse_marked_output(output, count):
+    """묶음 응답을 섹션별로 나눔 (표시 줄이 0..count-1을 정확히 한 번씩 포함하지 않으면 None)"""
+    matches = list(_SECTION_MARKER_PATTERN.finditer(output))
+    if [int(match.group(1)) for match in matches] != list(range(count)):
+        return None
+    return [
+        output[match.end():matches[i + 1].start() if i + 1 < len(matches) else len(output)].strip()
+        for i, match in enumerate(matches)
+    ]
+
+
+def run_packed_batch(runnable, sections, max_tokens, to_input, label="llm"):
+    """
+    섹션별 LLM 요청을 토큰 예산에 맞게 묶거나 나눠 실행하고, 섹션 키별 결과를 돌려줍니다.
+
+    - max_tokens보다 큰 섹션은 나눠서 요청하고 결과를 순서대로 이어 붙입니다.
+    - 작은 섹션들은 이웃끼리 표시 줄(<<<SECTION n>>>)로 구분해 한 요청에 넣고 응답을 다시 나눕니다.
+      응답에서 표시 줄을 찾지 못하면 해당 섹션들만 하나씩 다시 요청합니다.
+
+    :param runnable: 체인
+    :param sections: [(키, 텍스트), ...] (순서 유지)
+    :param max_tokens: 요청당 입력 토큰 예산
+    :param to_input: 텍스트를 체인 입력으로 바꾸는 함수
+    :param label: 로그에 표시할 단계 이름
+    :return: {키: 결과}
+    """
+    # 요청 단위 만들기: (섹션 키 목록, 텍스트 목록)
+    requests = []
+    group_keys, group_texts, group_tokens = [], [], 0
+
+    def flush():
+        nonlocal group_keys, group_texts, group_tokens
+        if group_keys:
+            requests.append((group_keys, group_texts))
+        group_keys, group_texts, group_tokens = [], [], 0
+
+    for key, text in sections:
+        tokens = count_tokens(text)
+        if tokens > max_tokens:
+            flush()
+            for piece in split_text(text, max_tokens):
+                requests.append(([key], [piece]))
+            continue
+        if group_keys and group_tokens + tokens > max_tokens:
+            flush()
+        group_keys.append(key)
+        group_texts.append(text)
+        group_tokens += tokens
+    flush()
+
+    inputs = [
+        to_input(texts[0] if len(texts) == 1 else _marked_context(texts))
+        for _, texts in requests
+    ]
+    outputs = run_llm_batch(runnable, inputs, label=label)
+
+    # 응답을 섹션별로 나누기 (나눠진 섹션은 조각 결과를 순서대로 모음)
+    parts = {key: [] for key, _ in sections}
+    fallback = []
+    for (keys, texts), output in zip(requests, outputs):
+        if len(keys) == 1:
+            parts[keys[0]].append(output)
+            continue
+        split_outputs = _parse_marked_output(output, len(keys))
+        if split_outputs is None:
+            fallback.extend(zip(keys, texts))
+            continue
+        for key, split_output in zip(keys, split_outputs):
+            parts[key].append(split_output)
+
+    if fallback:
+        print(f"{label}: 묶음 응답에서 섹션 표시를 찾지 못해 {len(fallback)}개 섹션을 개별 요청합니다.")
+        fallback_outputs = run_llm_batch(runnable, [to_input(text) for _, text in fallback], label=f"{label}(개별)")
+        for (key, _), output in zip(fallback, fallback_outputs):
+            parts[key].append(output)
+
+    print(f"{label}: 섹션 {len(sections)}개 → 요청 {len(requests) + len(fallback)}건 (예산 {max_tokens} tokens)")
+    return {key: "\n\n".join(parts[key]) for key, _ in sections}
@@ -110,3 +110,10 @@ trans_prompt = """You are a translator specializing in academic papers.
     {context}
 
     TRANSLATION:"""
+
+
+# 작은 섹션 여러 개를 한 요청에 묶을 때 CONTEXT 앞에 붙이는 안내문
+packed_sections_instruction = """The CONTEXT below contains {count} independent sections. Each section starts with a marker line such as <<<SECTION 0>>>.
+Apply the REQUEST to each section separately and do not merge them.
+In your answer, repeat each marker line exactly as given, on its own line, followed by the result for that section, in the same order.
+Do not write anything outside the marked sections."""
@@ -0,0 +1,248 @@
+import os
+import time
+import asyncio
+import hashlib
+import threading
+
+import openai
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+
+from utils.config import config
+from utils.http_client import backoff_delay
+from utils.tokens import count_tokens
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst_seconds=60):
+        """
+        분당 한도(per_minute)의 속도로 채워지는 토큰 버킷 (최대 burst_seconds 동안의 양까지 쌓임).
+        잔량을 미리 차감(예약)하고 부족한 만큼 기다릴 시간을 돌려주므로, 잠금은 계산에만 쓰고
+        대기는 호출한 쪽(이벤트 루프)에서 합니다. 여러 스레드/이벤트 루프가 함께 써도 안전합니다.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now, factor):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate * factor)
+        self.updated = now
+
+    def reserve(self, amount, now, factor=1.0):
+        """amount만큼 차감하고 잔량이 다시 0 이상이 될 때까지의 대기 시간(초)을 반환"""
+        self._refill(now, factor)
+        self.available -= amount
+        if self.available >= 0:
+            return 0.0
+        return -self.available / (self.rate * factor)
+
+    def adjust(self, amount):
+        """예약량과 실제 사용량의 차이를 반영 (양수면 추가 차감, 음수면 환급)"""
+        self.available = min(self.capacity, self.available - amount)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute, tokens_per_minute, burst_seconds=60):
+        """
+        API 키 하나에 대한 요청 수(RPM) / 토큰 수(TPM) 한도.
+        429를 받으면 잠시 모든 요청을 멈추고 채움 속도를 절반으로 줄였다가, 성공할 때마다 조금씩 회복합니다.
+        """
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.factor = 1.0           # 적응형 속도 배율 (0.1 ~ 1.0)
+        self.paused_until = 0.0
+        self.epoch = 0              # 429가 발생할 때마다 증가 (그 전에 잡아 둔 예약은 무효)
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens):
+        """요청 1건과 예상 토큰 수를 예약하고 (기다릴 시간(초), 예약 시점의 epoch)를 반환"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self.requests.reserve(1, now, self.factor),
+                self.tokens.reserve(min(tokens, self.tokens.capacity), now, self.factor),
+            )
+            return max(wait, self.paused_until - now), self.epoch
+
+    def cancel(self, tokens):
+        """사용하지 않은 예약을 되돌림"""
+        with self._lock:
+            self.requests.adjust(-1)
+            self.tokens.adjust(-min(tokens, self.tokens.capacity))
+
+    def pause_remaining(self):
+        with self._lock:
+            return max(0.0, self.paused_until - time.monotonic())
+
+    def record_usage(self, reserved, used):
+        with self._lock:
+            self.tokens.adjust(used - min(reserved, self.tokens.capacity))
+            self.factor = min(1.0, self.factor + 0.02)
+
+    def throttled(self, delay):
+        """429 응답: 잠시 전체 요청을 멈추고 속도를 줄임"""
+        with self._lock:
+            now = time.monotonic()
+            # 같은 순간 몰려온 429들은 한 번의 초과로 보고 속도는 한 번만 줄임
+            if now >= self.paused_until:
+                self.factor = max(0.1, self.factor / 2)
+                self.epoch += 1
+                # 쌓여 있던 여유분을 비워 재개 직후 한꺼번에 몰리지 않도록 함
+                self.requests.available = min(self.requests.available, 0.0)
+                self.tokens.available = min(self.tokens.available, 0.0)
+            self.paused_until = max(self.paused_until, now + delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key=None):
+    """API 키별로 공유하는 RateLimiter (키 원문 대신 해시로 구분)"""
+    api_key = api_key or os.environ.get("OPENAI_API_KEY", "")
+    key = hashlib.sha256(api_key.encode()).hexdigest()
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(
+                config["llm_requests_per_minute"],
+                config["llm_tokens_per_minute"],
+                burst_seconds=config["llm_burst_seconds"],
+            )
+        return _limiters[key]
+
+
+def estimate_tokens(value):
+    """체인 입력(문자열, Document, dict, 멀티모달 메시지)의 예상 입력 토큰 수"""
+    if isinstance(value, str):
+        return count_tokens(value)
+    if isinstance(value, Document):
+        return count_tokens(value.page_content)
+    if isinstance(value, dict):
+        if value.get("type") == "image_url":
+            return config["llm_image_tokens_estimate"]
+        return sum(estimate_tokens(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_tokens(item) for item in value)
+    return 0
+
+
+class _UsageCallback(BaseCallbackHandler):
+    """호출 한 건에서 실제로 사용한 토큰 수를 기록"""
+
+    def __init__(self):
+        self.total_tokens = None
+
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        total = usage.get("total_tokens")
+        if total is None:
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    total = (total or 0) + metadata.get("total_tokens", 0)
+        if total is not None:
+            self.total_tokens = (self.total_tokens or 0) + total
+
+
+# 클라이언트 자체 재시도(max_retries=0으로 끔) 대신 여기서 재시도하는 일시적 오류 (연결 끊김, 시간 초과, 5xx)
+TRANSIENT_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError)
+
+
+async def _abatch(runnable, inputs, limiter, max_concurrency, stats):
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(item):
+        reserved = estimate_tokens(item) + config["llm_output_tokens_estimate"]
+        attempt = 0
+        async with semaphore:
+            while True:
+                wait, epoch = limiter.reserve(reserved)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if limiter.epoch != epoch:
+                    # 기다리는 동안 429가 발생: 예약을 되돌리고 멈춤이 끝난 뒤 다시 예약
+                    limiter.cancel(reserved)
+                    await asyncio.sleep(limiter.pause_remaining())
+                    continue
+                usage = _UsageCallback()
+                try:
+                    result = await runnable.ainvoke(item, config={"callbacks": [usage]})
+                except openai.RateLimitError as e:
+                    stats["throttled"] += 1
+                    if attempt >= config["llm_max_retries"]:
+                        raise
+                    delay = backoff_delay(attempt, getattr(e, "response", None))
+                    limiter.cancel(reserved)  # 거절된 요청은 한도에서 제외
+                    limiter.throttled(delay)
+                    print(f"LLM 429, {delay:.1f}s 후 재시도 ({attempt + 1}/{config['llm_max_retries']})")
+                    attempt += 1
+                    continue
+                except TRANSIENT_ERRORS as e:
+                    stats["errors"] += 1
+                    if attempt >= config["llm_max_retries"]:
+                        raise
+                    # 속도 한도 문제가 아니므로 전체 속도는 줄이지 않고 이 요청만 백오프 후 재시도
+                    delay = backoff_delay(attempt, getattr(e, "response", None))
+                    limiter.cancel(reserved)
+                    print(f"LLM {type(e).__name__}, {delay:.1f}s 후 재시도 ({attempt + 1}/{config['llm_max_retries']})")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                used = usage.total_tokens if usage.total_tokens is not None else reserved
+                limiter.record_usage(reserved, used)
+                stats["tokens"] += used
+                return result
+
+    return await asyncio.gather(*(run(item) for item in inputs))
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_event_loop():
+    """
+    LLM 호출 전용 이벤트 루프 (백그라운드 스레드에서 계속 실행).
+    ChatOpenAI는 첫 호출 때 만든 비동기 HTTP 클라이언트를 그 이벤트 루프에 묶어 재사용하므로,
+    호출마다 asyncio.run으로 새 루프를 만들면 두 번째 배치부터 연결 오류가 납니다.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return _loop
+
+
+def run_llm_batch(runnable, inputs, label="llm", api_key=None, max_concurrency=None):
+    """
+    LLM 체인을 입력 목록에 대해 비동기로 실행합니다 (결과는 입력 순서 유지).
+    API 키별 RPM/TPM 토큰 버킷으로 속도를 맞추고, 429와 일시적 오류(연결 끊김, 시간 초과, 5xx)는
+    Retry-After/지수 백오프 후 재시도합니다.
+
+    :param runnable: ainvoke를 지원하는 체인 또는 LLM
+    :param inputs: 입력 목록
+    :param label: 로그에 표시할 단계 이름
+    :param api_key: 한도를 공유할 API 키 (None이면 OPENAI_API_KEY 환경 변수)
+    :param max_concurrency: 동시에 보낼 최대 요청 수 (None이면 config의 llm_max_concurrency)
+    :return: 결과 목록
+    """
+    inputs = list(inputs)
+    if not inputs:
+        return []
+    limiter = get_rate_limiter(api_key)
+    max_concurrency = max_concurrency or config["llm_max_concurrency"]
+    stats = {"tokens": 0, "throttled": 0, "errors": 0}
+
+    start = time.perf_counter()
+    future = asyncio.run_coroutine_threadsafe(
+        _abatch(runnable, inputs, limiter, max_concurrency, stats), _get_event_loop()
+    )
+    results = future.result()
+    elapsed = time.perf_counter() - start
+
+    print(f"LLM 배치 {label}: {len(inputs)}건, {stats['tokens']} tokens, "
+          f"{stats['tokens'] / elapsed if elapsed > 0 else 0:.0f} tokens/s, 429 {stats['throttled']}회, "
+          f"일시적 오류 {stats['errors']}회 ({elapsed:.2f}s)")
+    return results
@@ -33,22 +33,18 @@ def format_text(text):
 
 
 
-def save_results(output_folder, filename, html_content):
-    
-    # 1. HTML 파일 저장
-    html_output_file = os.path.join(output_folder, f"{filename}.html")
+def html_to_markdown(html_content):
+    """
+    HTML 요소 목록을 하나의 HTML 문자열과 Markdown 문자열로 변환합니다.
+
+    :param html_content: 요소별 HTML 문자열 목록
+    :return: (결합된 HTML, Markdown)
+    """
     combined_html_content = "\n".join(html_content)
     soup = BeautifulSoup(combined_html_content, "html.parser")
     all_tags = set([tag.name for tag in soup.find_all()])
     html_tag_list = [tag for tag in list(all_tags) if tag not in ["br"]]
 
-    with open(html_output_file, "w", encoding="utf-8") as f:
-        f.write(combined_html_content)
-    
-    print(f"HTML 파일이 {html_output_file}에 저장되었습니다.")
-    
-    # 2. Markdown 파일 저장
-    md_output_file = os.path.join(output_folder, f"{filename}.md")
     md_output = markdown(
         combined_html_content,
         convert=html_tag_list,
@@ -56,6 +52,24 @@ def save_results(output_folder, filename, html_content):
     )
     
     # md_output = format_markdown_headers(md_output)
+    
+    return combined_html_content, md_output
+
+
+def save_results(output_folder, filename, html_content):
+    
+    combined_html_content, md_output = html_to_markdown(html_content)
+    
+    # 1. HTML 파일 저장
+    html_output_file = os.path.join(output_folder, f"{filename}.html")
+
+    with open(html_output_file, "w", encoding="utf-8") as f:
+        f.write(combined_html_content)
+    
+    print(f"HTML 파일이 {html_output_file}에 저장되었습니다.")
+    
+    # 2. Markdown 파일 저장
+    md_output_file = os.path.join(output_folder, f"{filename}.md")
 
     with open(md_output_file, "w", encoding="utf-8") as f:
         f.write(md_output)
@@ -63,4 +77,3 @@ def save_results(output_folder, filename, html_content):
     print(f"Markdown 파일이 {md_output_file}에 저장되었습니다.")
     
     return md_output_file
-
@@ -0,0 +1,30 @@
+import threading
+
+_encodings = {}
+_lock = threading.Lock()
+
+
+def _get_encoding(model):
+    """모델의 tiktoken 인코딩 (tiktoken이 없거나 인코딩 파일을 받을 수 없으면 None, 실패도 캐시)"""
+    with _lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                print(f"tiktoken 인코딩을 사용할 수 없어 글자 수로 토큰을 추정합니다: {e!r}")
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text, model="gpt-4o-mini"):
+    """텍스트의 토큰 수 (tiktoken을 쓸 수 없으면 글자 수 / 4로 추정)"""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
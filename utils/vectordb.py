@@ -23,6 +23,13 @@ def get_embedding(config):
     # embeddings = OpenAIEmbeddings()
     return embeddings
 
+def _texts_by_id(batches):
+    """요약 배치 목록을 id → 텍스트 사전으로 변환 (같은 id가 여러 번 나오면 첫 번째 텍스트)"""
+    texts = {}
+    for batch in batches:
+        texts.setdefault(batch['id'], batch['text'])
+    return texts
+
 def build_db(data):
     
     text_splitter = RecursiveCharacterTextSplitter(
@@ -36,105 +43,46 @@ def build_db(data):
     is_separator_regex=False,
     )
     
+    # 이미지/테이블 요약 배치의 텍스트를 id로 한 번에 찾을 수 있도록 색인 (같은 id는 첫 번째 항목 사용)
+    image_texts = _texts_by_id(data['image_summary_data_batches'])
+    table_texts = _texts_by_id(data['table_summary_data_batches'])
+    
+    # (요소 목록 키, 요약 키, 파일 경로 키, 배치 텍스트 색인, 메타데이터의 경로/요약 이름)
+    media_kinds = [
+        ('image_elements', 'images_summary', 'images', image_texts, 'image_path', 'image_summary'),
+        ('table_elements', 'tables_summary', 'tables', table_texts, 'table_path', 'table_summary'),
+    ]
+    
     docs = []
     for key, value in data['section_elements'].items():
         section_name = data['section_names'][int(key)]
         
-        if value['image_elements']:
-            for element in value['image_elements']:
-                category = element['category']
-                page = element['page']
+        for elements_key, summary_key, path_key, texts, path_name, summary_name in media_kinds:
+            for element in value[elements_key]:
                 id = element['id']
-                try:
-                    print(list(data['images_summary'].keys()))
-                    image_summary = data['images_summary'][str(id)]
-                except:
-                    print(list(data['images_summary'].keys()))
-                    image_summary = data['images_summary'][str(id)]
-                
-                try:
-                    print(list(data['images'].keys()))
-                    image_path = data['images'][str(id)]
-                except:
-                    print(list(data['images'].keys()))
-                    image_path = data['images'][str(id)]
-                    
-                img_text = ''
-                for img_ele in data['image_summary_data_batches']:
-                    if img_ele['id'] == str(id):
-                        img_text = img_ele['text']
-                        break
-                
                 metadata = {
-                    'category': category,
+                    'category': element['category'],
                     'section' : section_name,
-                    'page': page,
+                    'page': element['page'],
                     'id': id, 
-                    'image_path': image_path,
-                    'image_summary': image_summary
+                    path_name: data[path_key][str(id)],
+                    summary_name: data[summary_key][str(id)]
                 }
-                page_content = img_text
-                
-                doc = Document(page_content=page_content, metadata=metadata)
-                docs.append(doc)
-                
-        if value['table_elements']:
-            for element in value['table_elements']:
-                category = element['category']
-                page = element['page']
-                id = element['id']
-                
-                try:
-                    print(list(data['tables_summary'].keys()))
-                    table_summary = data['tables_summary'][str(id)]
-                except:
-                    print(list(data['tables_summary'].keys()))
-                    table_summary = data['tables_summary'][str(id)]
-                
-                try:
-                    print(list(data['tables'].keys()))
-                    table_path = data['tables'][str(id)]
-                except:
-                    print(list(data['tables'].keys()))
-                    table_path = data['tables'][str(id)]
-                
-                table_text = ''
-                for tab_ele in data['table_summary_data_batches']:
-                    if tab_ele['id'] == str(id):
-                        table_text = tab_ele['text']
-                        break
-                
-                metadata = {
-                    'category': category,
-                    'section' : section_name,
-                    'page': page,
-                    'id': id, 
-                    'table_path': table_path,
-                    'table_summary': table_summary
-                }
-                page_content = table_text
-                
-                doc = Document(page_content=page_content, metadata=metadata)
-                docs.append(doc)
-                
-        for element in value['text_elements']:
-            category = element['category']
-            page = element['page']
-            id = element['id']
+                docs.append(Document(page_content=texts.get(str(id), ''), metadata=metadata))
+        
+        if value['text_elements']:
             section_summary = data['texts_summary'][str(key)] # data['paper_summary']
+        for element in value['text_elements']:
             metadata = {
-                    'category': category,
+                    'category': element['category'],
                     'section' : section_name,
-                    'page': page,
-                    'id': id,
+                    'page': element['page'],
+                    'id': element['id'],
                     'section_summary': section_summary
                 }
-            
-            page_content = element['text']
-            
-            doc = Document(page_content=page_content, metadata=metadata)
-            docs.append(doc)
+            docs.append(Document(page_content=element['text'], metadata=metadata))
 
+    print(f"문서 {len(docs)}개 생성 (이미지 {len(image_texts)}개, 테이블 {len(table_texts)}개 요약 텍스트 색인)")
     split_documents = text_splitter.split_documents(docs)
     save_path = os.path.splitext(data['filepath'])[0]
     save_db_file = f'{save_path}/db'
@@ -0,0 +1,205 @@
+import os
+import socket
+import time
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import job_queue
+import progress_events
+from utils.config import config
+
+# 워커 프로세스 쪽에서 사용하는 공유 카운터 (현재 작업 중인 워커 수)
+_busy_workers = None
+
+
+def _init_worker(busy_workers, preload_modules, event_queue):
+    """워커 프로세스 초기화: 무거운 모듈을 한 번만 미리 import하고 진행 상황 이벤트 큐 연결"""
+    global _busy_workers
+    _busy_workers = busy_workers
+    progress_events.set_worker_queue(event_queue)
+    for module_name in preload_modules:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"워커 모듈 사전 로드 실패 ({module_name}): {e}")
+
+
+def _warmup():
+    """워커 프로세스를 미리 띄우기 위한 빈 작업"""
+    return True
+
+
+def _heartbeat_loop(job_id: int, worker_id: str, stop_event: threading.Event):
+    """작업이 끝날 때까지 주기적으로 점유(lease)를 연장"""
+    while not stop_event.wait(config["job_heartbeat_seconds"]):
+        if not job_queue.heartbeat_job(job_id, worker_id):
+            print(f"Job {job_id} 점유를 잃었습니다.")
+
+
+def _run_job(job: dict):
+    """워커 프로세스에서 점유한 작업(논문 한 편)을 처리"""
+    import pdf_processor
+
+    payload = job["payload"]
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat_loop, args=(job["id"], job["worker_id"], stop_event), daemon=True
+    )
+
+    with _busy_workers.get_lock():
+        _busy_workers.value += 1
+    heartbeat.start()
+    try:
+        api_keys = job_queue.get_user_api_keys(payload["user_id"])
+        pdf_processor.process_paper(
+            file_path=payload["file_path"],
+            selected_model=payload["selected_model"],
+            paper_id=job["paper_id"],
+            **api_keys,
+        )
+    except Exception as e:
+        job_queue.fail_job(job["id"], job["worker_id"], str(e))
+        print(f"PDF 처리 오류: {str(e)}")
+    else:
+        job_queue.complete_job(job["id"], job["worker_id"])
+    finally:
+        stop_event.set()
+        heartbeat.join()
+        with _busy_workers.get_lock():
+            _busy_workers.value -= 1
+
+
+class WorkerPool:
+    """
+    논문 분석용 상주 워커 프로세스 풀.
+
+    업로드마다 `python pdf_processor.py`를 새로 띄우는 대신, 설정된 수의 워커가
+    langchain, FAISS, pymupdf 등을 한 번만 import 해 두고 작업을 받아 처리합니다.
+    작업은 jobs 테이블(job_queue)에서 디스패처 스레드가 점유하여 워커에 넘깁니다.
+    워커의 진행 상황 이벤트는 이벤트 큐를 거쳐 웹 프로세스의 progress_events.broker로 전달됩니다.
+    """
+
+    def __init__(self, size: int, preload_modules=None):
+        self.size = size
+        self.preload_modules = list(preload_modules or [])
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._mp_context = multiprocessing.get_context("spawn")
+        self._busy_workers = self._mp_context.Value("i", 0)
+        self._event_queue = None
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._dispatcher = None
+
+    def _create_executor(self):
+        self._busy_workers.value = 0
+        return ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=self._mp_context,
+            initializer=_init_worker,
+            initargs=(self._busy_workers, self.preload_modules, self._event_queue),
+        )
+
+    def start(self):
+        """만료 작업 복구 후 워커 프로세스와 디스패처를 시작"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._event_queue = self._mp_context.Queue()
+            progress_events.broker.start(self._event_queue)
+            self._executor = self._create_executor()
+            executor = self._executor
+        warmups = [executor.submit(_warmup) for _ in range(self.size)]
+        for future in warmups:
+            future.result()
+
+        job_queue.requeue_expired_jobs()
+        job_queue.cleanup_jobs()
+
+        self._stopping.clear()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+        print(f"워커 풀 시작: {self.size}개 프로세스")
+
+    def shutdown(self, wait: bool = True):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        progress_events.broker.stop()
+
+    def notify(self):
+        """새 작업이 등록되었음을 디스패처에 알림"""
+        self._wakeup.set()
+
+    def _dispatch_loop(self):
+        last_maintenance = time.monotonic()
+        while not self._stopping.is_set():
+            # 비어 있는 워커 수만큼 작업을 점유하여 넘김
+            while self._has_free_slot() and not self._stopping.is_set():
+                job = job_queue.claim_job(self.worker_id)
+                if job is None:
+                    break
+                self._submit(job)
+
+            # 주기적으로 만료 작업 복구 및 오래된 작업 정리
+            if time.monotonic() - last_maintenance > config["job_maintenance_interval_seconds"]:
+                job_queue.requeue_expired_jobs()
+                job_queue.cleanup_jobs()
+                last_maintenance = time.monotonic()
+
+            self._wakeup.wait(config["job_poll_seconds"])
+            self._wakeup.clear()
+
+    def _has_free_slot(self) -> bool:
+        with self._lock:
+            return self._pending < self.size
+
+    def _submit(self, job: dict):
+        with self._lock:
+            try:
+                future = self._executor.submit(_run_job, job)
+            except BrokenProcessPool:
+                # 워커가 비정상 종료된 경우 깨진 풀을 정리하고 (관리 스레드와 남은 워커 프로세스) 새로 만든다
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+                future = self._executor.submit(_run_job, job)
+            self._pending += 1
+        future.add_done_callback(lambda f: self._on_done(f, job))
+
+    def _on_done(self, future, job: dict):
+        with self._lock:
+            self._pending -= 1
+        self._wakeup.set()
+        if future.cancelled():
+            # 종료 중 취소된 작업은 점유 만료 후 다음 시작 시 복구됨
+            return
+        error = future.exception()
+        if error is not None:
+            # 워커 프로세스 자체가 죽은 경우 (일반 예외는 워커 안에서 처리됨)
+            job_queue.fail_job(job["id"], job["worker_id"], str(error) or repr(error))
+            print(f"PDF 처리 오류: {repr(error)}")
+
+    def stats(self) -> dict:
+        """대기열 길이와 워커 사용률 반환"""
+        busy = min(self._busy_workers.value, self.size)
+        return {
+            "size": self.size,
+            "busy_workers": busy,
+            "idle_workers": self.size - busy,
+            "queue_depth": job_queue.count_queued_jobs(),
+            "utilization": busy / self.size if self.size else 0.0,
+        }
+
+
+pool = WorkerPool(config["worker_pool_size"], config["worker_preload_modules"])